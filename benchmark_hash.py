@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark do gerador de hashcode
+Gera entradas sintéticas (textos curtos, arquivo médio e arquivos grandes
+densos e esparsos) e mede a vazão de gerar_hash, gerar_hashes_lote e
+gerar_hash_arquivo por algoritmo, tamanho de bloco e modo de leitura.
+
+Os resultados são gravados em JSON junto com as informações da máquina, para
+comparar execuções em máquinas e versões diferentes.
+"""
+
+import argparse
+import json
+import os
+import platform
+import ssl
+import sys
+import tempfile
+import time
+
+from gerador_hash import gerar_hash, gerar_hashes_lote, gerar_hash_arquivo, ler_tamanho, MODOS_LEITURA
+
+ALGORITMOS_PADRAO = ['md5', 'sha1', 'sha256', 'sha512', 'blake2b', 'sha3_256']
+TAMANHOS_BLOCO_PADRAO = [64 * 1024, 1024 * 1024, 8 * 1024 * 1024]
+
+# Tamanhos das entradas com escala 1.0
+QUANTIDADE_TEXTOS = 200000
+TAMANHO_TEXTO = 64
+TAMANHO_ARQUIVO_MEDIO = 32 * 1024 * 1024
+TAMANHO_ARQUIVO_GRANDE = 256 * 1024 * 1024
+
+# No arquivo esparso, apenas 1 MiB a cada 64 MiB contém dados
+INTERVALO_ESPARSO = 64 * 1024 * 1024
+TAMANHO_DADOS_ESPARSO = 1024 * 1024
+
+# Variação relativa a partir da qual a comparação aponta regressão
+LIMITE_REGRESSAO = 0.10
+
+def _informacoes_maquina():
+    """Coleta as informações da máquina e do ambiente gravadas no resultado"""
+    return {
+        'plataforma': platform.platform(),
+        'maquina': platform.machine(),
+        'processador': platform.processor(),
+        'cpus': os.cpu_count(),
+        'python': platform.python_version(),
+        'implementacao': platform.python_implementation(),
+        'openssl': ssl.OPENSSL_VERSION,
+        'data': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+    }
+
+def _criar_arquivo_denso(caminho, tamanho):
+    """Cria um arquivo com dados aleatórios (incompressíveis)"""
+    with open(caminho, 'wb') as arquivo:
+        restante = tamanho
+        while restante > 0:
+            dados = os.urandom(min(restante, 8 * 1024 * 1024))
+            arquivo.write(dados)
+            restante -= len(dados)
+        arquivo.flush()
+        os.fsync(arquivo.fileno())
+
+def _criar_arquivo_esparso(caminho, tamanho):
+    """Cria um arquivo quase todo em buracos, com pequenos trechos de dados"""
+    with open(caminho, 'wb') as arquivo:
+        for inicio in range(0, tamanho, INTERVALO_ESPARSO):
+            arquivo.seek(inicio)
+            arquivo.write(os.urandom(min(TAMANHO_DADOS_ESPARSO, tamanho - inicio)))
+        arquivo.truncate(tamanho)
+        arquivo.flush()
+        os.fsync(arquivo.fileno())
+
+def _descartar_cache(caminho):
+    """
+    Remove as páginas do arquivo do cache do sistema operacional
+
+    Returns:
+        bool: True se o sistema suporta posix_fadvise(POSIX_FADV_DONTNEED)
+    """
+    if not hasattr(os, 'posix_fadvise'):
+        return False
+    descritor = os.open(caminho, os.O_RDONLY)
+    try:
+        os.posix_fadvise(descritor, 0, 0, os.POSIX_FADV_DONTNEED)
+    finally:
+        os.close(descritor)
+    return True
+
+def _medir(funcao, repeticoes, preparar=None):
+    """Executa a função `repeticoes` vezes e retorna o menor tempo em segundos"""
+    melhor = None
+    for _ in range(repeticoes):
+        if preparar is not None:
+            preparar()
+        inicio = time.perf_counter()
+        funcao()
+        decorrido = time.perf_counter() - inicio
+        if melhor is None or decorrido < melhor:
+            melhor = decorrido
+    return max(melhor, 1e-9)
+
+def _medir_textos(algoritmos, quantidade, repeticoes):
+    """Mede gerar_hash (um texto por chamada) e gerar_hashes_lote em textos curtos"""
+    textos = [os.urandom(TAMANHO_TEXTO // 2).hex() for _ in range(quantidade)]
+    casos = []
+    for algoritmo in algoritmos:
+        funcoes = {
+            'gerar_hash': lambda: [gerar_hash(texto, algoritmo) for texto in textos],
+            'gerar_hashes_lote': lambda: gerar_hashes_lote(textos, algoritmo),
+        }
+        for nome, funcao in funcoes.items():
+            segundos = _medir(funcao, repeticoes)
+            casos.append({
+                'entrada': 'textos', 'funcao': nome, 'algoritmo': algoritmo,
+                'quantidade': quantidade, 'tamanho': quantidade * TAMANHO_TEXTO,
+                'segundos': segundos,
+                'ops_s': quantidade / segundos,
+                'mb_s': quantidade * TAMANHO_TEXTO / segundos / 1e6,
+            })
+    return casos
+
+def _medir_arquivo(entrada, caminho, algoritmos, tamanhos_bloco, modos, repeticoes, frio):
+    """Mede gerar_hash_arquivo em um arquivo para cada combinação de parâmetros"""
+    tamanho = os.path.getsize(caminho)
+    preparar = (lambda: _descartar_cache(caminho)) if frio else None
+    casos = []
+    for algoritmo in algoritmos:
+        for modo in modos:
+            for tamanho_bloco in tamanhos_bloco:
+                def executar():
+                    resultado = gerar_hash_arquivo(caminho, algoritmo, tamanho_bloco, modo)
+                    if resultado.startswith('Erro'):
+                        raise RuntimeError(resultado)
+                segundos = _medir(executar, repeticoes, preparar)
+                casos.append({
+                    'entrada': entrada, 'funcao': 'gerar_hash_arquivo', 'algoritmo': algoritmo,
+                    'modo_leitura': modo, 'tamanho_bloco': tamanho_bloco, 'tamanho': tamanho,
+                    'segundos': segundos,
+                    'ops_s': 1 / segundos,
+                    'mb_s': tamanho / segundos / 1e6,
+                })
+    return casos
+
+def executar_benchmark(algoritmos=None, tamanhos_bloco=None, modos=None, escala=1.0,
+                       repeticoes=3, frio=False, entradas=None, diretorio=None, progresso=None):
+    """
+    Executa o benchmark e retorna os resultados
+
+    Args:
+        algoritmos (list): Algoritmos medidos (padrão: md5, sha1, sha256, sha512, blake2b, sha3_256)
+        tamanhos_bloco (list): Tamanhos de bloco em bytes (padrão: 64 KiB, 1 MiB, 8 MiB)
+        modos (list): Modos de leitura (padrão: todos os de gerador_hash.MODOS_LEITURA)
+        escala (float): Multiplica o tamanho de todas as entradas (ex.: 0.05 para um teste rápido)
+        repeticoes (int): Repetições por caso; vale o menor tempo
+        frio (bool): Descarta o cache do sistema antes de cada leitura de arquivo
+        entradas (list): Subconjunto de 'textos', 'medio', 'grande_denso' e 'grande_esparso'
+        diretorio (str): Onde criar os arquivos temporários (define o disco medido)
+        progresso (callable): Chamada com o nome de cada entrada antes de medi-la
+
+    Returns:
+        dict: {'maquina': {...}, 'parametros': {...}, 'casos': [...]}
+    """
+    algoritmos = [a.lower() for a in (algoritmos or ALGORITMOS_PADRAO)]
+    tamanhos_bloco = tamanhos_bloco or TAMANHOS_BLOCO_PADRAO
+    modos = modos or list(MODOS_LEITURA)
+    entradas = entradas or ['textos', 'medio', 'grande_denso', 'grande_esparso']
+
+    cache_frio = frio and hasattr(os, 'posix_fadvise')
+    resultado = {
+        'maquina': _informacoes_maquina(),
+        'parametros': {
+            'algoritmos': algoritmos, 'tamanhos_bloco': tamanhos_bloco, 'modos_leitura': modos,
+            'escala': escala, 'repeticoes': repeticoes, 'cache_frio': cache_frio,
+        },
+        'casos': [],
+    }
+
+    arquivos = {
+        'medio': (_criar_arquivo_denso, TAMANHO_ARQUIVO_MEDIO),
+        'grande_denso': (_criar_arquivo_denso, TAMANHO_ARQUIVO_GRANDE),
+        'grande_esparso': (_criar_arquivo_esparso, TAMANHO_ARQUIVO_GRANDE),
+    }
+
+    with tempfile.TemporaryDirectory(prefix='benchmark_hash_', dir=diretorio) as temporario:
+        for entrada in entradas:
+            if progresso is not None:
+                progresso(entrada)
+            if entrada == 'textos':
+                quantidade = max(1, int(QUANTIDADE_TEXTOS * escala))
+                resultado['casos'].extend(_medir_textos(algoritmos, quantidade, repeticoes))
+                continue
+            if entrada not in arquivos:
+                raise ValueError(f"Entrada '{entrada}' desconhecida")
+
+            criar, tamanho = arquivos[entrada]
+            caminho = os.path.join(temporario, entrada)
+            criar(caminho, max(1, int(tamanho * escala)))
+            try:
+                resultado['casos'].extend(_medir_arquivo(entrada, caminho, algoritmos, tamanhos_bloco,
+                                                         modos, repeticoes, cache_frio))
+            finally:
+                os.remove(caminho)
+
+    return resultado
+
+def _chave_caso(caso):
+    return (caso['entrada'], caso['funcao'], caso['algoritmo'],
+            caso.get('modo_leitura'), caso.get('tamanho_bloco'))
+
+def comparar_resultados(anterior, atual, limite=LIMITE_REGRESSAO):
+    """
+    Compara dois resultados de executar_benchmark caso a caso
+
+    Args:
+        anterior (dict): Resultado de referência
+        atual (dict): Resultado novo
+        limite (float): Queda relativa de vazão considerada regressão
+
+    Returns:
+        list: Dicts {'caso', 'anterior', 'atual', 'variacao', 'regressao'} com a
+            vazão em MB/s, apenas para os casos presentes nos dois resultados
+    """
+    referencia = {_chave_caso(caso): caso for caso in anterior['casos']}
+    comparacoes = []
+    for caso in atual['casos']:
+        antigo = referencia.get(_chave_caso(caso))
+        if antigo is None:
+            continue
+        variacao = caso['mb_s'] / antigo['mb_s'] - 1
+        comparacoes.append({
+            'caso': _chave_caso(caso), 'anterior': antigo['mb_s'], 'atual': caso['mb_s'],
+            'variacao': variacao, 'regressao': variacao < -limite,
+        })
+    return comparacoes
+
+def _descrever_caso(chave):
+    entrada, funcao, algoritmo, modo, tamanho_bloco = chave
+    if modo is None:
+        return f"{entrada:<15} {algoritmo:<8} {funcao}"
+    return f"{entrada:<15} {algoritmo:<8} {modo:<9} {tamanho_bloco // 1024:>6} KiB"
+
+def main(argv=None):
+    """Executa o benchmark pela linha de comando"""
+    parser = argparse.ArgumentParser(description="Benchmark de algoritmos, tamanhos de bloco e modos de leitura")
+    parser.add_argument('-a', '--algoritmo', action='append', default=None,
+                        help="Algoritmo a medir (pode repetir; padrão: md5, sha1, sha256, sha512, blake2b, sha3_256)")
+    parser.add_argument('-b', '--bloco', action='append', type=ler_tamanho, default=None,
+                        help="Tamanho de bloco, ex.: 64K (pode repetir)")
+    parser.add_argument('-m', '--modo', action='append', choices=MODOS_LEITURA, default=None,
+                        help="Modo de leitura (pode repetir; padrão: todos)")
+    parser.add_argument('-e', '--entrada', action='append',
+                        choices=['textos', 'medio', 'grande_denso', 'grande_esparso'], default=None)
+    parser.add_argument('--escala', type=float, default=1.0,
+                        help="Multiplica o tamanho das entradas (padrão: 1.0)")
+    parser.add_argument('--rapido', action='store_true',
+                        help="Entradas 16 vezes menores e uma repetição por caso")
+    parser.add_argument('-r', '--repeticoes', type=int, default=3)
+    parser.add_argument('--frio', action='store_true',
+                        help="Descarta o cache do sistema antes de cada leitura de arquivo")
+    parser.add_argument('-d', '--diretorio', default=None, help="Diretório dos arquivos temporários")
+    parser.add_argument('-o', '--saida', default=None, help="Grava o resultado neste arquivo JSON")
+    parser.add_argument('-c', '--comparar', default=None,
+                        help="Compara com um resultado JSON anterior")
+    args = parser.parse_args(argv)
+
+    escala, repeticoes = args.escala, args.repeticoes
+    if args.rapido:
+        escala, repeticoes = escala / 16, 1
+
+    resultado = executar_benchmark(args.algoritmo, args.bloco, args.modo, escala, repeticoes,
+                                   args.frio, args.entrada, args.diretorio,
+                                   progresso=lambda entrada: print(f"Medindo {entrada}...",
+                                                                   file=sys.stderr))
+    if args.frio and not resultado['parametros']['cache_frio']:
+        print("Aviso: posix_fadvise indisponível; medições feitas com cache quente", file=sys.stderr)
+
+    for caso in resultado['casos']:
+        print(f"{_descrever_caso(_chave_caso(caso))}  {caso['mb_s']:10.1f} MB/s  "
+              f"{caso['ops_s']:12.1f} ops/s")
+
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as saida:
+            json.dump(resultado, saida, indent=1)
+
+    if args.comparar:
+        with open(args.comparar, 'r', encoding='utf-8') as entrada:
+            anterior = json.load(entrada)
+        comparacoes = comparar_resultados(anterior, resultado)
+        print()
+        for comparacao in comparacoes:
+            marca = '  REGRESSÃO' if comparacao['regressao'] else ''
+            print(f"{_descrever_caso(comparacao['caso'])}  {comparacao['anterior']:10.1f} -> "
+                  f"{comparacao['atual']:10.1f} MB/s ({comparacao['variacao']:+.1%}){marca}")
+        return 1 if any(c['regressao'] for c in comparacoes) else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
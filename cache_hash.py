@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cache persistente de hashes de arquivos
+Guarda os hashes em um banco SQLite local, identificados pelo arquivo
+(dispositivo, inode, tamanho, mtime_ns) e pelo algoritmo, para não reler
+arquivos que não mudaram desde a última execução
+"""
+
+import os
+import sqlite3
+import threading
+import time
+
+from gerador_hash import gerar_hash_arquivo, gerar_hash_diretorio
+
+CAMINHO_CACHE_PADRAO = os.path.join(os.path.expanduser('~'), '.gerador_hash_cache.sqlite3')
+
+# Arquivos modificados há menos tempo que isso não são guardados: em sistemas de
+# arquivos com mtime de baixa resolução uma nova escrita poderia manter o mesmo mtime
+JANELA_MODIFICACAO_RECENTE = 2.0
+
+# Quantidade de alterações acumuladas antes de um commit no banco
+ALTERACOES_POR_COMMIT = 1000
+
+class CacheHash:
+    """
+    Cache de hashes de arquivos em SQLite
+
+    Pode ser usado por várias threads ao mesmo tempo (por exemplo junto com
+    gerar_hash_diretorio). Use como gerenciador de contexto ou chame fechar()
+    para gravar as alterações pendentes.
+    """
+
+    def __init__(self, caminho_banco=CAMINHO_CACHE_PADRAO, max_entradas=None, max_idade=None):
+        """
+        Args:
+            caminho_banco (str): Arquivo do banco SQLite
+            max_entradas (int): Número máximo de entradas mantidas na evicção
+            max_idade (float): Idade máxima em segundos desde o último acesso
+        """
+        self.caminho_banco = caminho_banco
+        self.max_entradas = max_entradas
+        self.max_idade = max_idade
+        self.acertos = 0
+        self.falhas = 0
+        self._alteracoes = 0
+        self._trava = threading.Lock()
+
+        self._conexao = sqlite3.connect(caminho_banco, check_same_thread=False)
+        self._conexao.execute('PRAGMA journal_mode=WAL')
+        self._conexao.execute('PRAGMA synchronous=NORMAL')
+        self._conexao.execute('''
+            CREATE TABLE IF NOT EXISTS hashes (
+                dispositivo INTEGER NOT NULL,
+                inode INTEGER NOT NULL,
+                tamanho INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                algoritmo TEXT NOT NULL,
+                hash TEXT NOT NULL,
+                caminho TEXT NOT NULL,
+                ultimo_acesso REAL NOT NULL,
+                PRIMARY KEY (dispositivo, inode, tamanho, mtime_ns, algoritmo)
+            )
+        ''')
+        self._conexao.execute('CREATE INDEX IF NOT EXISTS idx_hashes_caminho ON hashes (caminho)')
+        self._conexao.execute('CREATE INDEX IF NOT EXISTS idx_hashes_acesso ON hashes (ultimo_acesso)')
+        self._conexao.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.fechar()
+
+    def _registrar_alteracao(self):
+        """Faz commit periodicamente (deve ser chamado com a trava adquirida)"""
+        self._alteracoes += 1
+        if self._alteracoes >= ALTERACOES_POR_COMMIT:
+            self._conexao.commit()
+            self._alteracoes = 0
+
+    def gerar_hash_arquivo(self, caminho_arquivo, algoritmo='sha256', **opcoes):
+        """
+        Gera o hash de um arquivo consultando o cache antes de ler o arquivo
+
+        Aceita os mesmos argumentos de gerador_hash.gerar_hash_arquivo, inclusive
+        uma lista de algoritmos; nesse caso apenas os algoritmos ausentes do
+        cache são calculados, em uma única leitura.
+
+        Args:
+            caminho_arquivo (str): Caminho para o arquivo
+            algoritmo (str | list): Algoritmo de hash ou lista de algoritmos
+            **opcoes: Repassados para gerar_hash_arquivo (tamanho_bloco, modo_leitura)
+
+        Returns:
+            str | dict: Hash gerado (ou mensagem de erro), como em gerar_hash_arquivo
+        """
+        try:
+            info = os.stat(caminho_arquivo)
+        except OSError:
+            # Deixa a mensagem de erro a cargo da função original
+            return gerar_hash_arquivo(caminho_arquivo, algoritmo, **opcoes)
+
+        varios = isinstance(algoritmo, (list, tuple))
+        algoritmos = [a.lower() for a in algoritmo] if varios else [algoritmo.lower()]
+        identidade = (info.st_dev, info.st_ino, info.st_size, info.st_mtime_ns)
+        agora = time.time()
+
+        encontrados = {}
+        with self._trava:
+            for nome in algoritmos:
+                linha = self._conexao.execute(
+                    'SELECT hash FROM hashes WHERE dispositivo=? AND inode=? AND tamanho=? '
+                    'AND mtime_ns=? AND algoritmo=?', identidade + (nome,)).fetchone()
+                if linha:
+                    encontrados[nome] = linha[0]
+                    self._conexao.execute(
+                        'UPDATE hashes SET ultimo_acesso=?, caminho=? WHERE dispositivo=? AND inode=? '
+                        'AND tamanho=? AND mtime_ns=? AND algoritmo=?',
+                        (agora, caminho_arquivo) + identidade + (nome,))
+                    self._registrar_alteracao()
+            self.acertos += len(encontrados)
+            self.falhas += len(algoritmos) - len(encontrados)
+
+        faltando = [nome for nome in algoritmos if nome not in encontrados]
+        if faltando:
+            resultado = gerar_hash_arquivo(caminho_arquivo, faltando, **opcoes)
+            if not isinstance(resultado, dict):
+                return resultado
+            encontrados.update(resultado)
+            self._guardar(caminho_arquivo, info, resultado)
+
+        if varios:
+            return {nome: encontrados[nome] for nome in algoritmos}
+        return encontrados[algoritmos[0]]
+
+    def _guardar(self, caminho_arquivo, info, hashes):
+        """Guarda hashes recém-calculados se o arquivo não mudou durante a leitura"""
+        try:
+            info_depois = os.stat(caminho_arquivo)
+        except OSError:
+            return
+        identidade = (info.st_dev, info.st_ino, info.st_size, info.st_mtime_ns)
+        if identidade != (info_depois.st_dev, info_depois.st_ino,
+                          info_depois.st_size, info_depois.st_mtime_ns):
+            return
+        agora = time.time()
+        if agora - info.st_mtime_ns / 1e9 < JANELA_MODIFICACAO_RECENTE:
+            return
+
+        with self._trava:
+            for nome, hash_valor in hashes.items():
+                # Remove versões antigas do mesmo arquivo para o banco não crescer
+                self._conexao.execute(
+                    'DELETE FROM hashes WHERE dispositivo=? AND inode=? AND algoritmo=?',
+                    (info.st_dev, info.st_ino, nome))
+                self._conexao.execute(
+                    'INSERT INTO hashes VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                    identidade + (nome, hash_valor, caminho_arquivo, agora))
+                self._registrar_alteracao()
+
+    def gerar_hash_diretorio(self, diretorio, algoritmo='sha256', **opcoes):
+        """
+        Gera o hash dos arquivos de um diretório usando o cache
+
+        Aceita os mesmos argumentos de gerador_hash.gerar_hash_diretorio, exceto
+        usar_processos (a conexão com o banco não pode ser compartilhada entre processos).
+
+        Yields:
+            tuple: (caminho, hash) para cada arquivo
+        """
+        return gerar_hash_diretorio(diretorio, algoritmo, funcao_hash=self.gerar_hash_arquivo, **opcoes)
+
+    def invalidar(self, caminho_arquivo=None):
+        """
+        Remove entradas do cache
+
+        Args:
+            caminho_arquivo (str): Remove apenas as entradas deste arquivo
+                (None limpa o cache inteiro)
+
+        Returns:
+            int: Número de entradas removidas
+        """
+        with self._trava:
+            if caminho_arquivo is None:
+                cursor = self._conexao.execute('DELETE FROM hashes')
+            else:
+                removidas = self._conexao.execute(
+                    'DELETE FROM hashes WHERE caminho=?', (caminho_arquivo,)).rowcount
+                try:
+                    info = os.stat(caminho_arquivo)
+                except OSError:
+                    self._conexao.commit()
+                    return removidas
+                cursor = self._conexao.execute(
+                    'DELETE FROM hashes WHERE dispositivo=? AND inode=?', (info.st_dev, info.st_ino))
+                self._conexao.commit()
+                return removidas + cursor.rowcount
+            self._conexao.commit()
+            return cursor.rowcount
+
+    def aplicar_evicao(self, max_entradas=None, max_idade=None):
+        """
+        Remove entradas antigas ou excedentes do cache
+
+        Args:
+            max_entradas (int): Mantém apenas as entradas acessadas mais recentemente
+            max_idade (float): Remove entradas não acessadas há mais de max_idade segundos
+
+        Returns:
+            int: Número de entradas removidas
+        """
+        max_entradas = self.max_entradas if max_entradas is None else max_entradas
+        max_idade = self.max_idade if max_idade is None else max_idade
+        removidas = 0
+
+        with self._trava:
+            if max_idade is not None:
+                removidas += self._conexao.execute(
+                    'DELETE FROM hashes WHERE ultimo_acesso < ?', (time.time() - max_idade,)).rowcount
+            if max_entradas is not None:
+                total = self._conexao.execute('SELECT COUNT(*) FROM hashes').fetchone()[0]
+                excedente = total - max_entradas
+                if excedente > 0:
+                    removidas += self._conexao.execute(
+                        'DELETE FROM hashes WHERE rowid IN (SELECT rowid FROM hashes '
+                        'ORDER BY ultimo_acesso LIMIT ?)', (excedente,)).rowcount
+            self._conexao.commit()
+        return removidas
+
+    def estatisticas(self):
+        """
+        Retorna as estatísticas de uso do cache
+
+        Returns:
+            dict: Acertos, falhas, taxa de acerto e número de entradas
+        """
+        with self._trava:
+            entradas = self._conexao.execute('SELECT COUNT(*) FROM hashes').fetchone()[0]
+        consultas = self.acertos + self.falhas
+        return {
+            'acertos': self.acertos,
+            'falhas': self.falhas,
+            'taxa_acerto': self.acertos / consultas if consultas else 0.0,
+            'entradas': entradas
+        }
+
+    def fechar(self):
+        """Aplica a evicção configurada, grava as alterações e fecha o banco"""
+        if self._conexao is None:
+            return
+        if self.max_entradas is not None or self.max_idade is not None:
+            self.aplicar_evicao()
+        with self._trava:
+            self._conexao.commit()
+            self._conexao.close()
+            self._conexao = None
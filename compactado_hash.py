@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Hash dos membros de arquivos compactados (.zip, .tar, .tar.gz, .tar.bz2, .tar.xz)
+Cada membro é descompactado em blocos direto para os objetos hash, sem
+extração para o disco. Arquivos tar são lidos uma única vez, em sequência;
+membros de arquivos zip podem ser processados em paralelo.
+"""
+
+import argparse
+import os
+import sys
+import tarfile
+import threading
+import zipfile
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from gerador_hash import criar_objeto_hash, OperacaoCancelada, TAMANHO_BLOCO_PADRAO, corresponde_padroes
+from manifesto import deduzir_algoritmo, ler_manifesto, normalizar_caminho
+
+def _hash_fluxo(fluxo, algoritmo, tamanho_bloco, cancelar=None):
+    """
+    Gera o hash de um objeto de arquivo lido em blocos com readinto
+
+    Returns:
+        str | dict: Como em gerar_hash_arquivo
+    """
+    varios = isinstance(algoritmo, (list, tuple))
+    algoritmos = [a.lower() for a in algoritmo] if varios else [algoritmo.lower()]
+    hash_objs = {nome: criar_objeto_hash(nome) for nome in algoritmos}
+    atualizacoes = [obj.update for obj in hash_objs.values()]
+
+    buffer = bytearray(tamanho_bloco)
+    with memoryview(buffer) as visao:
+        while lidos := fluxo.readinto(buffer):
+            if cancelar is not None and cancelar.is_set():
+                raise OperacaoCancelada("Hash do arquivo compactado cancelado")
+            with visao[:lidos] as bloco:
+                for atualizar in atualizacoes:
+                    atualizar(bloco)
+
+    if varios:
+        return {nome: obj.hexdigest() for nome, obj in hash_objs.items()}
+    return hash_objs[algoritmos[0]].hexdigest()
+
+def _selecionado(nome, incluir, excluir):
+    """Aplica os filtros a cada componente do nome do membro, como listar_arquivos"""
+    nome = nome.rstrip('/')
+    if excluir:
+        partes = nome.split('/')
+        for indice in range(1, len(partes) + 1):
+            if corresponde_padroes('/'.join(partes[:indice]), excluir):
+                return False
+    return not incluir or corresponde_padroes(nome, incluir)
+
+def _hash_membros_tar(caminho, algoritmo, tamanho_bloco, incluir, excluir, cancelar):
+    """Percorre o tar em modo fluxo ('r|*'), lendo o arquivo uma única vez"""
+    with tarfile.open(caminho, mode='r|*', bufsize=tamanho_bloco) as pacote:
+        for membro in pacote:
+            if not membro.isreg() or not _selecionado(membro.name, incluir, excluir):
+                continue
+            try:
+                with pacote.extractfile(membro) as fluxo:
+                    yield membro.name, _hash_fluxo(fluxo, algoritmo, tamanho_bloco, cancelar)
+            except OperacaoCancelada:
+                raise
+            except (OSError, tarfile.TarError, EOFError) as e:
+                yield membro.name, f"Erro ao gerar hash do membro '{membro.name}': {str(e)}"
+
+def _hash_membros_zip(caminho, algoritmo, tamanho_bloco, incluir, excluir, cancelar, workers):
+    """Processa os membros do zip, em paralelo quando workers > 1"""
+    locais = threading.local()
+    abertos = []
+    trava = threading.Lock()
+
+    def hash_membro(info):
+        # Cada thread usa o seu próprio ZipFile para não disputar a posição de leitura
+        pacote = getattr(locais, 'pacote', None)
+        if pacote is None:
+            pacote = locais.pacote = zipfile.ZipFile(caminho)
+            with trava:
+                abertos.append(pacote)
+        try:
+            # O ZipExtFile confere o CRC ao chegar no fim do membro
+            with pacote.open(info) as fluxo:
+                return info.filename, _hash_fluxo(fluxo, algoritmo, tamanho_bloco, cancelar)
+        except OperacaoCancelada:
+            raise
+        # zlib.error: dados deflate corrompidos; EOFError: membro truncado
+        except (OSError, zipfile.BadZipFile, NotImplementedError, RuntimeError, zlib.error, EOFError) as e:
+            return info.filename, f"Erro ao gerar hash do membro '{info.filename}': {str(e)}"
+
+    with zipfile.ZipFile(caminho) as pacote:
+        membros = [info for info in pacote.infolist()
+                   if not info.is_dir() and _selecionado(info.filename, incluir, excluir)]
+
+    try:
+        if workers <= 1:
+            for info in membros:
+                yield hash_membro(info)
+            return
+
+        # Resultados na ordem do arquivo, com número limitado de tarefas pendentes
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            fila = deque()
+            for info in membros:
+                fila.append(executor.submit(hash_membro, info))
+                if len(fila) >= workers * 4:
+                    yield fila.popleft().result()
+            while fila:
+                yield fila.popleft().result()
+    finally:
+        for pacote in abertos:
+            pacote.close()
+
+def gerar_hash_compactado(caminho_arquivo, algoritmo='sha256', workers=None, incluir=None,
+                          excluir=None, tamanho_bloco=TAMANHO_BLOCO_PADRAO, cancelar=None):
+    """
+    Gera o hash de cada membro de um arquivo zip ou tar sem extraí-lo
+
+    Diretórios, links e outros membros que não são arquivos regulares são
+    ignorados. Membros de zip são processados em paralelo; tar é lido em
+    sequência (o formato não tem índice), descompactando uma única vez.
+
+    Args:
+        caminho_arquivo (str): Arquivo .zip ou .tar (opcionalmente .gz, .bz2, .xz)
+        algoritmo (str | list): Algoritmo de hash ou lista de algoritmos
+        workers (int): Threads para membros de zip (padrão: número de CPUs)
+        incluir (list): Padrões glob de membros a incluir
+        excluir (list): Padrões glob de membros/diretórios a excluir
+        tamanho_bloco (int): Bytes descompactados por leitura
+        cancelar (threading.Event): Se sinalizado, interrompe no próximo bloco
+
+    Yields:
+        tuple: (nome do membro, hash) na ordem do arquivo; o hash segue o formato
+            de gerar_hash_arquivo (str, dict ou mensagem de erro)
+
+    Raises:
+        ValueError: Se o arquivo não for zip nem tar
+    """
+    incluir = list(incluir or [])
+    excluir = list(excluir or [])
+    if zipfile.is_zipfile(caminho_arquivo):
+        workers = workers or os.cpu_count() or 1
+        yield from _hash_membros_zip(caminho_arquivo, algoritmo, tamanho_bloco, incluir, excluir,
+                                     cancelar, workers)
+    elif tarfile.is_tarfile(caminho_arquivo):
+        yield from _hash_membros_tar(caminho_arquivo, algoritmo, tamanho_bloco, incluir, excluir,
+                                     cancelar)
+    else:
+        raise ValueError(f"'{caminho_arquivo}' não é um arquivo zip ou tar")
+
+def verificar_compactado(caminho_arquivo, arquivo_manifesto, algoritmo=None, workers=None):
+    """
+    Verifica os membros de um arquivo compactado contra um manifesto
+
+    Os caminhos do manifesto e os nomes dos membros são normalizados da mesma
+    forma antes da comparação (sem o prefixo './', ver normalizar_caminho).
+
+    Args:
+        caminho_arquivo (str): Arquivo zip ou tar
+        arquivo_manifesto (str): Manifesto no formato do sha256sum
+        algoritmo (str): Algoritmo de hash (padrão: deduzido pelo comprimento do hash)
+        workers (int): Threads para membros de zip
+
+    Returns:
+        dict: Listas de nomes em 'ok', 'alterados', 'ausentes' e 'extras', e
+            tuplas (nome, mensagem) em 'erros'
+
+    Raises:
+        ValueError: Se o algoritmo não for informado e não puder ser deduzido
+    """
+    esperados = {normalizar_caminho(caminho): hash_valor
+                 for caminho, hash_valor, _ in ler_manifesto(arquivo_manifesto)}
+    if algoritmo is None:
+        comprimentos = {len(hash_valor) for hash_valor in esperados.values()}
+        if len(comprimentos) > 1:
+            raise ValueError("O manifesto mistura hashes de comprimentos diferentes; informe o algoritmo (-a)")
+        algoritmo = deduzir_algoritmo(next(iter(esperados.values()))) if esperados else 'sha256'
+
+    relatorio = {'ok': [], 'alterados': [], 'ausentes': [], 'extras': [], 'erros': []}
+    vistos = set()
+    for nome, hash_valor in gerar_hash_compactado(caminho_arquivo, algoritmo, workers):
+        nome = normalizar_caminho(nome)
+        vistos.add(nome)
+        if hash_valor.startswith('Erro'):
+            relatorio['erros'].append((nome, hash_valor))
+        elif nome not in esperados:
+            relatorio['extras'].append(nome)
+        elif esperados[nome] != hash_valor:
+            relatorio['alterados'].append(nome)
+        else:
+            relatorio['ok'].append(nome)
+    relatorio['ausentes'] = sorted(nome for nome in esperados if nome not in vistos)
+    return relatorio
+
+def main(argv=None):
+    """Gera ou verifica os hashes dos membros de um arquivo compactado"""
+    parser = argparse.ArgumentParser(description="Hash dos membros de arquivos zip/tar sem extração")
+    parser.add_argument('arquivo')
+    parser.add_argument('-a', '--algoritmo', default=None, help="Algoritmo de hash (padrão: sha256)")
+    parser.add_argument('-j', '--workers', type=int, default=None, help="Threads para membros de zip")
+    parser.add_argument('--excluir', action='append', default=[])
+    parser.add_argument('-c', '--verificar', metavar='MANIFESTO',
+                        help="Verifica os membros contra um manifesto do sha256sum")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.verificar:
+            relatorio = verificar_compactado(args.arquivo, args.verificar, args.algoritmo, args.workers)
+            for nome in relatorio['alterados']:
+                print(f"{nome}: ALTERADO")
+            for nome in relatorio['ausentes']:
+                print(f"{nome}: AUSENTE")
+            for nome in relatorio['extras']:
+                print(f"{nome}: EXTRA")
+            for nome, mensagem in relatorio['erros']:
+                print(f"{nome}: ERRO ({mensagem})")
+            print(f"{len(relatorio['ok'])} ok, {len(relatorio['alterados'])} alterados, "
+                  f"{len(relatorio['ausentes'])} ausentes, {len(relatorio['extras'])} extras, "
+                  f"{len(relatorio['erros'])} erros", file=sys.stderr)
+            falhou = relatorio['alterados'] or relatorio['ausentes'] or relatorio['erros']
+            return 1 if falhou else 0
+
+        erros = 0
+        for nome, hash_valor in gerar_hash_compactado(args.arquivo, args.algoritmo or 'sha256',
+                                                      args.workers, excluir=args.excluir):
+            if hash_valor.startswith('Erro'):
+                erros += 1
+                print(hash_valor, file=sys.stderr)
+            else:
+                print(f"{hash_valor}  {nome}")
+        return 1 if erros else 0
+    except (OSError, ValueError, tarfile.TarError, zipfile.BadZipFile) as e:
+        print(f"Erro: {str(e)}", file=sys.stderr)
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
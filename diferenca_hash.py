@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Comparação em massa de listas de hashes e manifestos
+Compara dois manifestos (ou listas de hashes) com milhões de entradas e
+aponta as entradas adicionadas, removidas, alteradas e idênticas, pelo
+caminho ou pelo hash. As entradas viram chaves binárias (caminho em bytes +
+digest), ordenadas externamente em arquivos temporários e intercaladas, de
+forma que a memória usada não depende do tamanho das listas.
+"""
+
+import argparse
+import heapq
+import json
+import os
+import pickle
+import sys
+import tempfile
+from binascii import unhexlify
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+from operator import methodcaller
+
+from manifesto import ler_manifesto_binario
+
+# Entradas ordenadas em memória por vez durante a ordenação externa
+TAMANHO_RUN_PADRAO = 500000
+# Chaves por lote serializado nos arquivos temporários
+TAMANHO_LOTE_RUN = 65536
+
+SITUACOES = ('adicionado', 'removido', 'alterado', 'identico')
+
+def _lista_simples(caminho_arquivo):
+    """Indica se o arquivo é uma lista de hashes sem caminhos (um hash por linha)"""
+    with open(caminho_arquivo, 'rb') as arquivo:
+        for linha in arquivo:
+            linha = linha.strip()
+            if linha and not linha.startswith(b'#'):
+                return len(linha.split(None, 1)) == 1
+    return False
+
+def _entradas(fonte):
+    """
+    Gera (caminho em bytes, hash hexadecimal) de uma fonte
+
+    Aceita o caminho de um manifesto (formatos de ler_manifesto) ou de uma lista
+    com um hash por linha, e iteráveis de tuplas (caminho, hash) como as de
+    gerar_hash_diretorio ou de hashes soltos. Entradas sem caminho usam b''.
+    """
+    if isinstance(fonte, str):
+        if _lista_simples(fonte):
+            with open(fonte, 'rb') as arquivo:
+                for linha in arquivo:
+                    linha = linha.strip()
+                    if linha and not linha.startswith(b'#'):
+                        yield b'', linha
+        else:
+            for caminho, hash_valor, _ in ler_manifesto_binario(fonte):
+                yield caminho, hash_valor
+        return
+
+    for item in fonte:
+        if isinstance(item, tuple):
+            caminho, hash_valor = item[0], item[1]
+            if hash_valor.startswith('Erro'):
+                continue
+            yield caminho.encode('utf-8', 'surrogateescape'), hash_valor
+        else:
+            yield b'', item.strip()
+
+def _chaves(fonte, por, tamanhos, lado):
+    """
+    Converte as entradas em chaves binárias ordenáveis
+
+    Por caminho: caminho + b'\\0' + digest (o NUL não aparece em caminhos, então a
+    ordem das chaves é a ordem dos caminhos). Por hash: digest + caminho. O
+    tamanho do digest de cada lado é registrado em `tamanhos[lado]`.
+    """
+    tamanho_digest = None
+    for caminho, hash_valor in _entradas(fonte):
+        try:
+            digest = unhexlify(hash_valor)
+        except ValueError:
+            raise ValueError(f"Hash inválido para '{_texto(caminho)}': {hash_valor!r}") from None
+        if tamanho_digest is None:
+            tamanho_digest = tamanhos[lado] = len(digest)
+        elif len(digest) != tamanho_digest:
+            raise ValueError(f"Hashes de tamanhos diferentes na mesma lista ({len(digest)} e "
+                             f"{tamanho_digest} bytes)")
+        if por == 'caminho':
+            if not caminho:
+                raise ValueError("A comparação por caminho exige manifestos com caminhos")
+            yield caminho + b'\0' + digest
+        else:
+            yield digest + caminho
+
+def _gravar_run(caminho_run, chaves):
+    """Grava um run ordenado em lotes serializados com pickle (lidos em C, sem laço por chave)"""
+    with open(caminho_run, 'wb') as run:
+        for inicio in range(0, len(chaves), TAMANHO_LOTE_RUN):
+            pickle.dump(chaves[inicio:inicio + TAMANHO_LOTE_RUN], run, pickle.HIGHEST_PROTOCOL)
+
+def _ler_run(caminho_run):
+    """Lê as chaves de um run gravado por _gravar_run"""
+    with open(caminho_run, 'rb') as run:
+        while True:
+            try:
+                lote = pickle.load(run)
+            except EOFError:
+                return
+            yield from lote
+
+def _preparar_lado(fonte, por, tamanho_run, temporario, nome, em_memoria=True):
+    """
+    Lê e ordena um lado da comparação em runs
+
+    Returns:
+        tuple: (runs gravados, chaves do último run ainda em memória, runs em
+            sequência, tamanho do digest ou None); com em_memoria=False (em outro
+            processo) o último run também é gravado
+    """
+    tamanhos = {}
+    runs = []
+    atual = []
+    em_sequencia = True
+    ultima = None
+
+    def gravar():
+        nonlocal em_sequencia, ultima
+        atual.sort()
+        if ultima is not None and atual and atual[0] < ultima:
+            em_sequencia = False
+        ultima = atual[-1] if atual else ultima
+        caminho_run = os.path.join(temporario, f'{nome}{len(runs)}')
+        _gravar_run(caminho_run, atual)
+        runs.append(caminho_run)
+        atual.clear()
+
+    for chave in _chaves(fonte, por, tamanhos, nome):
+        atual.append(chave)
+        if len(atual) >= tamanho_run:
+            gravar()
+
+    if em_memoria:
+        atual.sort()
+        if ultima is not None and atual and atual[0] < ultima:
+            em_sequencia = False
+    elif atual:
+        gravar()
+    return runs, atual, em_sequencia, tamanhos.get(nome)
+
+def _intercalar(runs, atual, em_sequencia):
+    """
+    Intercala os runs de um lado em uma única sequência ordenada
+
+    Se os runs não se sobrepõem (fonte já ordenada, como os manifestos de
+    gerar_manifesto), são lidos em sequência, sem o custo do heapq.merge.
+    """
+    leitores = [_ler_run(run) for run in runs]
+    if em_sequencia:
+        return chain(*leitores, atual)
+    return heapq.merge(iter(atual), *leitores)
+
+def _texto(caminho):
+    return caminho.decode('utf-8', 'surrogateescape')
+
+def _por_caminho(antigos, novos, identicos, resumo):
+    """Intercala duas sequências de chaves caminho + NUL + digest"""
+    # partition separa no primeiro NUL, que é sempre o separador
+    antigos = map(methodcaller('partition', b'\0'), antigos)
+    novos = map(methodcaller('partition', b'\0'), novos)
+    antigo = next(antigos, None)
+    novo = next(novos, None)
+    while antigo is not None and novo is not None:
+        if antigo[0] < novo[0]:
+            resumo['removido'] += 1
+            yield 'removido', _texto(antigo[0]), antigo[2].hex(), None
+            antigo = next(antigos, None)
+        elif novo[0] < antigo[0]:
+            resumo['adicionado'] += 1
+            yield 'adicionado', _texto(novo[0]), None, novo[2].hex()
+            novo = next(novos, None)
+        else:
+            if antigo[2] == novo[2]:
+                resumo['identico'] += 1
+                if identicos:
+                    hash_valor = antigo[2].hex()
+                    yield 'identico', _texto(antigo[0]), hash_valor, hash_valor
+            else:
+                resumo['alterado'] += 1
+                yield 'alterado', _texto(antigo[0]), antigo[2].hex(), novo[2].hex()
+            antigo = next(antigos, None)
+            novo = next(novos, None)
+
+    while antigo is not None:
+        resumo['removido'] += 1
+        yield 'removido', _texto(antigo[0]), antigo[2].hex(), None
+        antigo = next(antigos, None)
+    while novo is not None:
+        resumo['adicionado'] += 1
+        yield 'adicionado', _texto(novo[0]), None, novo[2].hex()
+        novo = next(novos, None)
+
+def _grupo(chaves, atual, tamanho_digest):
+    """Consome as chaves com o mesmo digest de `atual`; retorna (caminhos, próxima chave)"""
+    digest = atual[:tamanho_digest]
+    caminhos = [atual[tamanho_digest:]]
+    for chave in chaves:
+        if chave[:tamanho_digest] != digest:
+            return caminhos, chave
+        caminhos.append(chave[tamanho_digest:])
+    return caminhos, None
+
+def _por_hash(antigos, novos, tamanho_digest, identicos, resumo):
+    """Intercala duas sequências de chaves digest + caminho, agrupadas pelo digest"""
+    antigo = next(antigos, None)
+    novo = next(novos, None)
+    while antigo is not None or novo is not None:
+        digest_antigo = antigo[:tamanho_digest] if antigo is not None else None
+        digest_novo = novo[:tamanho_digest] if novo is not None else None
+
+        if novo is None or (antigo is not None and digest_antigo < digest_novo):
+            caminhos, antigo = _grupo(antigos, antigo, tamanho_digest)
+            resumo['removido'] += len(caminhos)
+            for caminho in caminhos:
+                yield 'removido', _texto(caminho), digest_antigo.hex(), None
+        elif antigo is None or digest_novo < digest_antigo:
+            caminhos, novo = _grupo(novos, novo, tamanho_digest)
+            resumo['adicionado'] += len(caminhos)
+            for caminho in caminhos:
+                yield 'adicionado', _texto(caminho), None, digest_novo.hex()
+        else:
+            _, antigo = _grupo(antigos, antigo, tamanho_digest)
+            caminhos, novo = _grupo(novos, novo, tamanho_digest)
+            resumo['identico'] += len(caminhos)
+            if identicos:
+                hash_valor = digest_novo.hex()
+                for caminho in caminhos:
+                    yield 'identico', _texto(caminho), hash_valor, hash_valor
+
+def comparar_manifestos(antigo, novo, por='caminho', identicos=False, resumo=None,
+                        tamanho_run=TAMANHO_RUN_PADRAO, diretorio_temporario=None):
+    """
+    Compara duas listas de hashes ou manifestos em memória limitada
+
+    Por caminho, cada caminho é 'adicionado', 'removido', 'alterado' (hash
+    diferente) ou 'identico'. Por hash, só o conteúdo importa: um hash presente
+    apenas no antigo é 'removido', apenas no novo é 'adicionado', e nos dois é
+    'identico' (com os caminhos do novo); arquivos renomeados não aparecem
+    como diferença.
+
+    Args:
+        antigo (str | iterable): Manifesto, lista de hashes (um por linha) ou
+            iterável de tuplas (caminho, hash) / hashes
+        novo (str | iterable): Idem, para a versão nova
+        por (str): 'caminho' ou 'hash'
+        identicos (bool): Inclui as entradas idênticas no resultado
+        resumo (Counter): Se informado, recebe a contagem de cada situação,
+            inclusive das idênticas omitidas
+        tamanho_run (int): Entradas ordenadas em memória por vez
+        diretorio_temporario (str): Onde gravar os arquivos da ordenação externa
+
+    Yields:
+        tuple: (situação, caminho, hash antigo ou None, hash novo ou None), na
+            ordem dos caminhos (por caminho) ou dos hashes (por hash)
+
+    Raises:
+        ValueError: Se `por` for inválido, um hash for inválido ou as listas
+            usarem algoritmos (tamanhos de digest) diferentes
+    """
+    if por not in ('caminho', 'hash'):
+        raise ValueError("O critério de comparação deve ser 'caminho' ou 'hash'")
+    if resumo is None:
+        resumo = Counter()
+
+    with tempfile.TemporaryDirectory(prefix='diferenca_hash_', dir=diretorio_temporario) as temporario:
+        if isinstance(antigo, str) and isinstance(novo, str):
+            # Dois arquivos: cada lado é lido e ordenado em um processo
+            with ProcessPoolExecutor(max_workers=2) as executor:
+                futuros = [executor.submit(_preparar_lado, fonte, por, tamanho_run, temporario, nome, False)
+                           for fonte, nome in ((antigo, 'antigo'), (novo, 'novo'))]
+                lados = [futuro.result() for futuro in futuros]
+        else:
+            lados = [_preparar_lado(fonte, por, tamanho_run, temporario, nome)
+                     for fonte, nome in ((antigo, 'antigo'), (novo, 'novo'))]
+
+        tamanhos = {tamanho for *_, tamanho in lados if tamanho is not None}
+        if len(tamanhos) > 1:
+            raise ValueError("As listas usam algoritmos diferentes (tamanhos de digest diferentes)")
+        antigos, novos = (_intercalar(runs, atual, em_sequencia) for runs, atual, em_sequencia, _ in lados)
+
+        if por == 'caminho':
+            yield from _por_caminho(antigos, novos, identicos, resumo)
+        else:
+            yield from _por_hash(antigos, novos, next(iter(tamanhos), 0), identicos, resumo)
+
+def main(argv=None):
+    """Compara dois manifestos ou listas de hashes pela linha de comando"""
+    parser = argparse.ArgumentParser(description="Comparação em massa de manifestos e listas de hashes")
+    parser.add_argument('antigo', help="Manifesto ou lista de hashes antiga")
+    parser.add_argument('novo', help="Manifesto ou lista de hashes nova")
+    parser.add_argument('--por', choices=('caminho', 'hash'), default='caminho',
+                        help="Critério de comparação (padrão: caminho)")
+    parser.add_argument('-i', '--identicos', action='store_true', help="Lista também as entradas idênticas")
+    parser.add_argument('-f', '--formato', choices=('texto', 'json'), default='texto',
+                        help="json: uma linha por entrada")
+    parser.add_argument('--resumo', action='store_true', help="Mostra apenas a contagem por situação")
+    parser.add_argument('--temporario', default=None, help="Diretório dos arquivos temporários")
+    args = parser.parse_args(argv)
+
+    resumo = Counter()
+    try:
+        diferencas = comparar_manifestos(args.antigo, args.novo, args.por, args.identicos and not args.resumo,
+                                         resumo, diretorio_temporario=args.temporario)
+        linhas = []
+        for situacao, caminho, hash_antigo, hash_novo in diferencas:
+            if args.resumo:
+                continue
+            if args.formato == 'json':
+                linhas.append(json.dumps({'situacao': situacao, 'caminho': caminho,
+                                          'hash_antigo': hash_antigo, 'hash_novo': hash_novo},
+                                         ensure_ascii=False))
+            else:
+                linhas.append(f"{caminho or hash_antigo or hash_novo}: {situacao.upper()}")
+            if len(linhas) >= 10000:
+                print('\n'.join(linhas))
+                linhas = []
+        if linhas:
+            print('\n'.join(linhas))
+    except (OSError, ValueError) as e:
+        print(f"Erro: {str(e)}", file=sys.stderr)
+        return 2
+
+    print(', '.join(f"{resumo[situacao]} {situacao}s" for situacao in SITUACOES), file=sys.stderr)
+    return 1 if resumo['adicionado'] or resumo['removido'] or resumo['alterado'] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,541 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Geração de hashes distribuída entre várias máquinas
+Um coordenador divide uma lista de arquivos (ou os blocos de uma árvore
+Merkle de um arquivo enorme) em unidades de trabalho; workers em outras
+máquinas, com acesso ao mesmo armazenamento, pedem unidades, geram os hashes
+e devolvem os resultados pela mesma conexão TCP.
+
+Protocolo: uma mensagem JSON por linha. O worker envia 'ola' e 'pedir'; o
+coordenador responde 'unidade', 'aguardar' ou 'fim'; o worker devolve
+'resultado' ou 'falha', que valem também como pedido da próxima unidade.
+Unidades de workers que caem ou falham voltam para a fila (até
+max_tentativas); quando a fila acaba, workers ociosos recebem cópias das
+unidades em execução há mais tempo, e vale o primeiro resultado.
+
+O protocolo não é cifrado: use apenas em redes confiáveis, com `segredo`.
+"""
+
+import argparse
+import hmac
+import json
+import multiprocessing
+import os
+import socket
+import socketserver
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from gerador_hash import gerar_hash_arquivo, ler_tamanho, listar_arquivos
+from hash_arvore import combinar_blocos, gerar_hash_blocos, TAMANHO_BLOCO_ARVORE
+
+PORTA_PADRAO = 9471
+ARQUIVOS_POR_UNIDADE = 64
+BLOCOS_POR_UNIDADE = 4
+MAX_TENTATIVAS = 3
+# Máximo de workers executando a mesma unidade ao mesmo tempo (original + cópias)
+MAX_COPIAS = 2
+# Segundos que um worker espera antes de pedir trabalho de novo
+ESPERA_WORKER = 0.5
+
+def _enviar(escritor, mensagem):
+    escritor.write(json.dumps(mensagem).encode('utf-8') + b'\n')
+    escritor.flush()
+
+def _local(base, caminho):
+    """Converte o caminho de uma unidade ('/' como separador) para o sistema local"""
+    caminho = caminho.replace('/', os.sep)
+    return os.path.join(base, caminho) if base else caminho
+
+class _Atendente(socketserver.StreamRequestHandler):
+    """Atende a conexão de um worker"""
+
+    def handle(self):
+        self.server.coordenador._atender(self.rfile, self.wfile)
+
+class _Servidor(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+class CoordenadorHash:
+    """
+    Distribui unidades de trabalho entre workers conectados por TCP
+
+    Uso:
+        coordenador = CoordenadorHash(porta=9471)
+        coordenador.adicionar_diretorio('/dados/compartilhado')
+        coordenador.iniciar()
+        relatorio = coordenador.aguardar()
+    """
+
+    def __init__(self, host='0.0.0.0', porta=PORTA_PADRAO, max_tentativas=MAX_TENTATIVAS, segredo=None):
+        """
+        Args:
+            host (str): Endereço em que o coordenador escuta
+            porta (int): Porta TCP (0 escolhe uma porta livre)
+            max_tentativas (int): Falhas de uma unidade antes de desistir dela
+            segredo (str): Se informado, os workers precisam enviar o mesmo valor
+        """
+        self.host = host
+        self.porta = porta
+        self.max_tentativas = max_tentativas
+        self.segredo = segredo
+        self.workers = {}
+        self.copias = 0
+        self._trava = threading.Condition()
+        self._unidades = {}
+        self._fila = deque()
+        self._em_execucao = set()
+        self._resultados = {}
+        self._falhas = {}
+        self._arvores = {}
+        self._sem_novas = False
+        self._conexoes = 0
+        self._servidor = None
+        self._inicio = None
+
+    def _nova_unidade(self, tarefa):
+        with self._trava:
+            identificador = len(self._unidades)
+            self._unidades[identificador] = {'tarefa': tarefa, 'tentativas': 0, 'executando': {}}
+            self._fila.append(identificador)
+            self._trava.notify_all()
+
+    def adicionar_arquivos(self, caminhos, algoritmo='sha256', diretorio_base=None,
+                           arquivos_por_unidade=ARQUIVOS_POR_UNIDADE):
+        """
+        Adiciona arquivos a serem processados
+
+        Args:
+            caminhos (iterable): Caminhos relativos a `diretorio_base` (com '/') ou absolutos
+            algoritmo (str | list): Algoritmo de hash ou lista de algoritmos
+            diretorio_base (str): Diretório a que os caminhos se referem; os workers
+                podem substituí-lo pelo ponto de montagem local
+            arquivos_por_unidade (int): Arquivos por unidade de trabalho
+
+        Returns:
+            int: Número de arquivos adicionados
+        """
+        base = os.path.abspath(diretorio_base) if diretorio_base else ''
+        total = 0
+        lote = []
+        for caminho in caminhos:
+            lote.append(caminho)
+            total += 1
+            if len(lote) >= arquivos_por_unidade:
+                self._nova_unidade({'tipo': 'arquivos', 'base': base, 'caminhos': lote,
+                                    'algoritmo': algoritmo})
+                lote = []
+        if lote:
+            self._nova_unidade({'tipo': 'arquivos', 'base': base, 'caminhos': lote,
+                                'algoritmo': algoritmo})
+        return total
+
+    def adicionar_diretorio(self, diretorio, algoritmo='sha256', incluir=None, excluir=None,
+                            arquivos_por_unidade=ARQUIVOS_POR_UNIDADE):
+        """
+        Adiciona todos os arquivos de um diretório (caminhos relativos a ele)
+
+        Returns:
+            int: Número de arquivos adicionados
+        """
+        relativos = (os.path.relpath(caminho, diretorio).replace(os.sep, '/')
+                     for caminho in listar_arquivos(diretorio, incluir, excluir))
+        return self.adicionar_arquivos(relativos, algoritmo, diretorio, arquivos_por_unidade)
+
+    def adicionar_arvore(self, caminho_arquivo, algoritmo='sha256', tamanho_bloco=TAMANHO_BLOCO_ARVORE,
+                         blocos_por_unidade=BLOCOS_POR_UNIDADE):
+        """
+        Divide o hash em árvore (Merkle) de um arquivo enorme entre os workers
+
+        O resultado em relatorio['arvores'][caminho_arquivo] tem o mesmo formato
+        de hash_arvore.gerar_hash_arvore.
+
+        Returns:
+            int: Número de blocos
+        """
+        if tamanho_bloco <= 0:
+            raise ValueError("O tamanho do bloco deve ser positivo")
+        tamanho = os.path.getsize(caminho_arquivo)
+        total = max(1, -(-tamanho // tamanho_bloco))
+        absoluto = os.path.abspath(caminho_arquivo)
+        with self._trava:
+            self._arvores[caminho_arquivo] = {'algoritmo': algoritmo.lower(), 'tamanho_bloco': tamanho_bloco,
+                                              'tamanho': tamanho, 'blocos': [None] * total}
+        for inicio in range(0, total, blocos_por_unidade):
+            self._nova_unidade({'tipo': 'blocos', 'base': os.path.dirname(absoluto),
+                                'caminho': os.path.basename(absoluto), 'chave': caminho_arquivo,
+                                'algoritmo': algoritmo, 'tamanho_bloco': tamanho_bloco,
+                                'indices': list(range(inicio, min(inicio + blocos_por_unidade, total)))})
+        return total
+
+    def iniciar(self):
+        """
+        Começa a aceitar workers em segundo plano
+
+        Returns:
+            tuple: (host, porta) em que o coordenador está escutando
+        """
+        self._inicio = time.monotonic()
+        self._servidor = _Servidor((self.host, self.porta), _Atendente)
+        self._servidor.coordenador = self
+        self.porta = self._servidor.server_address[1]
+        threading.Thread(target=self._servidor.serve_forever, name='coordenador-hash', daemon=True).start()
+        return self.host, self.porta
+
+    def _concluida(self, identificador):
+        return identificador in self._resultados or identificador in self._falhas
+
+    def _atribuir(self, worker):
+        """Escolhe a próxima mensagem para um worker (deve ser chamado com a trava)"""
+        while self._fila:
+            identificador = self._fila.popleft()
+            if self._concluida(identificador):
+                continue
+            self._unidades[identificador]['executando'][worker] = time.monotonic()
+            self._em_execucao.add(identificador)
+            return {'tipo': 'unidade', 'id': identificador,
+                    'tarefa': self._unidades[identificador]['tarefa']}
+
+        # Roubo de trabalho: copia a unidade em execução há mais tempo
+        candidatos = []
+        for identificador in self._em_execucao:
+            executando = self._unidades[identificador]['executando']
+            if worker not in executando and len(executando) < MAX_COPIAS:
+                candidatos.append((min(executando.values()), identificador))
+        if candidatos:
+            _, identificador = min(candidatos)
+            self._unidades[identificador]['executando'][worker] = time.monotonic()
+            self.copias += 1
+            return {'tipo': 'unidade', 'id': identificador,
+                    'tarefa': self._unidades[identificador]['tarefa']}
+
+        if self._sem_novas and len(self._resultados) + len(self._falhas) == len(self._unidades):
+            return {'tipo': 'fim'}
+        return {'tipo': 'aguardar', 'segundos': ESPERA_WORKER}
+
+    def _liberar(self, identificador, worker, mensagem=None):
+        """
+        Retira o worker da unidade; se ninguém mais a executa, ela volta para a
+        fila ou, esgotadas as tentativas, é registrada como falha
+        """
+        unidade = self._unidades.get(identificador)
+        if unidade is None or unidade['executando'].pop(worker, None) is None:
+            return
+        if self._concluida(identificador):
+            return
+        if mensagem is not None or not unidade['executando']:
+            unidade['tentativas'] += 1
+        if unidade['executando']:
+            return
+        self._em_execucao.discard(identificador)
+        if unidade['tentativas'] >= self.max_tentativas:
+            self._falhas[identificador] = mensagem or "Worker desconectado durante a execução"
+            self._trava.notify_all()
+        else:
+            self._fila.appendleft(identificador)
+
+    def _registrar_resultado(self, worker, identificador, resultados):
+        unidade = self._unidades.get(identificador)
+        if unidade is None:
+            return
+        unidade['executando'].pop(worker, None)
+        if self._concluida(identificador):
+            return
+        self._resultados[identificador] = resultados
+        self._em_execucao.discard(identificador)
+        estatisticas = self.workers[worker]
+        estatisticas['unidades'] += 1
+        estatisticas['itens'] += len(resultados)
+        self._trava.notify_all()
+
+    def _atender(self, leitor, escritor):
+        """Conversa com um worker até a conexão ser encerrada"""
+        worker = None
+        try:
+            for linha in leitor:
+                mensagem = json.loads(linha)
+                tipo = mensagem.get('tipo')
+
+                if worker is None:
+                    segredo = mensagem.get('segredo')
+                    if not isinstance(segredo, str):
+                        segredo = ''
+                    # compare_digest só aceita str ASCII; em bytes qualquer texto é comparável
+                    if tipo != 'ola' or (self.segredo is not None and not hmac.compare_digest(
+                            segredo.encode('utf-8', 'surrogateescape'),
+                            self.segredo.encode('utf-8', 'surrogateescape'))):
+                        _enviar(escritor, {'tipo': 'erro', 'mensagem': "Worker não autorizado"})
+                        return
+                    with self._trava:
+                        self._conexoes += 1
+                        worker = f"{mensagem.get('worker', 'worker')}#{self._conexoes}"
+                        self.workers[worker] = {'unidades': 0, 'itens': 0}
+                    continue
+
+                with self._trava:
+                    if tipo == 'resultado':
+                        self._registrar_resultado(worker, mensagem['id'], mensagem['resultados'])
+                    elif tipo == 'falha':
+                        self._liberar(mensagem['id'], worker, mensagem.get('mensagem') or "Falha no worker")
+                    elif tipo != 'pedir':
+                        continue
+                    resposta = self._atribuir(worker)
+                _enviar(escritor, resposta)
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            # Mensagem malformada: encerra só esta conexão
+            pass
+        finally:
+            if worker is not None:
+                with self._trava:
+                    for identificador in list(self._em_execucao):
+                        self._liberar(identificador, worker)
+
+    def aguardar(self, timeout=None):
+        """
+        Indica que não haverá novas unidades e espera todas terminarem
+
+        Args:
+            timeout (float): Segundos máximos de espera (None espera indefinidamente)
+
+        Returns:
+            dict: Relatório com 'arquivos' [(caminho, hash)], 'arvores' {caminho: árvore},
+                'erros' [(caminho, mensagem)], 'workers' {worker: estatísticas},
+                'copias' (unidades executadas em duplicidade) e 'tempo'
+
+        Raises:
+            TimeoutError: Se as unidades não terminarem dentro de `timeout`
+        """
+        with self._trava:
+            self._sem_novas = True
+            terminou = self._trava.wait_for(
+                lambda: len(self._resultados) + len(self._falhas) == len(self._unidades), timeout)
+            if not terminou:
+                raise TimeoutError("Unidades de trabalho não terminaram no tempo limite")
+            return self._montar_relatorio()
+
+    def _montar_relatorio(self):
+        arquivos = []
+        erros = []
+        arvores = {chave: dict(arvore, blocos=list(arvore['blocos'])) for chave, arvore in self._arvores.items()}
+
+        for identificador, unidade in self._unidades.items():
+            tarefa = unidade['tarefa']
+            falha = self._falhas.get(identificador)
+            if tarefa['tipo'] == 'arquivos':
+                if falha is not None:
+                    erros.extend((caminho, falha) for caminho in tarefa['caminhos'])
+                    continue
+                for caminho, hash_valor in self._resultados[identificador]:
+                    if isinstance(hash_valor, str) and hash_valor.startswith('Erro'):
+                        erros.append((caminho, hash_valor))
+                    else:
+                        arquivos.append((caminho, hash_valor))
+            else:
+                if falha is not None:
+                    erros.append((tarefa['chave'], f"Blocos {tarefa['indices']}: {falha}"))
+                    continue
+                for indice, hash_valor in zip(tarefa['indices'], self._resultados[identificador]):
+                    arvores[tarefa['chave']]['blocos'][indice] = hash_valor
+
+        for arvore in arvores.values():
+            arvore['tipo'] = f"merkle-{arvore['algoritmo']}"
+            if None in arvore['blocos']:
+                arvore['raiz'] = None
+            else:
+                arvore['raiz'] = combinar_blocos([bytes.fromhex(h) for h in arvore['blocos']],
+                                                 arvore['algoritmo']).hex()
+
+        arquivos.sort(key=lambda item: item[0])
+        return {
+            'arquivos': arquivos,
+            'arvores': arvores,
+            'erros': erros,
+            'workers': {worker: dict(dados) for worker, dados in self.workers.items()},
+            'copias': self.copias,
+            'tempo': time.monotonic() - self._inicio if self._inicio else 0.0,
+        }
+
+    def fechar(self):
+        """Encerra o servidor; workers conectados recebem o fim da conexão"""
+        if self._servidor is not None:
+            self._servidor.shutdown()
+            self._servidor.server_close()
+            self._servidor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.fechar()
+
+def _executar_tarefa(tarefa, diretorio_base, executor, workers):
+    """Executa uma unidade de trabalho no worker"""
+    base = diretorio_base if diretorio_base is not None else tarefa['base']
+    if tarefa['tipo'] == 'arquivos':
+        caminhos = tarefa['caminhos']
+        hashes = executor.map(lambda caminho: gerar_hash_arquivo(_local(base, caminho), tarefa['algoritmo']),
+                              caminhos)
+        return [[caminho, hash_valor] for caminho, hash_valor in zip(caminhos, hashes)]
+    if tarefa['tipo'] == 'blocos':
+        return gerar_hash_blocos(_local(base, tarefa['caminho']), tarefa['indices'], tarefa['algoritmo'],
+                                 tarefa['tamanho_bloco'], workers)
+    raise ValueError(f"Tipo de unidade '{tarefa['tipo']}' desconhecido")
+
+def _conectar(host, porta, tentativas):
+    """Conecta ao coordenador, tentando novamente enquanto ele não está no ar"""
+    for tentativa in range(tentativas):
+        try:
+            return socket.create_connection((host, porta))
+        except OSError:
+            if tentativa == tentativas - 1:
+                raise
+            time.sleep(1)
+
+def executar_worker(host, porta=PORTA_PADRAO, diretorio_base=None, workers=None, nome=None,
+                    segredo=None, tentativas_conexao=5):
+    """
+    Processa unidades de um coordenador até receber 'fim' ou a conexão cair
+
+    Args:
+        host (str): Endereço do coordenador
+        porta (int): Porta do coordenador
+        diretorio_base (str): Ponto de montagem local do diretório do coordenador
+            (padrão: o mesmo caminho usado no coordenador)
+        workers (int): Threads locais por unidade (padrão: número de CPUs)
+        nome (str): Identificação do worker (padrão: máquina-pid)
+        segredo (str): Segredo compartilhado com o coordenador
+        tentativas_conexao (int): Tentativas de conexão, com 1 s entre elas
+
+    Returns:
+        int: Número de unidades processadas
+
+    Raises:
+        PermissionError: Se o coordenador recusar o worker
+    """
+    workers = workers or os.cpu_count() or 1
+    nome = nome or f"{socket.gethostname()}-{os.getpid()}"
+    processadas = 0
+
+    with _conectar(host, porta, tentativas_conexao) as conexao, \
+            ThreadPoolExecutor(max_workers=workers) as executor:
+        leitor = conexao.makefile('rb')
+        escritor = conexao.makefile('wb')
+        _enviar(escritor, {'tipo': 'ola', 'worker': nome, 'segredo': segredo})
+        _enviar(escritor, {'tipo': 'pedir'})
+
+        for linha in leitor:
+            mensagem = json.loads(linha)
+            tipo = mensagem['tipo']
+            if tipo == 'fim':
+                break
+            if tipo == 'erro':
+                raise PermissionError(mensagem['mensagem'])
+            if tipo == 'aguardar':
+                time.sleep(mensagem['segundos'])
+                _enviar(escritor, {'tipo': 'pedir'})
+                continue
+
+            try:
+                resultados = _executar_tarefa(mensagem['tarefa'], diretorio_base, executor, workers)
+            except Exception as e:
+                _enviar(escritor, {'tipo': 'falha', 'id': mensagem['id'], 'mensagem': str(e)})
+            else:
+                _enviar(escritor, {'tipo': 'resultado', 'id': mensagem['id'], 'resultados': resultados})
+                processadas += 1
+    return processadas
+
+def _ler_endereco(texto):
+    host, _, porta = texto.rpartition(':')
+    return (host or '127.0.0.1'), int(porta or PORTA_PADRAO)
+
+def main(argv=None):
+    """Executa um coordenador ou um worker pela linha de comando"""
+    parser = argparse.ArgumentParser(description="Geração de hashes distribuída entre máquinas")
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+
+    coordenador = subparsers.add_parser('coordenador', help="Distribui o trabalho e monta o relatório")
+    coordenador.add_argument('diretorio', nargs='?', help="Diretório cujos arquivos serão processados")
+    coordenador.add_argument('--arvore', action='append', default=[],
+                             help="Arquivo enorme processado como árvore Merkle (pode repetir)")
+    coordenador.add_argument('-b', '--bloco', type=ler_tamanho, default=TAMANHO_BLOCO_ARVORE,
+                             help="Tamanho do bloco das árvores, ex.: 64M (padrão)")
+    coordenador.add_argument('-a', '--algoritmo', default='sha256')
+    coordenador.add_argument('--host', default='0.0.0.0')
+    coordenador.add_argument('-p', '--porta', type=int, default=PORTA_PADRAO)
+    coordenador.add_argument('--unidade', type=int, default=ARQUIVOS_POR_UNIDADE,
+                             help="Arquivos por unidade de trabalho")
+    coordenador.add_argument('--excluir', action='append', default=[])
+    coordenador.add_argument('--locais', type=int, default=0,
+                             help="Inicia esta quantidade de workers locais (para testes)")
+    coordenador.add_argument('--segredo', default=os.environ.get('GERADOR_HASH_SEGREDO'))
+    coordenador.add_argument('-o', '--saida', help="Grava o relatório completo em JSON")
+
+    worker = subparsers.add_parser('worker', help="Processa unidades de um coordenador")
+    worker.add_argument('endereco', help="host:porta do coordenador")
+    worker.add_argument('-d', '--diretorio-base', default=None,
+                        help="Ponto de montagem local do diretório do coordenador")
+    worker.add_argument('-j', '--workers', type=int, default=None)
+    worker.add_argument('--segredo', default=os.environ.get('GERADOR_HASH_SEGREDO'))
+
+    args = parser.parse_args(argv)
+
+    if args.comando == 'worker':
+        host, porta = _ler_endereco(args.endereco)
+        try:
+            processadas = executar_worker(host, porta, args.diretorio_base, args.workers,
+                                          segredo=args.segredo)
+        except (OSError, ValueError) as e:
+            print(f"Erro: {str(e)}", file=sys.stderr)
+            return 1
+        print(f"{processadas} unidades processadas", file=sys.stderr)
+        return 0
+
+    if not args.diretorio and not args.arvore:
+        parser.error("informe um diretório e/ou --arvore")
+
+    with CoordenadorHash(args.host, args.porta, segredo=args.segredo) as coordenador:
+        if args.diretorio:
+            coordenador.adicionar_diretorio(args.diretorio, args.algoritmo, excluir=args.excluir,
+                                            arquivos_por_unidade=args.unidade)
+        for caminho in args.arvore:
+            coordenador.adicionar_arvore(caminho, args.algoritmo, args.bloco)
+        host, porta = coordenador.iniciar()
+        print(f"Coordenador escutando em {host}:{porta}", file=sys.stderr)
+
+        locais = [multiprocessing.Process(target=executar_worker, args=('127.0.0.1', porta),
+                                          kwargs={'segredo': args.segredo}, daemon=True)
+                  for _ in range(args.locais)]
+        for processo in locais:
+            processo.start()
+
+        try:
+            relatorio = coordenador.aguardar()
+        except KeyboardInterrupt:
+            return 1
+        for processo in locais:
+            processo.join(timeout=5)
+
+    for caminho, hash_valor in relatorio['arquivos']:
+        if isinstance(hash_valor, dict):
+            hash_valor = ' '.join(hash_valor.values())
+        print(f"{hash_valor}  {caminho}")
+    for caminho, arvore in relatorio['arvores'].items():
+        print(f"{arvore['raiz'] or '-'}  {caminho}  ({arvore['tipo']}, {len(arvore['blocos'])} blocos)")
+    for caminho, mensagem in relatorio['erros']:
+        print(f"{caminho}: ERRO ({mensagem})", file=sys.stderr)
+    print(f"{len(relatorio['arquivos'])} arquivos, {len(relatorio['erros'])} erros, "
+          f"{len(relatorio['workers'])} workers, {relatorio['copias']} cópias, "
+          f"{relatorio['tempo']:.1f} s", file=sys.stderr)
+
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as saida:
+            json.dump(relatorio, saida, indent=1)
+    return 1 if relatorio['erros'] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Localizador de arquivos duplicados
+Compara os arquivos em etapas para ler o mínimo possível do disco:
+1. agrupa por tamanho (arquivos com tamanho único não podem ter duplicatas)
+2. compara um hash das primeiras e últimas KiB de cada arquivo
+3. gera o hash completo apenas dos candidatos restantes
+"""
+
+import argparse
+import os
+import sys
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from gerador_hash import criar_objeto_hash, gerar_hash_arquivo, gerar_hashes_lote, listar_arquivos
+
+TAMANHO_AMOSTRA_PADRAO = 4096
+
+def _agrupar_por_tamanho(caminhos, incluir=None, excluir=None, tamanho_minimo=1):
+    """
+    Agrupa os caminhos por inode e depois os inodes por tamanho
+
+    Hard links apontam para o mesmo conteúdo: cada inode é lido uma única vez,
+    por meio do primeiro caminho encontrado.
+
+    Returns:
+        dict: {tamanho: [[caminhos de um inode], ...]}
+    """
+    inodes = {}
+    for caminho in caminhos:
+        if os.path.isdir(caminho):
+            arquivos = listar_arquivos(caminho, incluir, excluir)
+        else:
+            arquivos = [caminho]
+        for arquivo in arquivos:
+            try:
+                info = os.stat(arquivo)
+            except OSError:
+                continue
+            if info.st_size < tamanho_minimo:
+                continue
+            tamanho, links = inodes.setdefault((info.st_dev, info.st_ino), (info.st_size, []))
+            if arquivo not in links:
+                links.append(arquivo)
+
+    grupos = defaultdict(list)
+    for tamanho, links in inodes.values():
+        grupos[tamanho].append(links)
+    return grupos
+
+def _hash_amostra(caminho, tamanho, tamanho_amostra, algoritmo):
+    """
+    Gera o hash do início e do fim de um arquivo
+
+    Arquivos com até duas amostras de tamanho são lidos por inteiro; nesse caso
+    o hash retornado já é o hash completo do arquivo.
+
+    Returns:
+        tuple: (completo, hash) ou (None, mensagem de erro) se a leitura falhar
+    """
+    try:
+        with open(caminho, 'rb') as arquivo:
+            if tamanho <= 2 * tamanho_amostra:
+                return True, gerar_hashes_lote([arquivo.read()], algoritmo)[0]
+            inicio = arquivo.read(tamanho_amostra)
+            arquivo.seek(-tamanho_amostra, os.SEEK_END)
+            return False, gerar_hashes_lote([inicio + arquivo.read(tamanho_amostra)], algoritmo)[0]
+    except OSError as e:
+        return None, f"Erro ao ler '{caminho}': {str(e)}"
+
+def encontrar_duplicados(caminhos, algoritmo='sha256', tamanho_amostra=TAMANHO_AMOSTRA_PADRAO,
+                         workers=None, incluir=None, excluir=None, tamanho_minimo=1):
+    """
+    Encontra grupos de arquivos com conteúdo idêntico
+
+    Args:
+        caminhos (str | list): Diretório, arquivo ou lista de diretórios/arquivos
+        algoritmo (str): Algoritmo de hash usado nas comparações
+        tamanho_amostra (int): Bytes lidos do início e do fim na etapa de amostragem
+        workers (int): Threads de leitura (padrão: número de CPUs)
+        incluir (list): Padrões glob de arquivos a incluir
+        excluir (list): Padrões glob de arquivos/diretórios a excluir
+        tamanho_minimo (int): Ignora arquivos menores que isso (padrão: ignora vazios)
+
+    Returns:
+        list: Grupos de duplicados, do maior espaço desperdiçado para o menor, como
+            dicts {'tamanho': int, 'hash': str, 'arquivos': [caminhos], 'inodes': int};
+            'inodes' conta as cópias reais (hard links do mesmo inode não ocupam espaço)
+
+    Raises:
+        ValueError: Se o algoritmo não for suportado
+    """
+    if isinstance(caminhos, str):
+        caminhos = [caminhos]
+    workers = workers or os.cpu_count() or 1
+    criar_objeto_hash(algoritmo)
+
+    # Etapa 1: tamanho. Inodes com vários hard links já são duplicados entre si e
+    # são guardados para o caso de o conteúdo não coincidir com o de outro inode.
+    finais = defaultdict(list)
+    com_links = []
+    tarefas = []
+    for tamanho, grupo in _agrupar_por_tamanho(caminhos, incluir, excluir, tamanho_minimo).items():
+        if len(grupo) > 1:
+            tarefas.extend((tamanho, links) for links in grupo)
+        elif len(grupo[0]) > 1:
+            com_links.append((tamanho, grupo[0]))
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # Etapa 2: início e fim do arquivo (um representante por inode)
+        amostras = executor.map(lambda t: _hash_amostra(t[1][0], t[0], tamanho_amostra, algoritmo),
+                                tarefas)
+        por_amostra = defaultdict(list)
+        for (tamanho, links), (completo, hash_valor) in zip(tarefas, amostras):
+            if completo is not None:
+                por_amostra[(tamanho, completo, hash_valor)].append(links)
+
+        # Etapa 3: hash completo apenas onde a amostra coincide
+        pendentes = []
+        for (tamanho, completo, hash_valor), grupo in por_amostra.items():
+            if completo:
+                finais[(tamanho, hash_valor)].extend(grupo)
+            elif len(grupo) > 1:
+                pendentes.extend((tamanho, links) for links in grupo)
+            elif len(grupo[0]) > 1:
+                com_links.append((tamanho, grupo[0]))
+        completos = executor.map(lambda t: gerar_hash_arquivo(t[1][0], algoritmo), pendentes)
+        for (tamanho, links), hash_valor in zip(pendentes, completos):
+            if not hash_valor.startswith('Erro'):
+                finais[(tamanho, hash_valor)].append(links)
+
+        hashes_links = executor.map(lambda t: gerar_hash_arquivo(t[1][0], algoritmo), com_links)
+        for (tamanho, links), hash_valor in zip(com_links, hashes_links):
+            if not hash_valor.startswith('Erro'):
+                finais[(tamanho, hash_valor)].append(links)
+
+    duplicados = []
+    for (tamanho, hash_valor), grupo in finais.items():
+        arquivos = sorted(caminho for links in grupo for caminho in links)
+        if len(arquivos) > 1:
+            duplicados.append({'tamanho': tamanho, 'hash': hash_valor, 'arquivos': arquivos,
+                               'inodes': len(grupo)})
+
+    duplicados.sort(key=lambda g: (-g['tamanho'] * (g['inodes'] - 1), g['arquivos'][0]))
+    return duplicados
+
+def main(argv=None):
+    """Lista os arquivos duplicados dos diretórios informados"""
+    parser = argparse.ArgumentParser(description="Encontra arquivos duplicados")
+    parser.add_argument('caminhos', nargs='+', help="Diretórios ou arquivos")
+    parser.add_argument('-a', '--algoritmo', default='sha256', help="Algoritmo de hash (padrão: sha256)")
+    parser.add_argument('-j', '--workers', type=int, default=None, help="Threads de leitura")
+    parser.add_argument('--amostra', type=int, default=TAMANHO_AMOSTRA_PADRAO,
+                        help=f"Bytes comparados no início e no fim (padrão: {TAMANHO_AMOSTRA_PADRAO})")
+    parser.add_argument('--excluir', action='append', default=[], help="Padrão glob a excluir")
+    args = parser.parse_args(argv)
+    try:
+        criar_objeto_hash(args.algoritmo)
+    except ValueError as e:
+        parser.error(str(e))
+
+    grupos = encontrar_duplicados(args.caminhos, args.algoritmo, args.amostra,
+                                  args.workers, excluir=args.excluir)
+    desperdicio = 0
+    for grupo in grupos:
+        # Hard links extras do mesmo inode não liberariam espaço se removidos
+        desperdicio += grupo['tamanho'] * (grupo['inodes'] - 1)
+        print(f"{grupo['hash']}  ({grupo['tamanho']} bytes)")
+        for caminho in grupo['arquivos']:
+            print(f"  {caminho}")
+    print(f"\n{len(grupos)} grupos de duplicados, {desperdicio} bytes em cópias", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
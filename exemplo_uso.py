@@ -47,11 +47,11 @@ def exemplo_hash_arquivo():
         print(f"\nArquivo criado: {arquivo_exemplo}")
         print(f"Conteúdo: {repr(conteudo)}")
         
-        # Gera hash do arquivo com diferentes algoritmos
+        # Gera hash do arquivo com diferentes algoritmos em uma única leitura
         algoritmos = ['md5', 'sha1', 'sha256', 'sha512']
+        hashes = gerar_hash_arquivo(arquivo_exemplo, algoritmos)
         
-        for algoritmo in algoritmos:
-            hash_resultado = gerar_hash_arquivo(arquivo_exemplo, algoritmo)
+        for algoritmo, hash_resultado in hashes.items():
             print(f"  {algoritmo.upper()}: {hash_resultado}")
         
         # Remove o arquivo de exemplo
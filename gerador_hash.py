@@ -2,76 +2,995 @@ import hashlib
 import os
 import sys
 import re
+import argparse
+import csv
+import errno
+import io
+import json
+import fnmatch
+import mmap
+import stat
+import time
+from collections import deque
+from functools import lru_cache, partial
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: sem O_DIRECT, o modo 'direto' usa a leitura comum
+    fcntl = None
+
+# Registro de algoritmos: construtores por nome (consulta rápida) e metadados
+_CONSTRUTORES = {}
+_ALGORITMOS = {}
+
+# Algoritmos com o tamanho da saída (em bits) no nome, ex.: blake2b-256, shake_128-256
+_ALGORITMO_PARAMETRIZADO = re.compile(r'(blake2b|blake2s|shake_128|shake_256)-(\d+)')
+_NOMES_PARAMETRIZADOS = {'blake2b': 'BLAKE2b', 'blake2s': 'BLAKE2s',
+                         'shake_128': 'SHAKE128', 'shake_256': 'SHAKE256'}
+# Maior saída aceita para SHAKE (o BLAKE2 já é limitado pelo hashlib a 512/256 bits)
+LIMITE_BITS_SHAKE = 8192
+
+class _ShakeComTamanho:
+    """
+    Adapta um algoritmo SHAKE (saída de tamanho variável) à interface dos
+    demais objetos hash, com o tamanho de saída fixado na criação
+    """
+    __slots__ = ('_obj', 'digest_size', 'update')
+    
+    def __init__(self, construtor, digest_size, dados=b''):
+        self._obj = construtor(dados)
+        self.digest_size = digest_size
+        self.update = self._obj.update
+    
+    @property
+    def name(self):
+        return f"{self._obj.name}-{self.digest_size * 8}"
+    
+    @property
+    def block_size(self):
+        return self._obj.block_size
+    
+    def digest(self):
+        return self._obj.digest(self.digest_size)
+    
+    def hexdigest(self):
+        return self._obj.hexdigest(self.digest_size)
+    
+    def copy(self):
+        copia = _ShakeComTamanho.__new__(_ShakeComTamanho)
+        copia._obj = self._obj.copy()
+        copia.digest_size = self.digest_size
+        copia.update = copia._obj.update
+        return copia
+
+def registrar_algoritmo(nome, construtor, descricao=None, familia=None, seguro=True, substituir=False):
+    """
+    Registra um algoritmo de hash para uso em todo o gerador (funções, CLI e GUI)
+    
+    Algoritmos registrados depois da importação do módulo não existem em
+    processos filhos iniciados com 'spawn' (gerar_hash_diretorio com usar_processos).
+    
+    Args:
+        nome (str): Nome do algoritmo (ex.: 'blake2b-256')
+        construtor (callable): Chamado com dados opcionais; retorna um objeto com
+            update(), digest(), hexdigest(), digest_size e block_size
+        descricao (str): Descrição exibida nos menus (padrão: nome em maiúsculas)
+        familia (str): Família do algoritmo (ex.: 'sha2', 'blake2')
+        seguro (bool): False para algoritmos com colisões conhecidas
+        substituir (bool): Permite substituir um algoritmo já registrado
+    
+    Returns:
+        dict: Metadados do algoritmo registrado
+    
+    Raises:
+        ValueError: Se o nome já estiver registrado e `substituir` for False
+    """
+    nome = nome.lower()
+    if nome in _ALGORITMOS and not substituir:
+        raise ValueError(f"Algoritmo '{nome}' já registrado")
+    
+    info = _criar_info(nome, construtor, descricao, familia, seguro)
+    _ALGORITMOS[nome] = info
+    _CONSTRUTORES[nome] = construtor
+    return dict(info)
+
+def _criar_info(nome, construtor, descricao=None, familia=None, seguro=True):
+    """Monta os metadados de um algoritmo a partir de um objeto de amostra"""
+    amostra = construtor()
+    return {
+        'nome': nome,
+        'descricao': descricao or nome.upper(),
+        'familia': familia or nome,
+        'tamanho_digest': amostra.digest_size,
+        'bits': amostra.digest_size * 8,
+        'tamanho_bloco': amostra.block_size,
+        'seguro': seguro,
+    }
+
+@lru_cache(maxsize=64)
+def _resolver_parametrizado(nome):
+    """
+    Resolve nomes como 'blake2b-160' ou 'shake_256-1024' sem registrá-los
+    
+    O cache é limitado para que nomes arbitrários (ex.: vindos do servidor HTTP)
+    não façam o registro nem a memória crescerem.
+    
+    Returns:
+        tuple: (construtor, metadados) ou None se o nome não for válido
+    """
+    correspondencia = _ALGORITMO_PARAMETRIZADO.fullmatch(nome)
+    if correspondencia is None:
+        return None
+    base, bits = correspondencia.group(1), int(correspondencia.group(2))
+    if bits <= 0 or bits % 8:
+        return None
+    
+    if base.startswith('shake'):
+        if bits > LIMITE_BITS_SHAKE:
+            return None
+        construtor = partial(_ShakeComTamanho, getattr(hashlib, base), bits // 8)
+        familia = 'shake'
+    else:
+        construtor = partial(getattr(hashlib, base), digest_size=bits // 8)
+        familia = 'blake2'
+    try:
+        info = _criar_info(nome, construtor, f"{_NOMES_PARAMETRIZADOS[base]} ({bits} bits)", familia)
+    except ValueError:
+        # Tamanho de saída fora do permitido pelo algoritmo (ex.: blake2s acima de 256 bits)
+        return None
+    return construtor, info
+
+def _obter_construtor(algoritmo):
+    """
+    Retorna o construtor registrado para o algoritmo especificado
+    
+    Nomes parametrizados não registrados (ex.: 'blake2b-160') são resolvidos
+    sem entrar no registro.
+    
+    Args:
+        algoritmo (str): Nome do algoritmo (ver listar_algoritmos)
+    
+    Returns:
+        Construtor do objeto hash (ex.: hashlib.sha256)
+    """
+    nome = algoritmo.lower()
+    construtor = _CONSTRUTORES.get(nome)
+    if construtor is None:
+        parametrizado = _resolver_parametrizado(nome)
+        if parametrizado is None:
+            raise ValueError(f"Algoritmo '{algoritmo}' não suportado")
+        construtor = parametrizado[0]
+    return construtor
+
+def listar_algoritmos(familia=None, apenas_seguros=False):
+    """
+    Lista os algoritmos registrados, na ordem de registro
+    
+    Args:
+        familia (str): Filtra por família (ex.: 'sha3', 'blake2')
+        apenas_seguros (bool): Omite algoritmos com colisões conhecidas (MD5, SHA1)
+    
+    Returns:
+        list: Dicts com 'nome', 'descricao', 'familia', 'tamanho_digest',
+            'bits', 'tamanho_bloco' e 'seguro'
+    """
+    return [dict(info) for info in _ALGORITMOS.values()
+            if (familia is None or info['familia'] == familia)
+            and (info['seguro'] or not apenas_seguros)]
+
+def obter_info_algoritmo(algoritmo):
+    """
+    Retorna os metadados de um algoritmo (nomes parametrizados são aceitos)
+    
+    Raises:
+        ValueError: Se o algoritmo não for suportado
+    """
+    nome = algoritmo.lower()
+    if nome in _ALGORITMOS:
+        return dict(_ALGORITMOS[nome])
+    parametrizado = _resolver_parametrizado(nome)
+    if parametrizado is None:
+        raise ValueError(f"Algoritmo '{algoritmo}' não suportado")
+    return dict(parametrizado[1])
+
+# Algoritmos registrados por padrão: (nome, descrição, família, seguro)
+_ALGORITMOS_PADRAO = [
+    ('md5', 'MD5', 'md5', False),
+    ('sha1', 'SHA1', 'sha1', False),
+    ('sha224', 'SHA224', 'sha2', True),
+    ('sha256', 'SHA256', 'sha2', True),
+    ('sha384', 'SHA384', 'sha2', True),
+    ('sha512', 'SHA512', 'sha2', True),
+    ('sha3_224', 'SHA3-224', 'sha3', True),
+    ('sha3_256', 'SHA3-256', 'sha3', True),
+    ('sha3_384', 'SHA3-384', 'sha3', True),
+    ('sha3_512', 'SHA3-512', 'sha3', True),
+    ('blake2b', 'BLAKE2b (512 bits)', 'blake2', True),
+    ('blake2s', 'BLAKE2s (256 bits)', 'blake2', True),
+]
+
+def _registrar_padroes():
+    for nome, descricao, familia, seguro in _ALGORITMOS_PADRAO:
+        registrar_algoritmo(nome, getattr(hashlib, nome), descricao, familia, seguro)
+    for nome in ('blake2b-256', 'shake_128-256', 'shake_256-512'):
+        construtor, info = _resolver_parametrizado(nome)
+        registrar_algoritmo(nome, construtor, info['descricao'], info['familia'])
+    
+    # Demais algoritmos que o OpenSSL local oferece (ex.: sha512_256, sm3, ripemd160)
+    for nome in sorted(hashlib.algorithms_available):
+        nome = nome.lower()
+        if nome in _ALGORITMOS or nome.startswith('shake') or nome == 'md5-sha1':
+            continue
+        construtor = partial(hashlib.new, nome)
+        try:
+            registrar_algoritmo(nome, construtor, familia='sha2' if nome.startswith('sha512_') else 'outros')
+        except ValueError:
+            # Listado pelo OpenSSL, mas indisponível (ex.: provedor legado desativado)
+            continue
+
+_registrar_padroes()
+
+def _atualizar_hash(atualizar, dados):
+    """
+    Alimenta um objeto hash com texto, buffer ou iterável de blocos sem cópias
+    
+    Objetos com protocolo de buffer (bytes, bytearray, memoryview, mmap, arrays
+    do numpy etc.) são entregues direto ao hashlib; só `str` precisa ser
+    codificado. Iteráveis são consumidos bloco a bloco.
+    
+    Args:
+        atualizar (callable): Método update do objeto hash
+        dados: str, objeto com protocolo de buffer ou iterável desses
+    """
+    if isinstance(dados, str):
+        dados = dados.encode('utf-8')
+    else:
+        try:
+            memoryview(dados).release()
+        except TypeError:
+            for bloco in dados:
+                _atualizar_hash(atualizar, bloco)
+            return
+    atualizar(dados)
 
 def gerar_hash(texto, algoritmo='sha256'):
     """
-    Gera hash de uma string usando o algoritmo especificado
+    Gera hash de uma string, buffer ou sequência de blocos
+    
+    Além de `str` (codificado em UTF-8), aceita qualquer objeto com protocolo de
+    buffer contíguo (bytes, bytearray, memoryview, mmap, arrays do numpy) sem
+    copiá-lo, e iteráveis ou geradores de blocos, consumidos um a um.
     
     Args:
-        texto (str): Texto para gerar o hash
-        algoritmo (str): Algoritmo de hash (md5, sha1, sha256, sha512)
+        texto (str | bytes-like | iterable): Dados para gerar o hash
+        algoritmo (str): Algoritmo de hash (ver listar_algoritmos)
     
     Returns:
         str: Hash gerado
     """
     try:
-        # Converte o texto para bytes
-        texto_bytes = texto.encode('utf-8')
-        
-        # Cria o objeto hash baseado no algoritmo
-        if algoritmo.lower() == 'md5':
-            hash_obj = hashlib.md5(texto_bytes)
-        elif algoritmo.lower() == 'sha1':
-            hash_obj = hashlib.sha1(texto_bytes)
-        elif algoritmo.lower() == 'sha256':
-            hash_obj = hashlib.sha256(texto_bytes)
-        elif algoritmo.lower() == 'sha512':
-            hash_obj = hashlib.sha512(texto_bytes)
-        else:
-            raise ValueError(f"Algoritmo '{algoritmo}' não suportado")
+        # Cria o objeto hash a partir do registro de algoritmos
+        hash_obj = _obter_construtor(algoritmo)()
+        _atualizar_hash(hash_obj.update, texto)
         
         return hash_obj.hexdigest()
     
     except Exception as e:
         return f"Erro ao gerar hash: {str(e)}"
 
-def gerar_hash_arquivo(caminho_arquivo, algoritmo='sha256'):
+def _obter_construtor_lote(algoritmo):
+    """
+    Retorna o construtor mais rápido para muitas entradas pequenas
+    
+    Os construtores do OpenSSL têm um custo fixo de inicialização que domina
+    o tempo em entradas curtas; as implementações embutidas do CPython são
+    preferidas quando existem. O atalho só vale enquanto o registro ainda usa o
+    construtor original do hashlib (um algoritmo substituído com
+    registrar_algoritmo é respeitado).
+    """
+    nome = algoritmo.lower()
+    construtor = _obter_construtor(nome)
+    if construtor is not getattr(hashlib, nome, None):
+        return construtor
+    # Função privada do hashlib: ausente em outras implementações ou versões
+    embutido = getattr(hashlib, '__get_builtin_constructor', None)
+    if embutido is None:
+        return construtor
+    try:
+        return embutido(nome)
+    except (TypeError, ValueError):
+        return construtor
+
+def gerar_hashes_lote(textos, algoritmo='sha256', binario=False, como_gerador=False):
+    """
+    Gera hashes de muitos textos de uma vez
+    
+    O algoritmo é resolvido uma única vez e cada item passa direto pelo
+    construtor do hashlib, sem o custo por chamada de gerar_hash. Itens `str`
+    são codificados em UTF-8; `bytes`, `bytearray`, `memoryview` e demais
+    objetos com protocolo de buffer são usados como estão, sem cópia.
+    Otimizado para muitos itens pequenos (IDs, linhas, chaves).
+    
+    Args:
+        textos (iterable): Textos (str) ou bytes para gerar o hash
+        algoritmo (str): Algoritmo de hash (ver listar_algoritmos)
+        binario (bool): Retorna os bytes do digest em vez do hexadecimal
+        como_gerador (bool): Retorna um gerador em vez de uma lista
+    
+    Returns:
+        list | generator: Hashes na mesma ordem dos textos
+    
+    Raises:
+        ValueError: Se o algoritmo não for suportado
+    """
+    construtor = _obter_construtor_lote(algoritmo)
+    if _observadores:
+        textos = _observar_lote(textos, algoritmo)
+    
+    if binario:
+        resultados = (construtor(item.encode('utf-8') if isinstance(item, str) else item).digest()
+                      for item in textos)
+    else:
+        resultados = (construtor(item.encode('utf-8') if isinstance(item, str) else item).hexdigest()
+                      for item in textos)
+    
+    return resultados if como_gerador else list(resultados)
+
+def _observar_lote(textos, algoritmo):
+    """Repassa os itens de gerar_hashes_lote contando-os e notifica o evento 'lote' no fim"""
+    inicio = time.perf_counter()
+    itens = total_bytes = 0
+    try:
+        for item in textos:
+            if isinstance(item, str):
+                item = item.encode('utf-8')
+            itens += 1
+            total_bytes += memoryview(item).nbytes
+            yield item
+    finally:
+        _notificar({'tipo': 'lote', 'algoritmo': algoritmo, 'itens': itens, 'bytes': total_bytes,
+                    'tempo_total': time.perf_counter() - inicio})
+
+# Leitura de arquivos: blocos grandes em um buffer reutilizável (readinto),
+# mapeamento em memória (mmap) para arquivos regulares grandes ou, em arquivos
+# esparsos, apenas os trechos com dados (esparso), com os buracos preenchidos
+# por um buffer de zeros. Para varreduras em massa que não devem ocupar o cache
+# de páginas: leitura sequencial com posix_fadvise descartando o que já foi
+# processado (streaming) ou leitura sem cache com O_DIRECT (direto).
+TAMANHO_BLOCO_PADRAO = 1024 * 1024
+TAMANHO_BLOCO_MMAP = 8 * 1024 * 1024
+LIMITE_MMAP = 64 * 1024 * 1024
+TAMANHO_BLOCO_ZEROS = 8 * 1024 * 1024
+# Bytes processados entre descartes do cache (DONTNEED) no modo streaming
+JANELA_STREAMING = 16 * 1024 * 1024
+# O_DIRECT exige buffer, posição e tamanho alinhados ao bloco lógico do dispositivo
+ALINHAMENTO_DIRETO = 4096
+MODOS_LEITURA = ('readinto', 'mmap', 'esparso', 'streaming', 'direto')
+
+class OperacaoCancelada(Exception):
+    """Indica que a geração do hash foi cancelada antes de terminar"""
+
+# Observadores chamados com um evento (dict) ao fim de cada hash de arquivo e de
+# diretório. Com a lista vazia nenhum tempo é medido no caminho principal.
+_observadores = []
+
+def adicionar_observador(observador):
+    """
+    Registra uma função chamada ao fim de cada gerar_hash_arquivo, gerar_hash_diretorio
+    e gerar_hashes_lote
+    
+    Eventos de arquivo ('tipo': 'arquivo') trazem 'caminho', 'algoritmos',
+    'bytes', 'modo_leitura', 'tamanho_bloco', 'tempo_total', 'tempo_leitura',
+    'tempo_hash' (segundos) e 'erro' (nome do tipo da exceção ou None). No modo
+    mmap a leitura do disco acontece dentro do hash, e é contada como hash.
+    Eventos de diretório ('tipo': 'diretorio') trazem 'caminho', 'arquivos',
+    'erros' e 'tempo_total'. Eventos de lote ('tipo': 'lote') trazem
+    'algoritmo', 'itens', 'bytes' e 'tempo_total'.
+    
+    O observador é chamado na thread que gerou o hash e deve ser rápido; com
+    usar_processos=True os eventos de arquivo ficam nos processos filhos.
+    Exceções levantadas pelo observador são ignoradas.
+    """
+    _observadores.append(observador)
+
+def remover_observador(observador):
+    """Remove um observador registrado com adicionar_observador"""
+    _observadores.remove(observador)
+
+def _notificar(evento):
+    for observador in list(_observadores):
+        try:
+            observador(evento)
+        except Exception:
+            pass
+
+def criar_objeto_hash(algoritmo):
+    """
+    Cria um objeto hash vazio para o algoritmo especificado
+    
+    Args:
+        algoritmo (str): Algoritmo de hash (ver listar_algoritmos)
+    
+    Returns:
+        Objeto hash do hashlib
+    """
+    return _obter_construtor(algoritmo)()
+
+def _escolher_leitura(info, tamanho_bloco=None, modo_leitura=None):
+    """
+    Escolhe o modo de leitura e o tamanho de bloco para um arquivo
+    
+    Args:
+        info (os.stat_result): Informações do arquivo aberto
+        tamanho_bloco (int): Tamanho de bloco desejado (None para automático)
+        modo_leitura (str): Um dos MODOS_LEITURA ou None para automático
+    
+    Returns:
+        tuple: (modo_leitura, tamanho_bloco)
+    """
+    regular = stat.S_ISREG(info.st_mode)
+    suporta_buracos = hasattr(os, 'SEEK_DATA')
+    if modo_leitura is None:
+        # Menos blocos alocados que o tamanho indica buracos (ao menos um bloco de leitura)
+        if (regular and suporta_buracos
+                and info.st_blocks * 512 + TAMANHO_BLOCO_PADRAO <= info.st_size):
+            modo_leitura = 'esparso'
+        # mmap só compensa em arquivos grandes e exige espaço de endereçamento de 64 bits
+        elif regular and info.st_size >= LIMITE_MMAP and sys.maxsize > 2 ** 32:
+            modo_leitura = 'mmap'
+        else:
+            modo_leitura = 'readinto'
+    elif modo_leitura not in MODOS_LEITURA:
+        raise ValueError(f"Modo de leitura '{modo_leitura}' não suportado")
+    
+    # Arquivos vazios ou não regulares não podem ser mapeados
+    if modo_leitura == 'mmap' and (not regular or info.st_size == 0):
+        modo_leitura = 'readinto'
+    # Sem SEEK_DATA/SEEK_HOLE (ou fora de arquivos regulares) não há como achar os buracos
+    if modo_leitura == 'esparso' and (not regular or not suporta_buracos):
+        modo_leitura = 'readinto'
+    # posix_fadvise e O_DIRECT só valem para arquivos regulares
+    if modo_leitura == 'direto' and (not regular or fcntl is None or not hasattr(os, 'O_DIRECT')):
+        modo_leitura = 'streaming'
+    if modo_leitura == 'streaming' and (not regular or not hasattr(os, 'posix_fadvise')):
+        modo_leitura = 'readinto'
+    
+    if tamanho_bloco is None:
+        if modo_leitura in ('mmap', 'direto'):
+            # Sem o readahead do kernel, o O_DIRECT precisa de pedidos grandes
+            tamanho_bloco = TAMANHO_BLOCO_MMAP
+        elif regular:
+            # Arquivos pequenos não precisam de um buffer de 1 MiB
+            tamanho_bloco = min(TAMANHO_BLOCO_PADRAO, max(info.st_size, 4096))
+        else:
+            tamanho_bloco = TAMANHO_BLOCO_PADRAO
+    elif tamanho_bloco <= 0:
+        raise ValueError("O tamanho do bloco deve ser positivo")
+    
+    if modo_leitura == 'direto':
+        tamanho_bloco = -(-tamanho_bloco // ALINHAMENTO_DIRETO) * ALINHAMENTO_DIRETO
+    
+    return modo_leitura, tamanho_bloco
+
+def _iterar_blocos(arquivo, tamanho_bloco, modo_leitura):
+    """
+    Gera os blocos de um arquivo aberto em modo binário sem buffer
+    
+    Os blocos são memoryviews sobre um buffer reutilizado (ou sobre o mapeamento),
+    portanto só são válidos até a próxima iteração e não devem ser guardados.
+    
+    Args:
+        arquivo: Arquivo aberto com open(caminho, 'rb', buffering=0)
+        tamanho_bloco (int): Tamanho de cada bloco em bytes
+        modo_leitura (str): Um dos MODOS_LEITURA
+    
+    Yields:
+        memoryview: Próximo bloco do arquivo
+    """
+    if modo_leitura == 'esparso':
+        yield from _iterar_blocos_esparsos(arquivo, tamanho_bloco)
+    elif modo_leitura == 'streaming':
+        yield from _iterar_blocos_streaming(arquivo, tamanho_bloco)
+    elif modo_leitura == 'direto':
+        yield from _iterar_blocos_direto(arquivo, tamanho_bloco)
+    elif modo_leitura == 'mmap':
+        with mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+            with memoryview(mapa) as visao:
+                for inicio in range(0, len(visao), tamanho_bloco):
+                    bloco = visao[inicio:inicio + tamanho_bloco]
+                    try:
+                        yield bloco
+                    finally:
+                        # Libera a fatia para que o mapeamento possa ser fechado
+                        bloco.release()
+    else:
+        buffer = bytearray(tamanho_bloco)
+        with memoryview(buffer) as visao:
+            while lidos := arquivo.readinto(buffer):
+                bloco = visao[:lidos]
+                try:
+                    yield bloco
+                finally:
+                    bloco.release()
+
+def _procurar(descritor, posicao, onde, fim):
+    """
+    lseek com SEEK_DATA/SEEK_HOLE limitado ao tamanho do arquivo
+
+    ENXIO (não há mais dados depois de `posicao`) vira `fim`; se o sistema de
+    arquivos não suporta a busca, todo o restante é tratado como dados.
+    """
+    try:
+        return min(os.lseek(descritor, posicao, onde), fim)
+    except OSError as e:
+        if e.errno == errno.ENXIO:
+            return fim
+        if e.errno in (errno.EINVAL, errno.EOPNOTSUPP):
+            return posicao if onde == os.SEEK_DATA else fim
+        raise
+
+def _iterar_blocos_esparsos(arquivo, tamanho_bloco):
+    """
+    Gera os blocos de um arquivo esparso lendo do disco apenas os trechos com dados
+
+    Os trechos são enumerados com SEEK_DATA/SEEK_HOLE; os buracos são entregues
+    como fatias de um buffer de zeros, o que produz o mesmo hash da leitura
+    completa sem ler o disco (o hash dos zeros ainda custa CPU).
+    """
+    descritor = arquivo.fileno()
+    tamanho_total = os.fstat(descritor).st_size
+    buffer = bytearray(tamanho_bloco)
+    # bytes(n) vem zerado do calloc: as páginas não são tocadas até o hash lê-las
+    zeros = bytes(max(tamanho_bloco, TAMANHO_BLOCO_ZEROS))
+    with memoryview(buffer) as visao, memoryview(zeros) as visao_zeros:
+        posicao = 0
+        while posicao < tamanho_total:
+            dados = _procurar(descritor, posicao, os.SEEK_DATA, tamanho_total)
+            while posicao < dados:
+                quantidade = min(len(zeros), dados - posicao)
+                bloco = visao_zeros[:quantidade]
+                try:
+                    yield bloco
+                finally:
+                    bloco.release()
+                posicao += quantidade
+            if posicao >= tamanho_total:
+                break
+            
+            buraco = _procurar(descritor, posicao, os.SEEK_HOLE, tamanho_total)
+            os.lseek(descritor, posicao, os.SEEK_SET)
+            while posicao < buraco:
+                with visao[:min(tamanho_bloco, buraco - posicao)] as destino:
+                    lidos = arquivo.readinto(destino)
+                if not lidos:
+                    # O arquivo diminuiu durante a leitura
+                    return
+                bloco = visao[:lidos]
+                try:
+                    yield bloco
+                finally:
+                    bloco.release()
+                posicao += lidos
+
+def _iterar_blocos_streaming(arquivo, tamanho_bloco):
+    """
+    Lê o arquivo em sequência sem deixá-lo no cache de páginas
+
+    POSIX_FADV_SEQUENTIAL amplia o readahead assíncrono do kernel e as páginas
+    já processadas são descartadas (DONTNEED) a cada janela, para que uma
+    varredura de terabytes não expulse do cache os dados de outros processos.
+    Páginas do arquivo que já estavam em cache também são descartadas.
+    """
+    descritor = arquivo.fileno()
+    os.posix_fadvise(descritor, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+    posicao = descartado = 0
+    buffer = bytearray(tamanho_bloco)
+    try:
+        with memoryview(buffer) as visao:
+            while lidos := arquivo.readinto(buffer):
+                bloco = visao[:lidos]
+                try:
+                    yield bloco
+                finally:
+                    bloco.release()
+                posicao += lidos
+                if posicao - descartado >= JANELA_STREAMING:
+                    os.posix_fadvise(descritor, descartado, posicao - descartado, os.POSIX_FADV_DONTNEED)
+                    descartado = posicao
+    finally:
+        # Tamanho 0: até o fim do arquivo, inclusive o que o readahead trouxe e não foi usado
+        os.posix_fadvise(descritor, descartado, 0, os.POSIX_FADV_DONTNEED)
+
+def _iterar_blocos_direto(arquivo, tamanho_bloco):
+    """
+    Lê o arquivo com O_DIRECT, sem passar pelo cache de páginas
+
+    O O_DIRECT é ligado no descritor já aberto (fcntl) e a leitura usa um mmap
+    anônimo como buffer, que é alinhado à página. Se o sistema de arquivos não
+    aceitar leitura direta (ex.: tmpfs), continua no modo streaming.
+    """
+    descritor = arquivo.fileno()
+    flags = fcntl.fcntl(descritor, fcntl.F_GETFL)
+    try:
+        fcntl.fcntl(descritor, fcntl.F_SETFL, flags | os.O_DIRECT)
+    except OSError:
+        yield from _iterar_blocos_streaming(arquivo, tamanho_bloco)
+        return
+    
+    recusado = False
+    try:
+        with mmap.mmap(-1, tamanho_bloco) as buffer:
+            with memoryview(buffer) as visao:
+                while True:
+                    try:
+                        lidos = arquivo.readinto(buffer)
+                    except OSError as e:
+                        # A flag foi aceita, mas a leitura direta não; a posição
+                        # não avança em uma leitura recusada
+                        if e.errno != errno.EINVAL:
+                            raise
+                        recusado = True
+                        break
+                    if not lidos:
+                        break
+                    bloco = visao[:lidos]
+                    try:
+                        yield bloco
+                    finally:
+                        bloco.release()
+    finally:
+        fcntl.fcntl(descritor, fcntl.F_SETFL, flags)
+    
+    if recusado:
+        yield from _iterar_blocos_streaming(arquivo, tamanho_bloco)
+
+def gerar_hash_arquivo(caminho_arquivo, algoritmo='sha256', tamanho_bloco=None, modo_leitura=None,
+                       cancelar=None, progresso=None):
     """
     Gera hash de um arquivo usando o algoritmo especificado
     
+    Quando `algoritmo` é uma lista (ou tupla) de algoritmos, o arquivo é lido
+    uma única vez e cada bloco alimenta todos os objetos hash.
+    
+    Por padrão os blocos têm até 1 MiB e são lidos com readinto em um buffer
+    reutilizável; arquivos regulares a partir de 64 MiB são mapeados com mmap.
+    Em arquivos esparsos (Linux) apenas os trechos com dados são lidos e os
+    buracos entram no hash como zeros, sem acesso ao disco.
+    Para varreduras em massa, 'streaming' (posix_fadvise) e 'direto' (O_DIRECT)
+    evitam que o arquivo ocupe o cache de páginas; nunca são escolhidos
+    automaticamente.
+    
     Args:
         caminho_arquivo (str): Caminho para o arquivo
-        algoritmo (str): Algoritmo de hash (md5, sha1, sha256, sha512)
+        algoritmo (str | list): Algoritmo de hash (ver listar_algoritmos)
+            ou lista de algoritmos
+        tamanho_bloco (int): Tamanho do bloco de leitura em bytes (None para automático)
+        modo_leitura (str): 'readinto', 'mmap', 'esparso', 'streaming', 'direto' ou
+            None para escolha automática
+        cancelar (threading.Event): Se sinalizado, interrompe a leitura no próximo bloco
+        progresso (callable): Chamada como progresso(bytes_lidos, tamanho_total) após cada bloco
     
     Returns:
         str: Hash gerado
+        dict: {algoritmo: hash} quando uma lista de algoritmos é informada
+    
+    Raises:
+        OperacaoCancelada: Se `cancelar` for sinalizado durante a leitura
     """
+    medir = bool(_observadores)
+    if medir:
+        relogio = time.perf_counter
+        inicio = relogio()
+        evento = {'tipo': 'arquivo', 'caminho': caminho_arquivo, 'algoritmos': algoritmo,
+                  'bytes': 0, 'modo_leitura': None, 'tamanho_bloco': None,
+                  'tempo_leitura': 0.0, 'tempo_hash': 0.0, 'erro': None}
+    
     try:
         # Verifica se o arquivo existe
         if not os.path.exists(caminho_arquivo):
+            if medir:
+                evento['erro'] = 'FileNotFoundError'
             return f"Erro: Arquivo '{caminho_arquivo}' não encontrado"
         
-        # Cria o objeto hash baseado no algoritmo
-        if algoritmo.lower() == 'md5':
-            hash_obj = hashlib.md5()
-        elif algoritmo.lower() == 'sha1':
-            hash_obj = hashlib.sha1()
-        elif algoritmo.lower() == 'sha256':
-            hash_obj = hashlib.sha256()
-        elif algoritmo.lower() == 'sha512':
-            hash_obj = hashlib.sha512()
-        else:
-            raise ValueError(f"Algoritmo '{algoritmo}' não suportado")
+        # Cria um objeto hash para cada algoritmo pedido
+        varios = isinstance(algoritmo, (list, tuple))
+        algoritmos = [a.lower() for a in algoritmo] if varios else [algoritmo.lower()]
+        if not algoritmos:
+            raise ValueError("Nenhum algoritmo informado")
+        hash_objs = {nome: criar_objeto_hash(nome) for nome in algoritmos}
+        atualizacoes = [obj.update for obj in hash_objs.values()]
         
         # Lê o arquivo em blocos para economizar memória
-        with open(caminho_arquivo, 'rb') as arquivo:
-            while bloco := arquivo.read(8192):
-                hash_obj.update(bloco)
+        with open(caminho_arquivo, 'rb', buffering=0) as arquivo:
+            info = os.fstat(arquivo.fileno())
+            modo, tamanho = _escolher_leitura(info, tamanho_bloco, modo_leitura)
+            lidos = 0
+            if medir:
+                evento['modo_leitura'], evento['tamanho_bloco'] = modo, tamanho
+                tempo_leitura = tempo_hash = 0.0
+                marca = relogio()
+            for bloco in _iterar_blocos(arquivo, tamanho, modo):
+                if medir:
+                    agora = relogio()
+                    tempo_leitura += agora - marca
+                if cancelar is not None and cancelar.is_set():
+                    raise OperacaoCancelada(f"Hash do arquivo '{caminho_arquivo}' cancelado")
+                for atualizar in atualizacoes:
+                    atualizar(bloco)
+                if progresso is not None or medir:
+                    lidos += len(bloco)
+                    if progresso is not None:
+                        progresso(lidos, info.st_size)
+                if medir:
+                    marca = relogio()
+                    tempo_hash += marca - agora
+                    evento['bytes'] = lidos
+                    evento['tempo_leitura'], evento['tempo_hash'] = tempo_leitura, tempo_hash
         
-        return hash_obj.hexdigest()
+        if varios:
+            return {nome: obj.hexdigest() for nome, obj in hash_objs.items()}
+        return hash_objs[algoritmos[0]].hexdigest()
     
+    except OperacaoCancelada:
+        if medir:
+            evento['erro'] = 'OperacaoCancelada'
+        raise
     except Exception as e:
+        if medir:
+            evento['erro'] = type(e).__name__
         return f"Erro ao gerar hash do arquivo: {str(e)}"
+    finally:
+        if medir:
+            evento['tempo_total'] = relogio() - inicio
+            _notificar(evento)
+
+def corresponde_padroes(caminho_relativo, padroes):
+    """
+    Verifica se o caminho (ou apenas o nome do arquivo) corresponde a algum padrão glob
+    """
+    nome = caminho_relativo.rsplit('/', 1)[-1]
+    return any(fnmatch.fnmatch(caminho_relativo, padrao) or fnmatch.fnmatch(nome, padrao)
+               for padrao in padroes)
+
+def listar_arquivos(diretorio, incluir=None, excluir=None):
+    """
+    Percorre recursivamente um diretório e gera os caminhos dos arquivos
+    
+    Os padrões glob são comparados com o caminho relativo ao diretório (usando '/')
+    e com o nome do arquivo. Diretórios que correspondem a `excluir` não são visitados.
+    Links simbólicos para diretórios não são seguidos.
+    
+    Args:
+        diretorio (str): Diretório raiz
+        incluir (list): Padrões glob de arquivos a incluir (None inclui todos)
+        excluir (list): Padrões glob de arquivos/diretórios a excluir
+    
+    Yields:
+        str: Caminho de cada arquivo encontrado
+    """
+    incluir = list(incluir or [])
+    excluir = list(excluir or [])
+    pilha = [(diretorio, '')]
+    
+    while pilha:
+        atual, prefixo = pilha.pop()
+        try:
+            with os.scandir(atual) as entradas:
+                entradas = sorted(entradas, key=lambda e: e.name)
+        except OSError:
+            continue
+        
+        subdiretorios = []
+        for entrada in entradas:
+            relativo = prefixo + entrada.name
+            if excluir and corresponde_padroes(relativo, excluir):
+                continue
+            try:
+                if entrada.is_dir(follow_symlinks=False):
+                    subdiretorios.append((entrada.path, relativo + '/'))
+                elif entrada.is_file():
+                    if not incluir or corresponde_padroes(relativo, incluir):
+                        yield entrada.path
+            except OSError:
+                continue
+        
+        # Empilha em ordem reversa para visitar os subdiretórios em ordem alfabética
+        pilha.extend(reversed(subdiretorios))
+
+def _hash_lote_arquivos(caminhos, algoritmo, funcao_hash=None):
+    """
+    Gera o hash de uma lista de arquivos (tarefa executada nos workers)
+    """
+    funcao_hash = funcao_hash or gerar_hash_arquivo
+    return [(caminho, funcao_hash(caminho, algoritmo)) for caminho in caminhos]
+
+def agrupar(iteravel, tamanho):
+    """
+    Agrupa os itens de um iterável em listas de até `tamanho` elementos
+    """
+    lote = []
+    for item in iteravel:
+        lote.append(item)
+        if len(lote) >= tamanho:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+def ler_tamanho(texto):
+    """
+    Converte tamanhos como '64K', '8M' ou '1G' em bytes (usado nas linhas de comando)
+    """
+    multiplicadores = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+    texto = texto.strip().upper()
+    if texto and texto[-1] in multiplicadores:
+        return int(texto[:-1]) * multiplicadores[texto[-1]]
+    return int(texto)
+
+def gerar_hash_diretorio(diretorio, algoritmo='sha256', workers=None, usar_processos=False,
+                         ordenado=False, incluir=None, excluir=None, funcao_hash=None):
+    """
+    Gera o hash de todos os arquivos de um diretório usando um pool de workers
+    
+    Os resultados são produzidos como um fluxo, à medida que ficam prontos
+    (ou em ordem alfabética de caminho com `ordenado=True`). Apenas um número
+    limitado de tarefas fica pendente por vez, então a memória não cresce com
+    o tamanho da árvore. A exceção é `ordenado=True`: a lista completa de
+    caminhos é montada e ordenada antes do primeiro hash (os resultados
+    continuam em fluxo), pois a ordem global de caminho difere da ordem de
+    visita de listar_arquivos.
+    
+    Args:
+        diretorio (str): Diretório raiz
+        algoritmo (str | list): Algoritmo de hash ou lista de algoritmos
+        workers (int): Número de workers (padrão: número de CPUs)
+        usar_processos (bool): Usa processos em vez de threads
+        ordenado (bool): Produz os resultados ordenados pelo caminho
+        incluir (list): Padrões glob de arquivos a incluir
+        excluir (list): Padrões glob de arquivos/diretórios a excluir
+        funcao_hash (callable): Função chamada como funcao_hash(caminho, algoritmo)
+            para cada arquivo (padrão: gerar_hash_arquivo); com processos precisa
+            ser uma função de módulo
+    
+    Yields:
+        tuple: (caminho, hash) para cada arquivo; o hash segue o formato de
+            gerar_hash_arquivo (str, dict ou mensagem de erro)
+    """
+    if not os.path.isdir(diretorio):
+        raise NotADirectoryError(f"Diretório '{diretorio}' não encontrado")
+    
+    resultados = _gerar_hash_diretorio(diretorio, algoritmo, workers, usar_processos, ordenado,
+                                       incluir, excluir, funcao_hash)
+    if not _observadores:
+        yield from resultados
+        return
+    
+    inicio = time.perf_counter()
+    arquivos = erros = 0
+    try:
+        for caminho, hash_valor in resultados:
+            arquivos += 1
+            if isinstance(hash_valor, str) and hash_valor.startswith('Erro'):
+                erros += 1
+            yield caminho, hash_valor
+    finally:
+        _notificar({'tipo': 'diretorio', 'caminho': diretorio, 'arquivos': arquivos,
+                    'erros': erros, 'tempo_total': time.perf_counter() - inicio})
+
+def _gerar_hash_diretorio(diretorio, algoritmo, workers, usar_processos, ordenado,
+                          incluir, excluir, funcao_hash):
+    """Executa gerar_hash_diretorio depois da validação do diretório"""
+    workers = workers or os.cpu_count() or 1
+    # Processos têm custo de comunicação maior, então recebem lotes de arquivos
+    tamanho_lote = 32 if usar_processos else 1
+    max_pendentes = workers * 4
+    
+    arquivos = listar_arquivos(diretorio, incluir, excluir)
+    if ordenado:
+        # Mantém todos os caminhos em memória (ver docstring de gerar_hash_diretorio)
+        arquivos = sorted(arquivos)
+    lotes = agrupar(arquivos, tamanho_lote)
+    
+    tipo_executor = ProcessPoolExecutor if usar_processos else ThreadPoolExecutor
+    executor = tipo_executor(max_workers=workers)
+    try:
+        if ordenado:
+            fila = deque()
+            for lote in lotes:
+                fila.append(executor.submit(_hash_lote_arquivos, lote, algoritmo, funcao_hash))
+                if len(fila) >= max_pendentes:
+                    yield from fila.popleft().result()
+            while fila:
+                yield from fila.popleft().result()
+        else:
+            pendentes = set()
+            for lote in lotes:
+                pendentes.add(executor.submit(_hash_lote_arquivos, lote, algoritmo, funcao_hash))
+                if len(pendentes) >= max_pendentes:
+                    concluidos, pendentes = wait(pendentes, return_when=FIRST_COMPLETED)
+                    for futuro in concluidos:
+                        yield from futuro.result()
+            while pendentes:
+                concluidos, pendentes = wait(pendentes, return_when=FIRST_COMPLETED)
+                for futuro in concluidos:
+                    yield from futuro.result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+# Tipos de hash hexadecimal por comprimento: (tipo, algoritmos possíveis, descrição)
+_TIPOS_POR_COMPRIMENTO = {
+    8: ('CRC-32', ['CRC-32', 'Adler-32'],
+        'Checksum CRC-32 ou Adler-32 - 32 bits (não criptográfico)'),
+    16: ('CRC-64', ['CRC-64', 'MySQL 3.23', 'Half MD5'],
+         'Checksum de 64 bits (CRC-64, hash antigo do MySQL ou metade de um MD5)'),
+    32: ('MD5', ['MD5', 'MD4', 'NTLM', 'BLAKE2b-128', 'BLAKE2s-128'],
+         'Hash MD5 (Message Digest 5) - 128 bits'),
+    40: ('SHA-1', ['SHA-1', 'RIPEMD-160', 'BLAKE2b-160', 'BLAKE2s-160'],
+         'Hash SHA-1 - 160 bits'),
+    56: ('SHA-224', ['SHA-224', 'SHA3-224', 'SHA-512/224', 'BLAKE2b-224', 'BLAKE2s-224'],
+         'Hash SHA-224 (Secure Hash Algorithm 224) - 224 bits'),
+    64: ('SHA-256', ['SHA-256', 'SHA3-256', 'SHA-512/256', 'BLAKE2s-256', 'BLAKE2b-256', 'SHAKE128-256'],
+         'Hash SHA-256 (Secure Hash Algorithm 256) - 256 bits'),
+    96: ('SHA-384', ['SHA-384', 'SHA3-384', 'BLAKE2b-384'],
+         'Hash SHA-384 (Secure Hash Algorithm 384) - 384 bits'),
+    128: ('SHA-512', ['SHA-512', 'SHA3-512', 'BLAKE2b-512', 'SHAKE256-512', 'Whirlpool'],
+          'Hash SHA-512 (Secure Hash Algorithm 512) - 512 bits'),
+}
+
+# Formatos com prefixo (crypt, bibliotecas e bancos de dados), já em minúsculas;
+# prefixos mais longos vêm antes dos mais curtos que começam igual
+_TIPOS_POR_PREFIXO = [
+    ('$argon2id$', 'Argon2id', 'Hash Argon2id (formato PHC)'),
+    ('$argon2i$', 'Argon2i', 'Hash Argon2i (formato PHC)'),
+    ('$argon2d$', 'Argon2d', 'Hash Argon2d (formato PHC)'),
+    ('$2a$', 'bcrypt', 'Hash bcrypt ($2a$)'),
+    ('$2b$', 'bcrypt', 'Hash bcrypt ($2b$)'),
+    ('$2y$', 'bcrypt', 'Hash bcrypt ($2y$)'),
+    ('$1$', 'MD5-crypt', 'Hash MD5-crypt ($1$), usado em /etc/shadow antigos'),
+    ('$5$', 'SHA-256-crypt', 'Hash SHA-256-crypt ($5$), usado em /etc/shadow'),
+    ('$6$', 'SHA-512-crypt', 'Hash SHA-512-crypt ($6$), usado em /etc/shadow'),
+    ('$y$', 'yescrypt', 'Hash yescrypt ($y$), usado em /etc/shadow recentes'),
+    ('$7$', 'scrypt', 'Hash scrypt ($7$)'),
+    ('$apr1$', 'Apache MD5', 'Hash MD5 do Apache ($apr1$), usado em .htpasswd'),
+    ('$p$', 'phpass', 'Hash phpass ($P$), usado pelo WordPress'),
+    ('$h$', 'phpass', 'Hash phpass ($H$), usado pelo phpBB'),
+    ('pbkdf2_sha256$', 'PBKDF2-SHA256', 'Hash PBKDF2-SHA256 do Django'),
+    ('pbkdf2_sha1$', 'PBKDF2-SHA1', 'Hash PBKDF2-SHA1 do Django'),
+    ('{ssha}', 'SSHA', 'Hash SHA-1 com salt em Base64 (LDAP)'),
+    ('{sha}', 'SHA-1 (LDAP)', 'Hash SHA-1 em Base64 (LDAP)'),
+]
+_PREFIXOS = tuple(prefixo for prefixo, _, _ in _TIPOS_POR_PREFIXO)
+
+_HEXADECIMAL = re.compile(r'[0-9a-f]+')
+
+def _classificar_hash(hash_limpo):
+    """
+    Classifica um hash já sem espaços e em minúsculas
+    
+    Returns:
+        tuple: (tipo, algoritmos possíveis, descrição, formato)
+    """
+    if hash_limpo.startswith(_PREFIXOS):
+        for prefixo, tipo, descricao in _TIPOS_POR_PREFIXO:
+            if hash_limpo.startswith(prefixo):
+                return tipo, [tipo], descricao, 'Formato com prefixo'
+    
+    if hash_limpo.startswith('*') and len(hash_limpo) == 41 and _HEXADECIMAL.fullmatch(hash_limpo, 1):
+        return ('MySQL 4.1+', ['MySQL 4.1+'], 'Hash de senha do MySQL 4.1+ (SHA-1 duplo)',
+                'Formato com prefixo')
+    
+    if not _HEXADECIMAL.fullmatch(hash_limpo):
+        return ('Inválido', [], 'Hash contém caracteres inválidos (deve conter apenas 0-9 e a-f)',
+                'Não hexadecimal')
+    
+    info = _TIPOS_POR_COMPRIMENTO.get(len(hash_limpo))
+    if info is None:
+        return ('Desconhecido', [], f'Comprimento não reconhecido ({len(hash_limpo)} caracteres)',
+                'Hexadecimal válido')
+    tipo, algoritmos, descricao = info
+    return tipo, list(algoritmos), descricao, 'Hexadecimal válido'
 
 def identificar_tipo_hash(hash_string):
     """
@@ -86,54 +1005,12 @@ def identificar_tipo_hash(hash_string):
     try:
         # Remove espaços e converte para minúsculo
         hash_limpo = hash_string.strip().lower()
-        
-        # Verifica se contém apenas caracteres hexadecimais
-        if not re.match(r'^[a-f0-9]+$', hash_limpo):
-            return {
-                'tipo': 'Inválido',
-                'comprimento': len(hash_limpo),
-                'formato': 'Não hexadecimal',
-                'algoritmos_possiveis': [],
-                'descricao': 'Hash contém caracteres inválidos (deve conter apenas 0-9 e a-f)'
-            }
-        
-        comprimento = len(hash_limpo)
-        algoritmos_possiveis = []
-        tipo = 'Desconhecido'
-        descricao = ''
-        
-        # Identifica baseado no comprimento
-        if comprimento == 32:
-            tipo = 'MD5'
-            algoritmos_possiveis = ['MD5']
-            descricao = 'Hash MD5 (Message Digest 5) - 128 bits'
-        elif comprimento == 40:
-            tipo = 'SHA-1'
-            algoritmos_possiveis = ['SHA-1']
-            descricao = 'Hash SHA-1 - 160 bits'
-        elif comprimento == 56:
-            tipo = 'SHA-224'
-            algoritmos_possiveis = ['SHA-224']
-            descricao = 'Hash SHA-224 (Secure Hash Algorithm 224) - 224 bits'
-        elif comprimento == 64:
-            tipo = 'SHA-256'
-            algoritmos_possiveis = ['SHA-256', 'SHA3-256']
-            descricao = 'Hash SHA-256 (Secure Hash Algorithm 256) - 256 bits'
-        elif comprimento == 96:
-            tipo = 'SHA-384'
-            algoritmos_possiveis = ['SHA-384']
-            descricao = 'Hash SHA-384 (Secure Hash Algorithm 384) - 384 bits'
-        elif comprimento == 128:
-            tipo = 'SHA-512'
-            algoritmos_possiveis = ['SHA-512', 'SHA3-512']
-            descricao = 'Hash SHA-512 (Secure Hash Algorithm 512) - 512 bits'
-        else:
-            descricao = f'Comprimento não reconhecido ({comprimento} caracteres)'
+        tipo, algoritmos_possiveis, descricao, formato = _classificar_hash(hash_limpo)
         
         return {
             'tipo': tipo,
-            'comprimento': comprimento,
-            'formato': 'Hexadecimal válido',
+            'comprimento': len(hash_limpo),
+            'formato': formato,
             'algoritmos_possiveis': algoritmos_possiveis,
             'descricao': descricao
         }
@@ -147,6 +1024,75 @@ def identificar_tipo_hash(hash_string):
             'descricao': f'Erro ao analisar hash: {str(e)}'
         }
 
+def iterar_identificacao(fonte):
+    """
+    Identifica o tipo de cada hash de uma lista, como um fluxo
+    
+    Linhas vazias são ignoradas. Apenas o tipo é calculado (sem montar o
+    dicionário completo de identificar_tipo_hash), o que permite processar
+    milhões de linhas.
+    
+    Args:
+        fonte (str | iterable): Caminho de um arquivo com um hash por linha
+            ou iterável de strings
+    
+    Yields:
+        tuple: (hash, tipo)
+    """
+    if isinstance(fonte, str):
+        with open(fonte, 'r', encoding='utf-8', errors='replace') as arquivo:
+            yield from iterar_identificacao(arquivo)
+        return
+    
+    prefixos = _PREFIXOS
+    hexadecimal = _HEXADECIMAL.fullmatch
+    por_comprimento = {comprimento: info[0] for comprimento, info in _TIPOS_POR_COMPRIMENTO.items()}
+    
+    for linha in fonte:
+        hash_limpo = linha.strip()
+        if not hash_limpo:
+            continue
+        # A classificação usa uma cópia em minúsculas; a linha é devolvida como
+        # veio, pois bcrypt, crypt, base64 e {SSHA} diferenciam maiúsculas
+        minusculo = hash_limpo.lower()
+        
+        # Caminho rápido: hexadecimal puro, classificado só pelo comprimento
+        if hexadecimal(minusculo):
+            yield hash_limpo, por_comprimento.get(len(minusculo), 'Desconhecido')
+        elif minusculo.startswith(prefixos) or minusculo.startswith('*'):
+            yield hash_limpo, _classificar_hash(minusculo)[0]
+        else:
+            yield hash_limpo, 'Inválido'
+
+def identificar_hashes_lote(fonte, detalhes=True):
+    """
+    Identifica em lote os tipos de uma lista de hashes
+    
+    Args:
+        fonte (str | iterable): Caminho de um arquivo com um hash por linha
+            ou iterável de strings
+        detalhes (bool): Inclui o resultado de cada linha (desative para listas
+            muito grandes quando só as contagens interessam)
+    
+    Returns:
+        dict: {'total': int, 'contagem': {tipo: quantidade},
+            'resultados': [(hash, tipo)] (vazio se detalhes=False)}
+    """
+    contagem = {}
+    resultados = []
+    guardar = resultados.append if detalhes else None
+    
+    for hash_limpo, tipo in iterar_identificacao(fonte):
+        contagem[tipo] = contagem.get(tipo, 0) + 1
+        if guardar:
+            guardar((hash_limpo, tipo))
+    
+    return {
+        'total': sum(contagem.values()),
+        'contagem': dict(sorted(contagem.items(), key=lambda item: -item[1])),
+        'resultados': resultados
+    }
+
 def menu_principal():
     """
     Menu principal do gerador de hash
@@ -176,6 +1122,33 @@ def menu_principal():
         except Exception as e:
             print(f"Erro: {str(e)}")
 
+def _escolher_algoritmo_menu():
+    """
+    Mostra os algoritmos registrados e lê a escolha do usuário
+    
+    Returns:
+        str: Nome do algoritmo escolhido (SHA256 se a opção for inválida)
+    """
+    algoritmos = listar_algoritmos()
+    
+    print("\nAlgoritmos disponíveis:")
+    for indice, info in enumerate(algoritmos, 1):
+        padrao = " (padrão)" if info['nome'] == 'sha256' else ""
+        print(f"{indice}. {info['descricao']}{padrao}")
+    
+    escolha = input(f"Escolha o algoritmo (1-{len(algoritmos)} ou nome, Enter para SHA256): ").strip().lower()
+    if not escolha:
+        return 'sha256'
+    if escolha.isdigit() and 1 <= int(escolha) <= len(algoritmos):
+        return algoritmos[int(escolha) - 1]['nome']
+    
+    try:
+        _obter_construtor(escolha)
+        return escolha
+    except ValueError:
+        print("Opção inválida! Usando SHA256.")
+        return 'sha256'
+
 def gerar_hash_texto():
     """
     Interface para gerar hash de texto
@@ -187,23 +1160,7 @@ def gerar_hash_texto():
         print("Texto não pode estar vazio!")
         return
     
-    print("\nAlgoritmos disponíveis:")
-    print("1. MD5")
-    print("2. SHA1")
-    print("3. SHA256 (padrão)")
-    print("4. SHA512")
-    
-    algoritmos = {'1': 'md5', '2': 'sha1', '3': 'sha256', '4': 'sha512'}
-    
-    escolha = input("Escolha o algoritmo (1-4, Enter para SHA256): ").strip()
-    if not escolha:
-        escolha = '3'
-    
-    if escolha not in algoritmos:
-        print("Opção inválida! Usando SHA256.")
-        algoritmo = 'sha256'
-    else:
-        algoritmo = algoritmos[escolha]
+    algoritmo = _escolher_algoritmo_menu()
     
     hash_resultado = gerar_hash(texto, algoritmo)
     
@@ -222,23 +1179,7 @@ def gerar_hash_arquivo_menu():
         print("Caminho não pode estar vazio!")
         return
     
-    print("\nAlgoritmos disponíveis:")
-    print("1. MD5")
-    print("2. SHA1")
-    print("3. SHA256 (padrão)")
-    print("4. SHA512")
-    
-    algoritmos = {'1': 'md5', '2': 'sha1', '3': 'sha256', '4': 'sha512'}
-    
-    escolha = input("Escolha o algoritmo (1-4, Enter para SHA256): ").strip()
-    if not escolha:
-        escolha = '3'
-    
-    if escolha not in algoritmos:
-        print("Opção inválida! Usando SHA256.")
-        algoritmo = 'sha256'
-    else:
-        algoritmo = algoritmos[escolha]
+    algoritmo = _escolher_algoritmo_menu()
     
     print(f"\nProcessando arquivo '{caminho}'...")
     hash_resultado = gerar_hash_arquivo(caminho, algoritmo)
@@ -247,5 +1188,224 @@ def gerar_hash_arquivo_menu():
     print(f"Algoritmo: {algoritmo.upper()}")
     print(f"Hash: {hash_resultado}")
 
+# Quantidade de resultados acumulados antes de cada escrita na saída
+TAMANHO_LOTE_SAIDA = 10000
+
+class _SaidaLote:
+    """
+    Formata resultados e escreve na saída em lotes grandes
+    """
+    
+    def __init__(self, saida, formato, algoritmos, tamanho_lote=TAMANHO_LOTE_SAIDA):
+        self.saida = saida
+        self.formato = formato
+        self.algoritmos = algoritmos
+        self.tamanho_lote = tamanho_lote
+        self.partes = []
+        self.pendentes = 0
+        # Chaves JSON pré-formatadas; os hashes são hexadecimais e não precisam de escape
+        self.chaves_json = [f', "{a}": "' for a in algoritmos]
+        if formato == 'csv':
+            self._adicionar_csv([['entrada'] + algoritmos])
+    
+    def _adicionar_csv(self, linhas):
+        buffer_csv = io.StringIO()
+        csv.writer(buffer_csv, lineterminator='\n').writerows(linhas)
+        self.partes.append(buffer_csv.getvalue())
+    
+    def adicionar_lote(self, entradas, colunas, mostrar_entrada=True):
+        """
+        Adiciona vários resultados
+        
+        Args:
+            entradas (list): Nomes de arquivos ou textos das linhas
+            colunas (list): Uma lista de hashes por algoritmo, na ordem das entradas
+            mostrar_entrada (bool): No formato texto, inclui a entrada após os hashes
+        """
+        linhas_hashes = list(zip(*colunas))
+        if self.formato == 'json':
+            codificar = json.encoder.encode_basestring
+            chaves = self.chaves_json
+            self.partes.extend(
+                '{"entrada": ' + codificar(entrada)
+                + ''.join(chave + h + '"' for chave, h in zip(chaves, hashes)) + '}\n'
+                for entrada, hashes in zip(entradas, linhas_hashes))
+        elif self.formato == 'csv':
+            self._adicionar_csv([entrada, *hashes] for entrada, hashes in zip(entradas, linhas_hashes))
+        elif mostrar_entrada:
+            self.partes.extend(f"{' '.join(hashes)}  {entrada}\n"
+                               for entrada, hashes in zip(entradas, linhas_hashes))
+        else:
+            self.partes.extend(' '.join(hashes) + '\n' for hashes in linhas_hashes)
+        
+        self.pendentes += len(linhas_hashes)
+        if self.pendentes >= self.tamanho_lote:
+            self.descarregar()
+    
+    def adicionar(self, entrada, hashes):
+        """Adiciona um resultado (hashes na ordem dos algoritmos)"""
+        self.adicionar_lote([entrada], [[h] for h in hashes])
+    
+    def descarregar(self):
+        """Escreve os resultados acumulados"""
+        if self.partes:
+            self.saida.write(''.join(self.partes))
+            self.saida.flush()
+            self.partes = []
+            self.pendentes = 0
+
+def _processar_linhas(entrada, algoritmos, saida_lote, tamanho_lote):
+    """
+    Gera o hash de cada linha de um fluxo binário, em lotes
+    """
+    mostrar_texto = saida_lote.formato != 'texto'
+    for linhas in agrupar(entrada, tamanho_lote):
+        linhas = [linha.rstrip(b'\r\n') for linha in linhas]
+        colunas = [gerar_hashes_lote(linhas, algoritmo) for algoritmo in algoritmos]
+        textos = [linha.decode('utf-8', 'replace') for linha in linhas] if mostrar_texto else linhas
+        saida_lote.adicionar_lote(textos, colunas, mostrar_entrada=False)
+
+def _processar_caminho(caminho, algoritmos, saida_lote, workers):
+    """
+    Gera o hash de um arquivo ou de um diretório (recursivamente)
+    
+    Returns:
+        int: Número de erros encontrados
+    """
+    if os.path.isdir(caminho):
+        resultados = gerar_hash_diretorio(caminho, algoritmos, workers=workers, ordenado=True)
+    else:
+        resultados = [(caminho, gerar_hash_arquivo(caminho, algoritmos))]
+    
+    erros = 0
+    for nome, resultado in resultados:
+        if isinstance(resultado, dict):
+            saida_lote.adicionar(nome, [resultado[a] for a in algoritmos])
+        else:
+            erros += 1
+            sys.stderr.write(f"{resultado}\n")
+    return erros
+
+def _identificar_listas(fontes, formato):
+    """
+    Identifica os hashes de arquivos de listas (ou da entrada padrão) e
+    escreve as contagens por tipo
+    """
+    contagem = {}
+    for fonte in fontes:
+        if fonte == '-':
+            fonte = io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8', errors='replace')
+        for tipo, quantidade in identificar_hashes_lote(fonte, detalhes=False)['contagem'].items():
+            contagem[tipo] = contagem.get(tipo, 0) + quantidade
+    contagem = dict(sorted(contagem.items(), key=lambda item: -item[1]))
+    
+    if formato == 'json':
+        sys.stdout.write(json.dumps({'total': sum(contagem.values()), 'contagem': contagem},
+                                    ensure_ascii=False) + '\n')
+    elif formato == 'csv':
+        escritor = csv.writer(sys.stdout, lineterminator='\n')
+        escritor.writerow(['tipo', 'quantidade'])
+        escritor.writerows(contagem.items())
+    else:
+        for tipo, quantidade in contagem.items():
+            sys.stdout.write(f"{tipo}: {quantidade}\n")
+    return 0
+
+def main(argv=None):
+    """
+    Modo não interativo: gera hashes de arquivos, textos ou linhas da entrada padrão
+    
+    Args:
+        argv (list): Argumentos da linha de comando (padrão: sys.argv[1:])
+    
+    Returns:
+        int: Código de saída (0 em caso de sucesso)
+    """
+    parser = argparse.ArgumentParser(
+        description="Gera hashes de arquivos, textos ou de cada linha da entrada padrão. "
+                    "Sem argumentos, abre o menu interativo.")
+    parser.add_argument('arquivos', nargs='*',
+                        help="Arquivos ou diretórios ('-' lê linhas da entrada padrão)")
+    parser.add_argument('-a', '--algoritmo', action='append',
+                        help="Algoritmo de hash (pode ser repetido ou separado por vírgulas; padrão: sha256). "
+                             "Aceita tamanhos de saída no nome, ex.: blake2b-256, shake_128-256")
+    parser.add_argument('--listar-algoritmos', action='store_true',
+                        help="Lista os algoritmos disponíveis e sai")
+    parser.add_argument('-t', '--texto', action='append', default=[],
+                        help="Texto para gerar o hash (pode ser repetido)")
+    parser.add_argument('-f', '--formato', choices=['texto', 'json', 'csv'], default='texto',
+                        help="Formato de saída (padrão: texto)")
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                        help="Workers para hashing de diretórios (padrão: número de CPUs)")
+    parser.add_argument('-i', '--identificar', action='store_true',
+                        help="Identifica os tipos dos hashes listados (um por linha) nos arquivos "
+                             "ou na entrada padrão e mostra as contagens")
+    parser.add_argument('--lote', type=int, default=TAMANHO_LOTE_SAIDA,
+                        help=f"Resultados por escrita na saída (padrão: {TAMANHO_LOTE_SAIDA})")
+    parser.add_argument('--metricas', metavar='ARQUIVO',
+                        help="Grava métricas (formato Prometheus) neste arquivo durante a execução")
+    parser.add_argument('--intervalo-metricas', type=float, default=15.0,
+                        help="Segundos entre gravações das métricas (padrão: 15)")
+    args = parser.parse_args(argv)
+    
+    if args.listar_algoritmos:
+        for info in listar_algoritmos():
+            aviso = "" if info['seguro'] else "  (inseguro contra colisões)"
+            sys.stdout.write(f"{info['nome']:<14} {info['bits']:>5} bits  {info['descricao']}{aviso}\n")
+        return 0
+    
+    if args.identificar:
+        try:
+            return _identificar_listas(args.arquivos or ['-'], args.formato)
+        except OSError as e:
+            sys.stderr.write(f"Erro: {str(e)}\n")
+            return 1
+    
+    algoritmos = []
+    for valor in args.algoritmo or ['sha256']:
+        algoritmos.extend(a.strip().lower() for a in valor.split(',') if a.strip())
+    for algoritmo in algoritmos:
+        try:
+            _obter_construtor(algoritmo)
+        except ValueError as e:
+            parser.error(str(e))
+    
+    saida_lote = _SaidaLote(sys.stdout, args.formato, algoritmos, max(args.lote, 1))
+    erros = 0
+    
+    exportador = None
+    if args.metricas:
+        # Importado aqui porque metricas_hash depende deste módulo; o coletor é
+        # registrado aqui mesmo, pois executado como script este módulo é o __main__
+        from metricas_hash import ColetorMetricas, ExportadorPrometheus
+        coletor = ColetorMetricas()
+        adicionar_observador(coletor)
+        exportador = ExportadorPrometheus(coletor, args.metricas, args.intervalo_metricas).iniciar()
+    
+    try:
+        for texto in args.texto:
+            saida_lote.adicionar(texto, [gerar_hashes_lote([texto], a)[0] for a in algoritmos])
+        
+        # Sem arquivos nem textos, lê a entrada padrão (como o sha256sum)
+        for caminho in args.arquivos or ([] if args.texto else ['-']):
+            if caminho == '-':
+                _processar_linhas(sys.stdin.buffer, algoritmos, saida_lote, max(args.lote, 1))
+            else:
+                erros += _processar_caminho(caminho, algoritmos, saida_lote, args.workers)
+        saida_lote.descarregar()
+    except BrokenPipeError:
+        # A saída foi fechada (ex.: '| head'); descarta o restante sem mensagem de erro
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    finally:
+        if exportador is not None:
+            exportador.parar()
+            remover_observador(coletor)
+    
+    return 1 if erros else 0
+
 if __name__ == "__main__":
+    # O menu interativo só é aberto sem argumentos e com um terminal na entrada
+    if len(sys.argv) > 1 or not sys.stdin.isatty():
+        sys.exit(main())
     menu_principal()
\ No newline at end of file
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Hash em árvore (Merkle) para arquivos muito grandes
+Divide o arquivo em blocos de tamanho fixo, gera o hash de cada bloco em
+paralelo e combina os hashes em uma raiz. Os hashes dos blocos podem ser
+salvos para depois localizar e reverificar apenas os trechos danificados.
+
+O resultado é um tipo de digest próprio ('merkle-<algoritmo>') e não é igual
+ao hash simples do arquivo inteiro.
+"""
+
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from gerador_hash import criar_objeto_hash, ler_tamanho
+
+TAMANHO_BLOCO_ARVORE = 64 * 1024 * 1024
+TAMANHO_LEITURA = 1024 * 1024
+
+# Prefixos de domínio para folhas e nós internos (como no RFC 6962), evitando
+# que um nó interno possa ser apresentado como se fosse um bloco de dados
+PREFIXO_FOLHA = b'\x00'
+PREFIXO_NO = b'\x01'
+
+def _hash_bloco(caminho_arquivo, descritor, inicio, tamanho, algoritmo):
+    """
+    Gera o hash (folha) de um trecho do arquivo
+
+    Usa os.pread no descritor compartilhado quando disponível; caso contrário
+    abre o arquivo novamente para não disputar a posição de leitura entre threads.
+
+    Returns:
+        bytes: Digest da folha
+    """
+    hash_obj = criar_objeto_hash(algoritmo)
+    hash_obj.update(PREFIXO_FOLHA)
+    restante = tamanho
+
+    if descritor is not None:
+        posicao = inicio
+        while restante > 0:
+            dados = os.pread(descritor, min(restante, TAMANHO_LEITURA), posicao)
+            if not dados:
+                raise EOFError(f"Arquivo truncado durante a leitura (posição {posicao})")
+            hash_obj.update(dados)
+            posicao += len(dados)
+            restante -= len(dados)
+    else:
+        with open(caminho_arquivo, 'rb') as arquivo:
+            arquivo.seek(inicio)
+            while restante > 0:
+                dados = arquivo.read(min(restante, TAMANHO_LEITURA))
+                if not dados:
+                    raise EOFError(f"Arquivo truncado durante a leitura (posição {arquivo.tell()})")
+                hash_obj.update(dados)
+                restante -= len(dados)
+
+    return hash_obj.digest()
+
+def combinar_blocos(digests, algoritmo='sha256'):
+    """
+    Combina os digests das folhas em uma raiz de árvore binária
+
+    Os nós são combinados em pares, nível a nível; um nó sem par sobe
+    para o próximo nível sem alteração.
+
+    Args:
+        digests (list): Digests (bytes) das folhas, na ordem do arquivo
+        algoritmo (str): Algoritmo de hash
+
+    Returns:
+        bytes: Digest da raiz
+    """
+    nivel = list(digests)
+    if not nivel:
+        hash_obj = criar_objeto_hash(algoritmo)
+        hash_obj.update(PREFIXO_FOLHA)
+        return hash_obj.digest()
+
+    while len(nivel) > 1:
+        proximo = []
+        for indice in range(0, len(nivel) - 1, 2):
+            hash_obj = criar_objeto_hash(algoritmo)
+            hash_obj.update(PREFIXO_NO)
+            hash_obj.update(nivel[indice])
+            hash_obj.update(nivel[indice + 1])
+            proximo.append(hash_obj.digest())
+        if len(nivel) % 2:
+            proximo.append(nivel[-1])
+        nivel = proximo
+    return nivel[0]
+
+def _total_blocos(tamanho_arquivo, tamanho_bloco):
+    """Número de blocos do arquivo (ao menos um, mesmo vazio)"""
+    if not isinstance(tamanho_bloco, int) or tamanho_bloco <= 0:
+        raise ValueError(f"O tamanho do bloco deve ser um inteiro positivo (recebido {tamanho_bloco!r})")
+    return max(1, -(-tamanho_arquivo // tamanho_bloco))
+
+def _intervalos(tamanho_arquivo, tamanho_bloco, indices=None):
+    """
+    Lista (indice, inicio, tamanho) dos blocos do arquivo
+
+    Raises:
+        ValueError: Se o tamanho do bloco não for positivo ou um índice estiver
+            fora dos blocos do arquivo
+    """
+    total = _total_blocos(tamanho_arquivo, tamanho_bloco)
+    intervalos = []
+    for indice in (range(total) if indices is None else indices):
+        if not isinstance(indice, int) or not 0 <= indice < total:
+            raise ValueError(f"Bloco {indice!r} fora do intervalo do arquivo (0 a {total - 1})")
+        inicio = indice * tamanho_bloco
+        intervalos.append((indice, inicio, max(0, min(tamanho_bloco, tamanho_arquivo - inicio))))
+    return intervalos
+
+def _hash_blocos(caminho_arquivo, intervalos, algoritmo, workers):
+    """Gera os digests dos blocos em paralelo, na ordem dos intervalos"""
+    workers = workers or os.cpu_count() or 1
+    descritor = os.open(caminho_arquivo, os.O_RDONLY) if hasattr(os, 'pread') else None
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(
+                lambda intervalo: _hash_bloco(caminho_arquivo, descritor, intervalo[1],
+                                              intervalo[2], algoritmo),
+                intervalos))
+    finally:
+        if descritor is not None:
+            os.close(descritor)
+
+def gerar_hash_blocos(caminho_arquivo, indices, algoritmo='sha256', tamanho_bloco=TAMANHO_BLOCO_ARVORE,
+                      workers=None):
+    """
+    Gera os hashes (folhas) de alguns blocos do arquivo
+
+    Permite dividir o cálculo de uma árvore entre várias máquinas; as folhas
+    depois são combinadas com combinar_blocos.
+
+    Args:
+        caminho_arquivo (str): Caminho para o arquivo
+        indices (list): Índices dos blocos
+        algoritmo (str): Algoritmo de hash
+        tamanho_bloco (int): Tamanho de cada bloco em bytes
+        workers (int): Número de threads (padrão: número de CPUs)
+
+    Returns:
+        list: Hashes hexadecimais dos blocos, na ordem de `indices`
+
+    Raises:
+        ValueError: Se o tamanho do bloco não for positivo ou um índice não existir
+    """
+    tamanho_arquivo = os.path.getsize(caminho_arquivo)
+    intervalos = _intervalos(tamanho_arquivo, tamanho_bloco, indices)
+    return [digest.hex() for digest in _hash_blocos(caminho_arquivo, intervalos, algoritmo, workers)]
+
+def gerar_hash_arvore(caminho_arquivo, algoritmo='sha256', tamanho_bloco=TAMANHO_BLOCO_ARVORE,
+                      workers=None):
+    """
+    Gera o hash em árvore de um arquivo, processando os blocos em paralelo
+
+    Args:
+        caminho_arquivo (str): Caminho para o arquivo
+        algoritmo (str): Algoritmo de hash usado nas folhas e nós
+        tamanho_bloco (int): Tamanho de cada bloco em bytes (padrão: 64 MiB)
+        workers (int): Número de threads (padrão: número de CPUs)
+
+    Returns:
+        dict: Árvore com 'tipo', 'algoritmo', 'tamanho_bloco', 'tamanho',
+            'raiz' e 'blocos' (hashes hexadecimais de cada bloco)
+    """
+    tamanho_arquivo = os.path.getsize(caminho_arquivo)
+    digests = _hash_blocos(caminho_arquivo, _intervalos(tamanho_arquivo, tamanho_bloco),
+                           algoritmo, workers)
+    return {
+        'tipo': f'merkle-{algoritmo.lower()}',
+        'algoritmo': algoritmo.lower(),
+        'tamanho_bloco': tamanho_bloco,
+        'tamanho': tamanho_arquivo,
+        'raiz': combinar_blocos(digests, algoritmo).hex(),
+        'blocos': [digest.hex() for digest in digests]
+    }
+
+def verificar_arvore(caminho_arquivo, arvore, blocos=None, workers=None):
+    """
+    Verifica um arquivo contra uma árvore salva
+
+    Args:
+        caminho_arquivo (str): Caminho para o arquivo
+        arvore (dict): Árvore gerada por gerar_hash_arvore (ou carregar_arvore)
+        blocos (list): Índices dos blocos a reverificar (None verifica todos)
+        workers (int): Número de threads (padrão: número de CPUs)
+
+    Returns:
+        dict: {'integro': bool, 'tamanho_atual': int,
+            'danificados': [{'indice', 'inicio', 'fim'}]}
+
+    Raises:
+        ValueError: Se a árvore tiver tamanho de bloco inválido, um número de
+            blocos incompatível com o tamanho salvo ou se um índice não existir
+    """
+    algoritmo = arvore['algoritmo']
+    tamanho_bloco = arvore['tamanho_bloco']
+    esperados = arvore['blocos']
+    total = _total_blocos(arvore['tamanho'], tamanho_bloco)
+    if len(esperados) != total:
+        raise ValueError(f"Árvore inconsistente: {len(esperados)} hashes de blocos para "
+                         f"{total} blocos de {tamanho_bloco} bytes")
+    tamanho_atual = os.path.getsize(caminho_arquivo)
+    if blocos is None:
+        blocos = range(len(esperados))
+
+    # Blocos que ultrapassam o tamanho atual estão danificados sem precisar de leitura
+    danificados = []
+    legiveis = []
+    for indice, inicio, tamanho in _intervalos(arvore['tamanho'], tamanho_bloco, blocos):
+        if inicio + tamanho > tamanho_atual:
+            danificados.append(indice)
+        else:
+            legiveis.append((indice, inicio, tamanho))
+
+    digests = _hash_blocos(caminho_arquivo, legiveis, algoritmo, workers)
+    for (indice, _, _), digest in zip(legiveis, digests):
+        if digest.hex() != esperados[indice]:
+            danificados.append(indice)
+
+    danificados.sort()
+    return {
+        'integro': not danificados and tamanho_atual == arvore['tamanho'],
+        'tamanho_atual': tamanho_atual,
+        'danificados': [
+            {'indice': indice, 'inicio': indice * tamanho_bloco,
+             'fim': min((indice + 1) * tamanho_bloco, arvore['tamanho'])}
+            for indice in danificados
+        ]
+    }
+
+def salvar_arvore(arvore, caminho_saida):
+    """Salva a árvore em um arquivo JSON"""
+    with open(caminho_saida, 'w', encoding='utf-8') as saida:
+        json.dump(arvore, saida, indent=1)
+
+def carregar_arvore(caminho_arvore):
+    """
+    Carrega uma árvore salva com salvar_arvore, conferindo a raiz
+
+    Raises:
+        ValueError: Se os hashes dos blocos não correspondem à raiz salva
+    """
+    with open(caminho_arvore, 'r', encoding='utf-8') as entrada:
+        arvore = json.load(entrada)
+    raiz = combinar_blocos([bytes.fromhex(h) for h in arvore['blocos']], arvore['algoritmo'])
+    if raiz.hex() != arvore['raiz']:
+        raise ValueError(f"Árvore '{caminho_arvore}' inconsistente: a raiz não confere com os blocos")
+    return arvore
+
+def main(argv=None):
+    """Gera ou verifica o hash em árvore de um arquivo"""
+    parser = argparse.ArgumentParser(description="Hash em árvore (Merkle) de arquivos grandes")
+    parser.add_argument('arquivo')
+    parser.add_argument('-a', '--algoritmo', default='sha256')
+    parser.add_argument('-b', '--bloco', type=ler_tamanho, default=TAMANHO_BLOCO_ARVORE,
+                        help="Tamanho do bloco, ex.: 64M (padrão)")
+    parser.add_argument('-j', '--workers', type=int, default=None)
+    parser.add_argument('-s', '--salvar', help="Salva a árvore neste arquivo JSON")
+    parser.add_argument('-v', '--verificar', help="Verifica o arquivo contra esta árvore JSON")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.verificar:
+            resultado = verificar_arvore(args.arquivo, carregar_arvore(args.verificar), workers=args.workers)
+        else:
+            arvore = gerar_hash_arvore(args.arquivo, args.algoritmo, args.bloco, args.workers)
+    except ValueError as e:
+        print(f"Erro: {str(e)}", file=sys.stderr)
+        return 1
+
+    if args.verificar:
+        for dano in resultado['danificados']:
+            print(f"Bloco {dano['indice']} danificado: bytes {dano['inicio']}-{dano['fim']}")
+        print("Arquivo íntegro" if resultado['integro'] else "Arquivo danificado")
+        return 0 if resultado['integro'] else 1
+
+    if args.salvar:
+        salvar_arvore(arvore, args.salvar)
+    print(f"{arvore['raiz']}  {args.arquivo}  ({arvore['tipo']}, {len(arvore['blocos'])} blocos)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+API assíncrona (asyncio) do gerador de hashcode
+Executa a geração de hashes em um pool de threads limitado, sem bloquear o
+event loop, com suporte a cancelamento, limite de concorrência e fluxos de
+bytes assíncronos (ex.: corpo de uploads) processados bloco a bloco
+"""
+
+import asyncio
+import os
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from gerador_hash import gerar_hash, gerar_hash_arquivo, criar_objeto_hash, OperacaoCancelada
+
+# Entradas menores que isso são processadas direto no event loop: enviar para
+# uma thread custaria mais que o próprio hash
+LIMITE_INLINE = 64 * 1024
+
+# Bytes lidos por vez de fluxos com método read() (ex.: asyncio.StreamReader)
+TAMANHO_LEITURA_FLUXO = 256 * 1024
+
+class HasherAsync:
+    """
+    Gera hashes de forma assíncrona usando um pool de threads próprio
+
+    O hashlib libera o GIL para blocos grandes, então as threads processam
+    vários arquivos ou fluxos em paralelo enquanto o event loop continua livre.
+    """
+
+    def __init__(self, workers=None, max_concorrencia=None):
+        """
+        Args:
+            workers (int): Threads do pool (padrão: número de CPUs)
+            max_concorrencia (int): Máximo de hashes de arquivo simultâneos
+                (padrão: igual a workers); os demais aguardam na fila
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.max_concorrencia = max_concorrencia or self.workers
+        self._executor = ThreadPoolExecutor(max_workers=self.workers,
+                                            thread_name_prefix='hasher-async')
+        self._semaforos = weakref.WeakKeyDictionary()
+
+    def _obter_semaforo(self):
+        # Um semáforo por event loop, pois o asyncio não permite compartilhá-los
+        loop = asyncio.get_running_loop()
+        semaforo = self._semaforos.get(loop)
+        if semaforo is None:
+            semaforo = self._semaforos[loop] = asyncio.Semaphore(self.max_concorrencia)
+        return semaforo
+
+    async def _executar(self, funcao, *args):
+        """Executa uma função no pool de threads"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(funcao, *args))
+
+    async def gerar_hash(self, texto, algoritmo='sha256'):
+        """
+        Versão assíncrona de gerador_hash.gerar_hash
+
+        Textos e buffers pequenos são processados imediatamente; os grandes e os
+        iteráveis de blocos (de tamanho desconhecido) vão para o pool.
+        """
+        if isinstance(texto, str):
+            if len(texto) < LIMITE_INLINE:
+                return gerar_hash(texto, algoritmo)
+        elif isinstance(texto, (bytes, bytearray, memoryview)) and memoryview(texto).nbytes < LIMITE_INLINE:
+            return gerar_hash(texto, algoritmo)
+        async with self._obter_semaforo():
+            return await self._executar(gerar_hash, texto, algoritmo)
+
+    async def gerar_hash_arquivo(self, caminho_arquivo, algoritmo='sha256', **opcoes):
+        """
+        Versão assíncrona de gerador_hash.gerar_hash_arquivo
+
+        Se a tarefa for cancelada, a leitura é interrompida no próximo bloco e
+        a vaga de concorrência só é liberada depois que a thread termina.
+
+        Args:
+            caminho_arquivo (str): Caminho para o arquivo
+            algoritmo (str | list): Algoritmo de hash ou lista de algoritmos
+            **opcoes: Repassados para gerar_hash_arquivo (tamanho_bloco, modo_leitura)
+
+        Returns:
+            str | dict: Como em gerar_hash_arquivo
+        """
+        async with self._obter_semaforo():
+            cancelar = threading.Event()
+            futuro = asyncio.ensure_future(self._executar(
+                partial(gerar_hash_arquivo, cancelar=cancelar, **opcoes), caminho_arquivo, algoritmo))
+            try:
+                return await asyncio.shield(futuro)
+            except asyncio.CancelledError:
+                cancelar.set()
+                try:
+                    await futuro
+                except OperacaoCancelada:
+                    pass
+                raise
+
+    async def gerar_hash_stream(self, fluxo, algoritmo='sha256'):
+        """
+        Gera o hash de um fluxo assíncrono de bytes sem acumulá-lo em memória
+
+        Blocos grandes são processados no pool e ocupam uma vaga do mesmo limite
+        de concorrência de gerar_hash_arquivo enquanto são processados.
+
+        Args:
+            fluxo: Iterável assíncrono de blocos (bytes, bytearray ou memoryview)
+                ou objeto com corrotina read(n), como asyncio.StreamReader
+            algoritmo (str | list): Algoritmo de hash ou lista de algoritmos
+
+        Returns:
+            str: Hash gerado
+            dict: {algoritmo: hash} quando uma lista de algoritmos é informada
+        """
+        varios = isinstance(algoritmo, (list, tuple))
+        algoritmos = [a.lower() for a in algoritmo] if varios else [algoritmo.lower()]
+        hash_objs = {nome: criar_objeto_hash(nome) for nome in algoritmos}
+
+        def atualizar(bloco):
+            for hash_obj in hash_objs.values():
+                hash_obj.update(bloco)
+
+        semaforo = self._obter_semaforo()
+        async for bloco in _iterar_fluxo(fluxo):
+            # nbytes: len() de um memoryview com itens maiores que 1 byte conta itens
+            if memoryview(bloco).nbytes < LIMITE_INLINE:
+                atualizar(bloco)
+            else:
+                async with semaforo:
+                    await self._executar(atualizar, bloco)
+
+        if varios:
+            return {nome: obj.hexdigest() for nome, obj in hash_objs.items()}
+        return hash_objs[algoritmos[0]].hexdigest()
+
+    def fechar(self):
+        """Encerra o pool de threads"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        self.fechar()
+
+async def _iterar_fluxo(fluxo):
+    """Normaliza fluxos com read(n) e iteráveis assíncronos em blocos"""
+    if hasattr(fluxo, 'read'):
+        while bloco := await fluxo.read(TAMANHO_LEITURA_FLUXO):
+            yield bloco
+    else:
+        async for bloco in fluxo:
+            if bloco:
+                yield bloco
+
+_hasher_padrao = None
+
+def _obter_hasher_padrao():
+    global _hasher_padrao
+    if _hasher_padrao is None:
+        _hasher_padrao = HasherAsync()
+    return _hasher_padrao
+
+async def gerar_hash_async(texto, algoritmo='sha256'):
+    """Gera o hash de um texto sem bloquear o event loop (pool padrão)"""
+    return await _obter_hasher_padrao().gerar_hash(texto, algoritmo)
+
+async def gerar_hash_arquivo_async(caminho_arquivo, algoritmo='sha256', **opcoes):
+    """Gera o hash de um arquivo sem bloquear o event loop (pool padrão)"""
+    return await _obter_hasher_padrao().gerar_hash_arquivo(caminho_arquivo, algoritmo, **opcoes)
+
+async def gerar_hash_stream_async(fluxo, algoritmo='sha256'):
+    """Gera o hash de um fluxo assíncrono de bytes (pool padrão)"""
+    return await _obter_hasher_padrao().gerar_hash_stream(fluxo, algoritmo)
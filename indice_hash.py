@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Índice compacto de hashes conhecidos
+Guarda os digests em binário, ordenados, em um arquivo consultado via mmap,
+com um filtro de Bloom à frente para descartar rapidamente hashes ausentes.
+O arquivo não é carregado na abertura: a memória usada fica próxima de
+tamanho_do_digest × N no disco, e só as páginas consultadas são lidas.
+
+Formato do arquivo: cabeçalho de 64 bytes | digests ordenados | bits do Bloom
+"""
+
+import argparse
+import heapq
+import math
+import mmap
+import os
+import struct
+import sys
+import tempfile
+
+from gerador_hash import gerar_hash_diretorio
+
+MAGICO = b'GHIDX001'
+# mágico, algoritmo, tamanho do digest, quantidade, bits do Bloom, funções do Bloom
+FORMATO_CABECALHO = '<8s16sIQQI'
+TAMANHO_CABECALHO = 64
+
+TAXA_FALSOS_POSITIVOS_PADRAO = 0.01
+# Digests mantidos em memória por vez durante a ordenação externa
+TAMANHO_RUN_PADRAO = 1000000
+TAMANHO_LEITURA_RUN = 1024 * 1024
+
+def _hash_do_resultado(hash_valor, algoritmo):
+    """Extrai o hash do algoritmo de um resultado de gerar_hash_arquivo (str ou dict)"""
+    if isinstance(hash_valor, dict):
+        return hash_valor.get(algoritmo.lower())
+    return hash_valor
+
+def _para_digest(item, algoritmo):
+    """
+    Converte um item da fonte em bytes do digest
+
+    Aceita bytes, hexadecimal, linhas no formato "<hash>  <caminho>" e tuplas
+    (caminho, hash) como as produzidas por gerar_hash_diretorio, inclusive com
+    um dict {algoritmo: hash} quando vários algoritmos foram pedidos.
+
+    Returns:
+        bytes: Digest ou None para linhas vazias e comentários
+
+    Raises:
+        ValueError: Se o item não contiver um hash válido
+    """
+    if isinstance(item, tuple):
+        item = _hash_do_resultado(item[1], algoritmo)
+        if item is None:
+            raise ValueError(f"Resultado sem hash {algoritmo}")
+    if isinstance(item, (bytes, bytearray, memoryview)):
+        return bytes(item)
+    texto = item.strip().split(None, 1)
+    if not texto:
+        return None
+    hexadecimal = texto[0].lstrip('\\')
+    if hexadecimal.startswith('#'):
+        return None
+    try:
+        return bytes.fromhex(hexadecimal)
+    except ValueError:
+        raise ValueError(f"Hash inválido: {hexadecimal[:80]!r}") from None
+
+def _parametros_bloom(quantidade, taxa_falsos_positivos):
+    """Calcula o número de bits (múltiplo de 8) e de funções do filtro de Bloom"""
+    quantidade = max(quantidade, 1)
+    bits = math.ceil(-quantidade * math.log(taxa_falsos_positivos) / (math.log(2) ** 2))
+    bits = max(64, (bits + 7) // 8 * 8)
+    funcoes = max(1, round(bits / quantidade * math.log(2)))
+    return bits, funcoes
+
+def _posicoes_bloom(digest, bits, funcoes):
+    """
+    Gera as posições do digest no filtro de Bloom
+
+    Os digests criptográficos já são uniformes, então as duas bases do
+    hashing duplo (Kirsch-Mitzenmacher) são lidas direto dos seus bytes.
+    """
+    if len(digest) < 16:
+        digest = digest * (16 // len(digest) + 1)
+    h1 = int.from_bytes(digest[:8], 'little')
+    h2 = int.from_bytes(digest[8:16], 'little') | 1
+    return [(h1 + i * h2) % bits for i in range(funcoes)]
+
+def _ler_run(caminho_run, tamanho_digest):
+    """Lê os digests de um arquivo temporário da ordenação externa"""
+    tamanho_leitura = TAMANHO_LEITURA_RUN // tamanho_digest * tamanho_digest
+    with open(caminho_run, 'rb') as run:
+        while dados := run.read(tamanho_leitura):
+            for inicio in range(0, len(dados), tamanho_digest):
+                yield dados[inicio:inicio + tamanho_digest]
+
+def construir_indice(fonte, caminho_saida, algoritmo='sha256',
+                     taxa_falsos_positivos=TAXA_FALSOS_POSITIVOS_PADRAO,
+                     tamanho_run=TAMANHO_RUN_PADRAO, invalidos=None):
+    """
+    Constrói um índice a partir de uma fonte de hashes
+
+    A ordenação é externa: blocos de `tamanho_run` digests são ordenados em
+    memória, gravados em arquivos temporários e depois intercalados, então
+    fontes maiores que a memória são suportadas. Digests repetidos são gravados
+    uma única vez.
+
+    Args:
+        fonte (str | iterable): Caminho de um arquivo de texto (um hash por linha
+            ou manifesto "<hash>  <caminho>") ou iterável de hashes hexadecimais,
+            bytes ou tuplas (caminho, hash) de gerar_hash_diretorio
+        caminho_saida (str): Arquivo do índice a ser criado
+        algoritmo (str): Nome do algoritmo dos digests (gravado no cabeçalho)
+        taxa_falsos_positivos (float): Taxa alvo de falsos positivos do Bloom
+        tamanho_run (int): Digests ordenados em memória por vez
+        invalidos (list): Se informada, recebe tuplas (número da linha, motivo)
+            das linhas ignoradas por não conterem um hash válido
+
+    Returns:
+        int: Número de digests distintos gravados
+    """
+    if isinstance(fonte, str):
+        with open(fonte, 'r', encoding='utf-8', errors='replace') as arquivo:
+            return construir_indice(arquivo, caminho_saida, algoritmo,
+                                    taxa_falsos_positivos, tamanho_run, invalidos)
+
+    tamanho_digest = None
+    total = 0
+    with tempfile.TemporaryDirectory(prefix='indice_hash_') as temporario:
+        runs = []
+        atual = []
+
+        def gravar_run():
+            caminho_run = os.path.join(temporario, f'run{len(runs)}')
+            atual.sort()
+            with open(caminho_run, 'wb') as run:
+                run.write(b''.join(atual))
+            runs.append(caminho_run)
+            atual.clear()
+
+        for numero, item in enumerate(fonte, 1):
+            if isinstance(item, tuple) and isinstance(item[1], str) and item[1].startswith('Erro'):
+                continue
+            try:
+                digest = _para_digest(item, algoritmo)
+                if digest is None:
+                    continue
+                if tamanho_digest is None:
+                    tamanho_digest = len(digest)
+                elif len(digest) != tamanho_digest:
+                    raise ValueError(f"Digest com {len(digest)} bytes; o índice usa {tamanho_digest} bytes")
+            except ValueError as e:
+                # Uma linha malformada não invalida o restante da fonte
+                if invalidos is not None:
+                    invalidos.append((numero, str(e)))
+                continue
+            atual.append(digest)
+            total += 1
+            if len(atual) >= tamanho_run:
+                gravar_run()
+
+        if tamanho_digest is None:
+            raise ValueError("A fonte não contém nenhum hash")
+
+        if runs:
+            gravar_run()
+            ordenados = heapq.merge(*(_ler_run(run, tamanho_digest) for run in runs))
+        else:
+            atual.sort()
+            ordenados = iter(atual)
+
+        # O Bloom é dimensionado pelo total antes de remover repetidos
+        bits, funcoes = _parametros_bloom(total, taxa_falsos_positivos)
+        bloom = bytearray(bits // 8)
+        quantidade = 0
+        anterior = None
+
+        with open(caminho_saida, 'wb') as saida:
+            saida.write(b'\0' * TAMANHO_CABECALHO)
+            lote = []
+            for digest in ordenados:
+                if digest == anterior:
+                    continue
+                anterior = digest
+                quantidade += 1
+                lote.append(digest)
+                for posicao in _posicoes_bloom(digest, bits, funcoes):
+                    bloom[posicao >> 3] |= 1 << (posicao & 7)
+                if len(lote) >= 65536:
+                    saida.write(b''.join(lote))
+                    lote = []
+            saida.write(b''.join(lote))
+            saida.write(bloom)
+
+            saida.seek(0)
+            saida.write(struct.pack(FORMATO_CABECALHO, MAGICO, algoritmo.lower().encode('ascii')[:16],
+                                    tamanho_digest, quantidade, bits, funcoes))
+
+    return quantidade
+
+class IndiceHash:
+    """
+    Consulta um índice criado por construir_indice sem carregá-lo em memória
+    """
+
+    def __init__(self, caminho_indice):
+        """
+        Args:
+            caminho_indice (str): Arquivo do índice
+
+        Raises:
+            ValueError: Se o arquivo não for um índice válido
+        """
+        self.caminho_indice = caminho_indice
+        self._mapa = None
+        self._arquivo = open(caminho_indice, 'rb')
+        try:
+            # Arquivos menores que o cabeçalho (inclusive vazios, que o mmap recusa)
+            if os.fstat(self._arquivo.fileno()).st_size < TAMANHO_CABECALHO:
+                raise ValueError
+            self._mapa = mmap.mmap(self._arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+            magico, algoritmo, tamanho_digest, quantidade, bits, funcoes = struct.unpack_from(
+                FORMATO_CABECALHO, self._mapa, 0)
+            inicio_bloom = TAMANHO_CABECALHO + tamanho_digest * quantidade
+            if magico != MAGICO or len(self._mapa) != inicio_bloom + bits // 8:
+                raise ValueError
+            algoritmo = algoritmo.rstrip(b'\0').decode('ascii')
+        except (ValueError, struct.error):
+            self.fechar()
+            raise ValueError(f"'{caminho_indice}' não é um índice de hashes válido") from None
+
+        self.algoritmo = algoritmo
+        self.tamanho_digest = tamanho_digest
+        self.quantidade = quantidade
+        self._bits = bits
+        self._funcoes = funcoes
+        self._inicio_bloom = inicio_bloom
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.fechar()
+
+    def __len__(self):
+        return self.quantidade
+
+    def __contains__(self, digest):
+        return self.contem(digest)
+
+    def _no_bloom(self, digest):
+        mapa = self._mapa
+        inicio = self._inicio_bloom
+        for posicao in _posicoes_bloom(digest, self._bits, self._funcoes):
+            if not mapa[inicio + (posicao >> 3)] & (1 << (posicao & 7)):
+                return False
+        return True
+
+    def contem(self, digest):
+        """
+        Verifica se um digest está no índice
+
+        Args:
+            digest (str | bytes): Hash hexadecimal ou bytes do digest
+
+        Returns:
+            bool: True se o digest está no índice
+        """
+        if isinstance(digest, str):
+            digest = bytes.fromhex(digest.strip())
+        if len(digest) != self.tamanho_digest or not self._no_bloom(digest):
+            return False
+
+        # Busca binária direto no mapeamento
+        mapa = self._mapa
+        tamanho = self.tamanho_digest
+        inferior, superior = 0, self.quantidade
+        while inferior < superior:
+            meio = (inferior + superior) // 2
+            inicio = TAMANHO_CABECALHO + meio * tamanho
+            atual = mapa[inicio:inicio + tamanho]
+            if atual < digest:
+                inferior = meio + 1
+            elif atual > digest:
+                superior = meio
+            else:
+                return True
+        return False
+
+    def contem_lote(self, digests):
+        """
+        Verifica vários digests
+
+        Args:
+            digests (iterable): Hashes hexadecimais ou bytes
+
+        Returns:
+            list: Um bool por digest, na mesma ordem
+        """
+        return [self.contem(digest) for digest in digests]
+
+    def consultar_resultados(self, resultados):
+        """
+        Confere resultados de gerar_hash_diretorio contra o índice
+
+        Args:
+            resultados (iterable): Tuplas (caminho, hash); o hash pode ser um dict
+                {algoritmo: hash}, do qual é usado o algoritmo do índice
+
+        Yields:
+            tuple: (caminho, hash, encontrado); hashes com erro nunca são encontrados
+        """
+        for caminho, hash_valor in resultados:
+            hash_valor = _hash_do_resultado(hash_valor, self.algoritmo)
+            encontrado = (hash_valor is not None and not hash_valor.startswith('Erro')
+                          and self.contem(hash_valor))
+            yield caminho, hash_valor, encontrado
+
+    def fechar(self):
+        """Fecha o mapeamento e o arquivo"""
+        if self._mapa is not None:
+            self._mapa.close()
+            self._mapa = None
+        self._arquivo.close()
+
+def main(argv=None):
+    """Constrói ou consulta índices de hashes pela linha de comando"""
+    parser = argparse.ArgumentParser(description="Índice compacto de hashes conhecidos")
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+
+    construir = subparsers.add_parser('construir', help="Constrói um índice")
+    construir.add_argument('indice', help="Arquivo do índice a ser criado")
+    construir.add_argument('fonte', help="Lista de hashes (um por linha), manifesto ou diretório")
+    construir.add_argument('-a', '--algoritmo', default='sha256')
+    construir.add_argument('--taxa', type=float, default=TAXA_FALSOS_POSITIVOS_PADRAO,
+                           help="Taxa de falsos positivos do filtro de Bloom")
+
+    consultar = subparsers.add_parser('consultar', help="Confere um diretório contra o índice")
+    consultar.add_argument('indice')
+    consultar.add_argument('diretorio')
+    consultar.add_argument('-j', '--workers', type=int, default=None)
+    consultar.add_argument('--ausentes', action='store_true',
+                           help="Lista os arquivos que não estão no índice (padrão: os encontrados)")
+
+    args = parser.parse_args(argv)
+
+    try:
+        return _executar(args)
+    except (OSError, ValueError) as e:
+        print(f"Erro: {str(e)}", file=sys.stderr)
+        return 1
+
+def _executar(args):
+    """Executa o subcomando já validado pelo argparse"""
+    if args.comando == 'construir':
+        fonte = args.fonte
+        if os.path.isdir(fonte):
+            fonte = gerar_hash_diretorio(fonte, args.algoritmo)
+        invalidos = []
+        quantidade = construir_indice(fonte, args.indice, args.algoritmo, args.taxa, invalidos=invalidos)
+        for numero, motivo in invalidos[:10]:
+            print(f"Linha {numero} ignorada: {motivo}", file=sys.stderr)
+        if invalidos:
+            print(f"{len(invalidos)} linhas inválidas ignoradas", file=sys.stderr)
+        print(f"{quantidade} hashes gravados em {args.indice}", file=sys.stderr)
+        return 0
+
+    with IndiceHash(args.indice) as indice:
+        resultados = gerar_hash_diretorio(args.diretorio, indice.algoritmo, workers=args.workers)
+        for caminho, hash_valor, encontrado in indice.consultar_resultados(resultados):
+            if encontrado != args.ausentes:
+                print(f"{hash_valor}  {caminho}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
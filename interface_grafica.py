@@ -8,11 +8,30 @@ Uma interface moderna e intuitiva usando tkinter
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
 import os
-from gerador_hash import gerar_hash, gerar_hash_arquivo, identificar_tipo_hash
+import queue
+import threading
+import time
+from gerador_hash import (gerar_hash, gerar_hash_arquivo, identificar_tipo_hash,
+                          identificar_hashes_lote, listar_arquivos, listar_algoritmos,
+                          OperacaoCancelada)
+
+# Checkbuttons de algoritmos por linha na aba de arquivos
+ALGORITMOS_POR_LINHA = 6
+
+# Intervalo (ms) entre as leituras da fila de mensagens do worker de arquivos
+INTERVALO_FILA_MS = 100
+# Intervalo mínimo (s) entre atualizações de progresso enviadas pelo worker
+INTERVALO_PROGRESSO = 0.1
+# Mensagens da fila tratadas por ciclo do event loop; o restante fica para o
+# próximo ciclo, para que o Tk continue respondendo em pastas muito grandes
+MAX_MENSAGENS_POR_CICLO = 500
 
 class GeradorHashGUI:
     def __init__(self, root):
         self.root = root
+        self.fila_arquivos = queue.Queue()
+        self.cancelar_evento = None
+        self.worker_arquivos = None
         self.setup_window()
         self.create_widgets()
         
@@ -58,10 +77,13 @@ class GeradorHashGUI:
         # Aba 1: Hash de Texto
         self.create_text_tab(notebook)
         
-        # Aba 2: Identificador de Hash
+        # Aba 2: Hash de Arquivo
+        self.create_file_tab(notebook)
+        
+        # Aba 3: Identificador de Hash
         self.create_hash_identifier_tab(notebook)
         
-        # Aba 3: Comparar Hashes
+        # Aba 4: Comparar Hashes
         self.create_compare_tab(notebook)
         
         # Área de resultado
@@ -101,11 +123,10 @@ class GeradorHashGUI:
         algo_frame.grid(row=2, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(0, 10))
         
         self.algoritmo_var = tk.StringVar(value="sha256")
-        algoritmos = [("MD5", "md5"), ("SHA1", "sha1"), ("SHA256", "sha256"), ("SHA512", "sha512")]
+        algoritmos = [info['nome'] for info in listar_algoritmos()]
         
-        for i, (nome, valor) in enumerate(algoritmos):
-            ttk.Radiobutton(algo_frame, text=nome, variable=self.algoritmo_var, 
-                           value=valor).grid(row=0, column=i, padx=10)
+        ttk.Combobox(algo_frame, textvariable=self.algoritmo_var, values=algoritmos,
+                     state="readonly", width=20).grid(row=0, column=0, sticky=tk.W)
         
         # Botão para gerar hash
         ttk.Button(text_frame, text="Gerar Hash do Texto", 
@@ -115,6 +136,55 @@ class GeradorHashGUI:
         text_frame.columnconfigure(0, weight=1)
         text_frame.rowconfigure(1, weight=1)
         
+    def create_file_tab(self, notebook):
+        """Cria a aba para hash de arquivos e pastas"""
+        file_frame = ttk.Frame(notebook, padding="10")
+        notebook.add(file_frame, text="📁 Hash de Arquivo")
+        
+        # Caminho do arquivo ou pasta
+        ttk.Label(file_frame, text="Arquivo ou pasta:").grid(row=0, column=0, sticky=tk.W, pady=(0, 5))
+        
+        self.caminho_entry = ttk.Entry(file_frame, width=60)
+        self.caminho_entry.grid(row=1, column=0, sticky=(tk.W, tk.E), pady=(0, 10))
+        
+        ttk.Button(file_frame, text="Arquivo...", 
+                  command=self.selecionar_arquivo).grid(row=1, column=1, padx=(10, 0), pady=(0, 10))
+        ttk.Button(file_frame, text="Pasta...", 
+                  command=self.selecionar_pasta).grid(row=1, column=2, padx=(10, 0), pady=(0, 10))
+        
+        # Algoritmos (vários podem ser gerados na mesma leitura)
+        algo_frame = ttk.LabelFrame(file_frame, text="Algoritmos de Hash", padding="10")
+        algo_frame.grid(row=2, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=(0, 10))
+        
+        self.algoritmos_arquivo_vars = {}
+        for i, info in enumerate(listar_algoritmos()):
+            var = tk.BooleanVar(value=(info['nome'] == "sha256"))
+            self.algoritmos_arquivo_vars[info['nome']] = var
+            ttk.Checkbutton(algo_frame, text=info['nome'].upper(), variable=var).grid(
+                row=i // ALGORITMOS_POR_LINHA, column=i % ALGORITMOS_POR_LINHA, padx=10, sticky=tk.W)
+        
+        # Botões de gerar e cancelar
+        botoes_frame = ttk.Frame(file_frame)
+        botoes_frame.grid(row=3, column=0, columnspan=3, sticky=tk.W, pady=10)
+        
+        self.gerar_arquivo_button = ttk.Button(botoes_frame, text="Gerar Hash do Arquivo", 
+                                               command=self.gerar_hash_arquivo)
+        self.gerar_arquivo_button.pack(side=tk.LEFT, padx=(0, 10))
+        self.cancelar_arquivo_button = ttk.Button(botoes_frame, text="Cancelar", 
+                                                  command=self.cancelar_hash_arquivo, state=tk.DISABLED)
+        self.cancelar_arquivo_button.pack(side=tk.LEFT)
+        
+        # Progresso
+        self.progresso_var = tk.DoubleVar(value=0)
+        ttk.Progressbar(file_frame, variable=self.progresso_var, maximum=100).grid(
+            row=4, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=(0, 5))
+        
+        self.status_arquivo_label = ttk.Label(file_frame, text="", font=('Arial', 8))
+        self.status_arquivo_label.grid(row=5, column=0, columnspan=3, sticky=tk.W)
+        
+        # Configura o grid
+        file_frame.columnconfigure(0, weight=1)
+        
     def create_hash_identifier_tab(self, notebook):
         """Cria a aba para identificar tipos de hash"""
         identifier_frame = ttk.Frame(notebook, padding="10")
@@ -218,6 +288,170 @@ class GeradorHashGUI:
         
         self.adicionar_resultado(resultado)
         
+    def selecionar_arquivo(self):
+        """Abre o diálogo para escolher um arquivo"""
+        caminho = filedialog.askopenfilename(title="Selecionar arquivo")
+        if caminho:
+            self.caminho_entry.delete(0, tk.END)
+            self.caminho_entry.insert(0, caminho)
+        
+    def selecionar_pasta(self):
+        """Abre o diálogo para escolher uma pasta"""
+        caminho = filedialog.askdirectory(title="Selecionar pasta")
+        if caminho:
+            self.caminho_entry.delete(0, tk.END)
+            self.caminho_entry.insert(0, caminho)
+        
+    def gerar_hash_arquivo(self):
+        """Inicia o hash do arquivo ou pasta em uma thread de fundo"""
+        caminho = self.caminho_entry.get().strip()
+        
+        if not caminho:
+            messagebox.showwarning("Aviso", "Por favor, selecione um arquivo ou pasta!")
+            return
+        if not os.path.exists(caminho):
+            messagebox.showerror("Erro", f"Arquivo ou pasta não encontrado: {caminho}")
+            return
+        
+        algoritmos = [nome for nome, var in self.algoritmos_arquivo_vars.items() if var.get()]
+        if not algoritmos:
+            messagebox.showwarning("Aviso", "Por favor, escolha pelo menos um algoritmo!")
+            return
+        
+        if self.worker_arquivos is not None and self.worker_arquivos.is_alive():
+            return
+        
+        self.cancelar_evento = threading.Event()
+        self.gerar_arquivo_button.config(state=tk.DISABLED)
+        self.cancelar_arquivo_button.config(state=tk.NORMAL)
+        self.progresso_var.set(0)
+        self.status_arquivo_label.config(text="Preparando...")
+        
+        # O Tk não pode ser usado fora da thread principal: o worker só envia
+        # mensagens pela fila, que é lida periodicamente com root.after
+        self.worker_arquivos = threading.Thread(
+            target=self._processar_arquivos,
+            args=(caminho, algoritmos, self.cancelar_evento),
+            daemon=True)
+        self.worker_arquivos.start()
+        self.root.after(INTERVALO_FILA_MS, self._verificar_fila_arquivos)
+        
+    def cancelar_hash_arquivo(self):
+        """Solicita o cancelamento do hash em andamento"""
+        if self.cancelar_evento is not None:
+            self.cancelar_evento.set()
+            self.status_arquivo_label.config(text="Cancelando...")
+        
+    def _processar_arquivos(self, caminho, algoritmos, cancelar):
+        """Gera os hashes na thread de fundo, enviando progresso e resultados pela fila"""
+        fila = self.fila_arquivos
+        try:
+            # A listagem e o stat de uma árvore grande demoram: o cancelamento
+            # é conferido a cada arquivo, antes mesmo de começar os hashes
+            arquivos = []
+            tamanhos = []
+            for arquivo in listar_arquivos(caminho) if os.path.isdir(caminho) else [caminho]:
+                if cancelar.is_set():
+                    raise OperacaoCancelada("Hash cancelado durante a listagem")
+                arquivos.append(arquivo)
+                try:
+                    tamanhos.append(os.path.getsize(arquivo))
+                except OSError:
+                    tamanhos.append(0)
+            total = sum(tamanhos)
+            
+            concluidos = 0
+            inicio = time.monotonic()
+            ultimo_envio = 0.0
+            
+            for arquivo, tamanho in zip(arquivos, tamanhos):
+                def progresso(lidos, _tamanho, base=concluidos):
+                    nonlocal ultimo_envio
+                    agora = time.monotonic()
+                    if agora - ultimo_envio >= INTERVALO_PROGRESSO:
+                        ultimo_envio = agora
+                        fila.put(('progresso', base + lidos, total, agora - inicio))
+                
+                resultado = gerar_hash_arquivo(arquivo, algoritmos, cancelar=cancelar,
+                                               progresso=progresso)
+                concluidos += tamanho
+                fila.put(('resultado', arquivo, resultado))
+            
+            fila.put(('progresso', total, total, time.monotonic() - inicio))
+            fila.put(('fim', False))
+        except OperacaoCancelada:
+            fila.put(('fim', True))
+        except Exception as e:
+            fila.put(('erro', str(e)))
+            fila.put(('fim', False))
+        
+    def _verificar_fila_arquivos(self):
+        """
+        Processa as mensagens enviadas pelo worker de arquivos
+        
+        No máximo MAX_MENSAGENS_POR_CICLO por chamada: os resultados são juntados
+        em um único insert no Text e só o último progresso é exibido.
+        """
+        terminou = cancelado = pendente = False
+        textos = []
+        progresso = None
+        try:
+            for _ in range(MAX_MENSAGENS_POR_CICLO):
+                mensagem = self.fila_arquivos.get_nowait()
+                tipo = mensagem[0]
+                
+                if tipo == 'progresso':
+                    progresso = mensagem[1:]
+                elif tipo == 'resultado':
+                    _, arquivo, hashes = mensagem
+                    textos.append(f"\n=== HASH DE ARQUIVO ===\nArquivo: {arquivo}\n")
+                    if isinstance(hashes, dict):
+                        textos.extend(f"{algoritmo.upper()}: {hash_valor}\n"
+                                      for algoritmo, hash_valor in hashes.items())
+                    else:
+                        textos.append(f"{hashes}\n")
+                elif tipo == 'erro':
+                    if textos:
+                        self.adicionar_resultado(''.join(textos))
+                        textos = []
+                    messagebox.showerror("Erro", f"Erro ao gerar hash: {mensagem[1]}")
+                elif tipo == 'fim':
+                    terminou, cancelado = True, mensagem[1]
+                    break
+            else:
+                pendente = True
+        except queue.Empty:
+            pass
+        
+        if textos:
+            self.adicionar_resultado(''.join(textos))
+        if progresso is not None:
+            self._atualizar_progresso(*progresso)
+        if cancelado:
+            self.status_arquivo_label.config(text="Cancelado")
+        
+        if terminou:
+            self.gerar_arquivo_button.config(state=tk.NORMAL)
+            self.cancelar_arquivo_button.config(state=tk.DISABLED)
+        else:
+            # Com mensagens acumuladas, volta logo, mas depois dos eventos da interface
+            self.root.after(1 if pendente else INTERVALO_FILA_MS, self._verificar_fila_arquivos)
+        
+    def _atualizar_progresso(self, feitos, total, decorrido):
+        """Atualiza a barra de progresso, a taxa de leitura e o tempo restante"""
+        self.progresso_var.set(100.0 * feitos / total if total else 100.0)
+        
+        taxa = feitos / decorrido if decorrido > 0 else 0
+        if taxa > 0 and total > feitos:
+            restante = (total - feitos) / taxa
+            eta = f"{int(restante // 60)}:{int(restante % 60):02d}"
+        else:
+            eta = "0:00"
+        
+        self.status_arquivo_label.config(
+            text=f"{feitos / 1024 ** 2:.1f} de {total / 1024 ** 2:.1f} MB - "
+                 f"{taxa / 1024 ** 2:.1f} MB/s - restante {eta}")
+        
     def identificar_hash(self):
         """Identifica o tipo de hash inserido pelo usuário"""
         hash_texto = self.hash_input.get("1.0", tk.END).strip()
@@ -226,6 +460,12 @@ class GeradorHashGUI:
             messagebox.showwarning("Aviso", "Por favor, cole um hash para identificar!")
             return
         
+        # Vários hashes colados (um por linha) são identificados em lote
+        linhas = [linha for linha in hash_texto.splitlines() if linha.strip()]
+        if len(linhas) > 1:
+            self.identificar_hashes_lote(linhas)
+            return
+        
         try:
             # Identifica o tipo de hash
             resultado = identificar_tipo_hash(hash_texto)
@@ -275,6 +515,29 @@ class GeradorHashGUI:
         
 
         
+    def identificar_hashes_lote(self, linhas):
+        """Identifica vários hashes de uma vez e exibe as contagens por tipo"""
+        resultado = identificar_hashes_lote(linhas)
+        contagem = resultado['contagem']
+        
+        self.tipo_label.config(text=f"{len(contagem)} tipos", foreground="blue")
+        self.comprimento_label.config(text=f"{resultado['total']} hashes")
+        self.formato_label.config(text="Lote")
+        self.algoritmos_label.config(text=", ".join(contagem))
+        self.descricao_label.config(text="; ".join(f"{tipo}: {quantidade}" for tipo, quantidade in contagem.items()))
+        
+        resultado_texto = f"\n=== IDENTIFICAÇÃO DE HASHES EM LOTE ===\n"
+        resultado_texto += f"Total de hashes: {resultado['total']}\n"
+        for tipo, quantidade in contagem.items():
+            resultado_texto += f"{tipo}: {quantidade}\n"
+        resultado_texto += "\n"
+        for hash_valor, tipo in resultado['resultados'][:1000]:
+            resultado_texto += f"{tipo}: {hash_valor}\n"
+        if resultado['total'] > 1000:
+            resultado_texto += f"... ({resultado['total'] - 1000} hashes não exibidos)\n"
+        
+        self.adicionar_resultado(resultado_texto + "\n")
+        
     def comparar_hashes(self):
         """Compara dois hashes"""
         hash1 = self.hash1_entry.get().strip()
@@ -329,6 +592,12 @@ class GeradorHashGUI:
         # Limpa campos da aba "Hash de Texto"
         self.text_input.delete("1.0", tk.END)
         
+        # Limpa campos da aba "Hash de Arquivo" (se não houver hash em andamento)
+        if self.worker_arquivos is None or not self.worker_arquivos.is_alive():
+            self.caminho_entry.delete(0, tk.END)
+            self.progresso_var.set(0)
+            self.status_arquivo_label.config(text="")
+
         # Limpa campos da aba "Identificador de Hash"
         self.hash_input.delete("1.0", tk.END)
         self.tipo_label.config(text="-", foreground="black")
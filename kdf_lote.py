@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Derivação de chaves em lote (PBKDF2 e scrypt)
+Ao contrário de gerar_hash, que produz um digest sem sal, aplica funções de
+derivação de chave com sal por registro e custo configurável, como exigido
+para armazenar senhas. Os registros são distribuídos em lotes por um pool de
+processos do tamanho do número de CPUs; no scrypt, o número de processos
+também respeita um orçamento de memória. Entrada e saída são processadas em
+fluxo (JSONL na linha de comando).
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+from gerador_hash import agrupar, ler_tamanho
+
+# Custos mínimos recomendados pela OWASP (2023)
+KDFS = {
+    'pbkdf2_sha256': {'hash': 'sha256', 'iteracoes': 600000},
+    'pbkdf2_sha512': {'hash': 'sha512', 'iteracoes': 210000},
+    'pbkdf2_sha1': {'hash': 'sha1', 'iteracoes': 1300000},
+    'scrypt': {},
+}
+SCRYPT_N_PADRAO = 2 ** 17
+SCRYPT_R_PADRAO = 8
+SCRYPT_P_PADRAO = 1
+
+TAMANHO_CHAVE_PADRAO = 32
+TAMANHO_SAL = 16
+# Cada registro custa centenas de milissegundos, então lotes pequenos bastam
+TAMANHO_LOTE_PADRAO = 8
+MEMORIA_PADRAO = 1024 ** 3
+# Folga somada ao maxmem do scrypt e maior valor que o OpenSSL aceita (INT_MAX)
+FOLGA_MAXMEM_SCRYPT = 1024 * 1024
+LIMITE_MAXMEM_SCRYPT = 2 ** 31 - 1
+
+def memoria_scrypt(n=SCRYPT_N_PADRAO, r=SCRYPT_R_PADRAO, p=SCRYPT_P_PADRAO):
+    """
+    Memória usada por um cálculo scrypt, como o OpenSSL a contabiliza
+
+    Returns:
+        int: Bytes (128·r·(n + 2) do vetor V mais 128·r·p do bloco B)
+    """
+    return 128 * r * (n + 2) + 128 * r * p
+
+def _memoria_disponivel():
+    """Metade da memória física livre (padrão do orçamento do scrypt)"""
+    try:
+        return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE') // 2
+    except (AttributeError, ValueError, OSError):
+        return MEMORIA_PADRAO
+
+def derivar_chave(senha, sal, kdf='pbkdf2_sha256', iteracoes=None, n=SCRYPT_N_PADRAO,
+                  r=SCRYPT_R_PADRAO, p=SCRYPT_P_PADRAO, tamanho_chave=TAMANHO_CHAVE_PADRAO):
+    """
+    Deriva a chave de uma senha com sal
+
+    Args:
+        senha (str | bytes): Senha (str é codificada em UTF-8)
+        sal (bytes): Sal do registro
+        kdf (str): 'pbkdf2_sha256', 'pbkdf2_sha512', 'pbkdf2_sha1' ou 'scrypt'
+        iteracoes (int): Iterações do PBKDF2 (padrão: recomendação da OWASP)
+        n (int): Custo de CPU/memória do scrypt (potência de 2)
+        r (int): Tamanho do bloco do scrypt
+        p (int): Paralelização do scrypt
+        tamanho_chave (int): Tamanho da chave em bytes
+
+    Returns:
+        bytes: Chave derivada
+
+    Raises:
+        ValueError: Se a KDF ou os parâmetros forem inválidos
+    """
+    if kdf not in KDFS:
+        raise ValueError(f"KDF '{kdf}' não suportada")
+    if isinstance(senha, str):
+        senha = senha.encode('utf-8')
+    if kdf == 'scrypt':
+        return hashlib.scrypt(senha, salt=sal, n=n, r=r, p=p, maxmem=memoria_scrypt(n, r, p) + FOLGA_MAXMEM_SCRYPT,
+                              dklen=tamanho_chave)
+    return hashlib.pbkdf2_hmac(KDFS[kdf]['hash'], senha, sal, iteracoes or KDFS[kdf]['iteracoes'],
+                               tamanho_chave)
+
+def _derivar_lote(lote, kdf, parametros):
+    """
+    Deriva as chaves de um lote de registros (tarefa executada nos processos)
+
+    Returns:
+        list: (identificador, sal hexadecimal, chave hexadecimal ou mensagem de erro)
+    """
+    resultados = []
+    for identificador, senha, sal in lote:
+        try:
+            if senha is None:
+                raise ValueError("registro sem senha")
+            if sal is None:
+                sal = os.urandom(TAMANHO_SAL)
+            elif isinstance(sal, str):
+                sal = bytes.fromhex(sal)
+            chave = derivar_chave(senha, sal, kdf, **parametros)
+            resultados.append((identificador, sal.hex(), chave.hex()))
+        except Exception as e:
+            resultados.append((identificador, None, f"Erro ao derivar chave: {str(e)}"))
+    return resultados
+
+def calcular_workers(kdf='pbkdf2_sha256', workers=None, n=SCRYPT_N_PADRAO, r=SCRYPT_R_PADRAO,
+                     p=SCRYPT_P_PADRAO, memoria_maxima=None):
+    """
+    Calcula quantos processos usar
+
+    Para o scrypt, limita os processos para que a soma da memória dos cálculos
+    simultâneos caiba em `memoria_maxima`.
+
+    Returns:
+        int: Número de processos
+
+    Raises:
+        ValueError: Se um único cálculo scrypt não couber no orçamento ou
+            exceder o limite de memória aceito pelo hashlib.scrypt
+    """
+    workers = workers or os.cpu_count() or 1
+    if kdf != 'scrypt':
+        return workers
+    memoria_maxima = memoria_maxima or _memoria_disponivel()
+    por_processo = memoria_scrypt(n, r, p)
+    if por_processo + FOLGA_MAXMEM_SCRYPT > LIMITE_MAXMEM_SCRYPT:
+        # Sem isso, cada registro falharia isoladamente nos processos
+        raise ValueError(f"Um cálculo scrypt usa {por_processo // 1024 ** 2} MiB, acima do limite de "
+                         f"{LIMITE_MAXMEM_SCRYPT // 1024 ** 2} MiB do hashlib.scrypt; reduza n ou r")
+    if por_processo > memoria_maxima:
+        raise ValueError(f"Um cálculo scrypt usa {por_processo // 1024 ** 2} MiB, acima do orçamento de "
+                         f"{memoria_maxima // 1024 ** 2} MiB")
+    return max(1, min(workers, memoria_maxima // por_processo))
+
+def derivar_lote(registros, kdf='pbkdf2_sha256', iteracoes=None, n=SCRYPT_N_PADRAO, r=SCRYPT_R_PADRAO,
+                 p=SCRYPT_P_PADRAO, tamanho_chave=TAMANHO_CHAVE_PADRAO, workers=None, memoria_maxima=None,
+                 ordenado=True, tamanho_lote=TAMANHO_LOTE_PADRAO):
+    """
+    Deriva as chaves de muitos registros em paralelo
+
+    Os registros são consumidos sob demanda e no máximo 2 lotes por processo
+    ficam pendentes, então fontes com milhões de registros não são carregadas
+    em memória.
+
+    Args:
+        registros (iterable): Tuplas (identificador, senha, sal); o sal pode ser
+            bytes, hexadecimal ou None para gerar um sal aleatório
+        kdf (str): 'pbkdf2_sha256', 'pbkdf2_sha512', 'pbkdf2_sha1' ou 'scrypt'
+        iteracoes (int): Iterações do PBKDF2 (padrão: recomendação da OWASP)
+        n (int): Custo de CPU/memória do scrypt (potência de 2)
+        r (int): Tamanho do bloco do scrypt
+        p (int): Paralelização do scrypt
+        tamanho_chave (int): Tamanho da chave em bytes
+        workers (int): Número de processos (padrão: número de CPUs)
+        memoria_maxima (int): Orçamento de memória do scrypt em bytes (padrão:
+            metade da memória livre)
+        ordenado (bool): Mantém a ordem da entrada (False entrega assim que prontos)
+        tamanho_lote (int): Registros enviados por vez a cada processo
+
+    Yields:
+        tuple: (identificador, sal hexadecimal, chave hexadecimal); em caso de
+            erro no registro, o sal é None e a chave traz a mensagem de erro
+
+    Raises:
+        ValueError: Se a KDF for inválida ou o orçamento de memória insuficiente
+    """
+    if kdf not in KDFS:
+        raise ValueError(f"KDF '{kdf}' não suportada")
+    workers = calcular_workers(kdf, workers, n, r, p, memoria_maxima)
+    if kdf == 'scrypt':
+        # Parâmetros inválidos fariam todos os registros falharem nos processos
+        if n < 2 or n & (n - 1) or r < 1 or p < 1:
+            raise ValueError("O scrypt exige n potência de 2 maior que 1, r >= 1 e p >= 1")
+        parametros = {'n': n, 'r': r, 'p': p, 'tamanho_chave': tamanho_chave}
+    else:
+        parametros = {'iteracoes': iteracoes, 'tamanho_chave': tamanho_chave}
+    max_pendentes = workers * 2
+    lotes = agrupar(registros, tamanho_lote)
+
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        if ordenado:
+            fila = deque()
+            for lote in lotes:
+                fila.append(executor.submit(_derivar_lote, lote, kdf, parametros))
+                if len(fila) >= max_pendentes:
+                    yield from fila.popleft().result()
+            while fila:
+                yield from fila.popleft().result()
+        else:
+            pendentes = set()
+            for lote in lotes:
+                pendentes.add(executor.submit(_derivar_lote, lote, kdf, parametros))
+                if len(pendentes) >= max_pendentes:
+                    concluidos, pendentes = wait(pendentes, return_when=FIRST_COMPLETED)
+                    for futuro in concluidos:
+                        yield from futuro.result()
+            while pendentes:
+                concluidos, pendentes = wait(pendentes, return_when=FIRST_COMPLETED)
+                for futuro in concluidos:
+                    yield from futuro.result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+def _ler_jsonl(entrada):
+    """
+    Gera (identificador, senha, sal) de linhas JSON {"id", "senha", "sal"}
+
+    Sem "id", o número da linha é usado como identificador.
+    """
+    for numero, linha in enumerate(entrada, 1):
+        if not linha.strip():
+            continue
+        try:
+            registro = json.loads(linha)
+            yield registro.get('id', numero), registro.get('senha'), registro.get('sal')
+        except (ValueError, AttributeError):
+            print(f"Linha {numero}: JSON inválido", file=sys.stderr)
+            yield numero, None, None
+
+def main(argv=None):
+    """Deriva chaves de registros JSONL lidos da entrada padrão ou de um arquivo"""
+    parser = argparse.ArgumentParser(
+        description="Derivação de chaves em lote (PBKDF2/scrypt). Entrada: linhas JSON com "
+                    "\"id\", \"senha\" e \"sal\" (hexadecimal, opcional); saída: \"id\", \"sal\" e \"chave\"")
+    parser.add_argument('entrada', nargs='?', default='-', help="Arquivo JSONL (padrão: entrada padrão)")
+    parser.add_argument('-o', '--saida', default='-', help="Arquivo JSONL de saída (padrão: saída padrão)")
+    parser.add_argument('-k', '--kdf', choices=list(KDFS), default='pbkdf2_sha256')
+    parser.add_argument('-i', '--iteracoes', type=int, default=None,
+                        help="Iterações do PBKDF2 (padrão: recomendação da OWASP)")
+    parser.add_argument('-n', type=int, default=SCRYPT_N_PADRAO, help="Custo N do scrypt")
+    parser.add_argument('-r', type=int, default=SCRYPT_R_PADRAO, help="Tamanho do bloco do scrypt")
+    parser.add_argument('-p', type=int, default=SCRYPT_P_PADRAO, help="Paralelização do scrypt")
+    parser.add_argument('-t', '--tamanho-chave', type=int, default=TAMANHO_CHAVE_PADRAO)
+    parser.add_argument('-j', '--workers', type=int, default=None, help="Processos (padrão: CPUs)")
+    parser.add_argument('--memoria', type=ler_tamanho, default=None,
+                        help="Orçamento de memória do scrypt, ex.: 4G (padrão: metade da memória livre)")
+    parser.add_argument('--desordenado', action='store_true',
+                        help="Grava cada resultado assim que pronto, sem manter a ordem da entrada")
+    args = parser.parse_args(argv)
+
+    entrada = sys.stdin if args.entrada == '-' else open(args.entrada, 'r', encoding='utf-8')
+    saida = sys.stdout if args.saida == '-' else open(args.saida, 'w', encoding='utf-8')
+    total = erros = 0
+    inicio = time.perf_counter()
+    try:
+        workers = calcular_workers(args.kdf, args.workers, args.n, args.r, args.p, args.memoria)
+        print(f"{args.kdf} com {workers} processos", file=sys.stderr)
+        resultados = derivar_lote(_ler_jsonl(entrada), args.kdf, args.iteracoes, args.n, args.r, args.p,
+                                  args.tamanho_chave, workers, args.memoria, not args.desordenado)
+        for identificador, sal, chave in resultados:
+            total += 1
+            if sal is None:
+                erros += 1
+                saida.write(json.dumps({'id': identificador, 'erro': chave}, ensure_ascii=False) + '\n')
+            else:
+                saida.write(json.dumps({'id': identificador, 'sal': sal, 'chave': chave},
+                                       ensure_ascii=False) + '\n')
+    except (OSError, ValueError) as e:
+        print(f"Erro: {str(e)}", file=sys.stderr)
+        return 2
+    finally:
+        if entrada is not sys.stdin:
+            entrada.close()
+        if saida is not sys.stdout:
+            saida.close()
+
+    duracao = time.perf_counter() - inicio
+    print(f"{total} registros, {erros} erros, {total / duracao if duracao else 0:.1f} registros/s",
+          file=sys.stderr)
+    return 1 if erros else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
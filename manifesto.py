@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Manifestos de checksums compatíveis com sha256sum/md5sum
+Gera arquivos no formato "<hash>  <caminho>" para um diretório e verifica
+esses arquivos em paralelo, separando arquivos alterados, ausentes e extras
+"""
+
+import argparse
+import os
+import posixpath
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from gerador_hash import gerar_hash_arquivo, gerar_hash_diretorio, listar_algoritmos, listar_arquivos
+
+def _algoritmos_por_comprimento():
+    """
+    Mapeia o comprimento do hash hexadecimal para o algoritmo das ferramentas do
+    coreutils (md5sum, sha1sum, sha224sum ... sha512sum), a partir do registro
+
+    Comprimentos com mais de um candidato ficam de fora.
+    """
+    candidatos = {}
+    for info in listar_algoritmos():
+        if info['familia'] in ('md5', 'sha1', 'sha2') and '_' not in info['nome']:
+            candidatos.setdefault(info['tamanho_digest'] * 2, []).append(info['nome'])
+    return {comprimento: nomes[0] for comprimento, nomes in candidatos.items() if len(nomes) == 1}
+
+# Algoritmo provável pelo comprimento do hash hexadecimal
+ALGORITMOS_POR_COMPRIMENTO = _algoritmos_por_comprimento()
+
+# Linhas de comentário com o tamanho do arquivo da próxima entrada; o sha256sum
+# ignora linhas iniciadas por '#', então o manifesto continua compatível
+PREFIXO_TAMANHO = '#tamanho '
+
+# Entradas verificadas por lote enviado ao pool de threads
+TAMANHO_LOTE_VERIFICACAO = 1024
+
+# Arquivos lidos com todos os candidatos quando o comprimento do hash é ambíguo
+AMOSTRAS_DEDUCAO = 3
+
+def _escapar_caminho(caminho):
+    """
+    Escapa o caminho como o coreutils: barra invertida e quebras de linha viram
+    sequências de escape e a linha ganha o prefixo '\\'
+
+    Returns:
+        tuple: (prefixo, caminho escapado)
+    """
+    if '\\' in caminho or '\n' in caminho or '\r' in caminho:
+        caminho = caminho.replace('\\', '\\\\').replace('\n', '\\n').replace('\r', '\\r')
+        return '\\', caminho
+    return '', caminho
+
+def normalizar_caminho(caminho):
+    """
+    Normaliza um caminho relativo de manifesto para comparação
+
+    'sha256sum ./a' grava './a' e 'sha256sum a' grava 'a': ambos viram 'a'
+    (assim como 'dir//a' e 'dir/./a' viram 'dir/a').
+    """
+    return posixpath.normpath(caminho)
+
+def _desescapar_caminho(caminho):
+    """Desfaz o escape aplicado por _escapar_caminho"""
+    resultado = []
+    indice = 0
+    while indice < len(caminho):
+        caractere = caminho[indice]
+        if caractere == '\\' and indice + 1 < len(caminho):
+            proximo = caminho[indice + 1]
+            resultado.append({'n': '\n', 'r': '\r', '\\': '\\'}.get(proximo, proximo))
+            indice += 2
+        else:
+            resultado.append(caractere)
+            indice += 1
+    return ''.join(resultado)
+
+def gerar_manifesto(diretorio, arquivo_saida, algoritmo='sha256', workers=None,
+                    registrar_tamanhos=False, incluir=None, excluir=None):
+    """
+    Gera um manifesto de checksums para todos os arquivos de um diretório
+
+    Os caminhos são gravados relativos ao diretório, com '/' como separador e
+    em ordem alfabética, de forma que `sha256sum -c` funcione a partir dele.
+
+    Args:
+        diretorio (str): Diretório raiz
+        arquivo_saida (str): Caminho do manifesto a ser criado
+        algoritmo (str): Algoritmo de hash (md5, sha1, sha256, sha512)
+        workers (int): Número de workers (padrão: número de CPUs)
+        registrar_tamanhos (bool): Grava o tamanho de cada arquivo em uma linha
+            de comentário, permitindo detectar alterações sem ler o arquivo
+        incluir (list): Padrões glob de arquivos a incluir
+        excluir (list): Padrões glob de arquivos/diretórios a excluir
+
+    Returns:
+        dict: {'arquivos': int, 'erros': [mensagens]}
+    """
+    saida_absoluta = os.path.abspath(arquivo_saida)
+    total = 0
+    erros = []
+
+    with open(arquivo_saida, 'w', encoding='utf-8', newline='\n') as manifesto:
+        linhas = []
+        for caminho, hash_valor in gerar_hash_diretorio(diretorio, algoritmo, workers=workers,
+                                                        ordenado=True, incluir=incluir,
+                                                        excluir=excluir):
+            if os.path.abspath(caminho) == saida_absoluta:
+                continue
+            if hash_valor.startswith('Erro'):
+                erros.append(hash_valor)
+                continue
+
+            relativo = os.path.relpath(caminho, diretorio).replace(os.sep, '/')
+            prefixo, relativo = _escapar_caminho(relativo)
+            if registrar_tamanhos:
+                try:
+                    linhas.append(f"{PREFIXO_TAMANHO}{os.path.getsize(caminho)}\n")
+                except OSError:
+                    pass
+            linhas.append(f"{prefixo}{hash_valor}  {relativo}\n")
+            total += 1
+
+            if len(linhas) >= TAMANHO_LOTE_VERIFICACAO:
+                manifesto.write(''.join(linhas))
+                linhas = []
+        manifesto.write(''.join(linhas))
+
+    return {'arquivos': total, 'erros': erros}
+
+def ler_manifesto_binario(arquivo_manifesto):
+    """
+    Lê as entradas de um manifesto sem decodificá-las
+
+    Aceita os mesmos formatos de ler_manifesto, mas devolve caminhos e hashes
+    em bytes, evitando a decodificação em manifestos com milhões de linhas.
+
+    Args:
+        arquivo_manifesto (str): Caminho do manifesto
+
+    Yields:
+        tuple: (caminho em UTF-8, hash hexadecimal em minúsculas, tamanho ou None)
+    """
+    prefixo_tamanho = PREFIXO_TAMANHO.encode('ascii')
+    tamanho = None
+    with open(arquivo_manifesto, 'rb') as manifesto:
+        for linha in manifesto:
+            linha = linha.rstrip(b'\r\n')
+            if linha.startswith(prefixo_tamanho):
+                try:
+                    tamanho = int(linha[len(prefixo_tamanho):])
+                except ValueError:
+                    tamanho = None
+                continue
+            if not linha or linha[0] == 0x23:  # '#'
+                continue
+
+            escapado = linha[0] == 0x5c  # '\\'
+            if escapado:
+                linha = linha[1:]
+
+            hash_valor, _, caminho = linha.partition(b' ')
+            if caminho[:1] == b'(' and b') = ' in caminho:
+                # Formato BSD: ALGORITMO (caminho) = hash
+                caminho, hash_valor = caminho[1:].rsplit(b') = ', 1)
+            elif caminho[:1] in (b' ', b'*'):
+                caminho = caminho[1:]
+
+            if escapado:
+                caminho = _desescapar_caminho(caminho.decode('utf-8', 'surrogateescape'))
+                caminho = caminho.encode('utf-8', 'surrogateescape')
+            if hash_valor and caminho:
+                yield caminho, hash_valor.lower(), tamanho
+            tamanho = None
+
+def ler_manifesto(arquivo_manifesto):
+    """
+    Lê as entradas de um manifesto
+
+    Aceita o formato do sha256sum ("<hash>  <caminho>" ou "<hash> *<caminho>"),
+    o formato BSD ("SHA256 (<caminho>) = <hash>") e as linhas de tamanho
+    gravadas por gerar_manifesto.
+
+    Args:
+        arquivo_manifesto (str): Caminho do manifesto
+
+    Yields:
+        tuple: (caminho, hash, tamanho ou None)
+    """
+    for caminho, hash_valor, tamanho in ler_manifesto_binario(arquivo_manifesto):
+        yield (caminho.decode('utf-8', 'surrogateescape'), hash_valor.decode('utf-8', 'surrogateescape'),
+               tamanho)
+
+def deduzir_algoritmo(hash_valor, amostras=()):
+    """
+    Deduz o algoritmo de um hash hexadecimal pelo comprimento
+
+    Quando vários algoritmos registrados produzem hashes desse comprimento
+    (ex.: SHA-256, SHA3-256 e BLAKE2s), alguns arquivos de `amostras` são lidos
+    uma vez com todos os candidatos para ver qual deles confere. Sem amostras
+    que confiram, vale o algoritmo das ferramentas do coreutils (64 caracteres
+    é SHA-256, 128 é SHA-512 etc.).
+
+    Args:
+        hash_valor (str): Um hash do manifesto
+        amostras (iterable): Tuplas (caminho do arquivo, hash esperado) com
+            hashes do mesmo comprimento
+
+    Raises:
+        ValueError: Se o algoritmo não puder ser deduzido
+    """
+    comprimento = len(hash_valor)
+    preferido = ALGORITMOS_POR_COMPRIMENTO.get(comprimento)
+    candidatos = [info['nome'] for info in listar_algoritmos() if info['tamanho_digest'] * 2 == comprimento]
+    if preferido in candidatos:
+        candidatos.remove(preferido)
+        candidatos.insert(0, preferido)
+    if len(candidatos) == 1:
+        return candidatos[0]
+
+    if candidatos:
+        for caminho, esperado in islice(((c, h) for c, h in amostras if os.path.isfile(c)),
+                                        AMOSTRAS_DEDUCAO):
+            hashes = gerar_hash_arquivo(caminho, candidatos)
+            if isinstance(hashes, dict):
+                for nome in candidatos:
+                    if hashes[nome] == esperado:
+                        return nome
+        if preferido is not None:
+            return preferido
+    raise ValueError(f"Não foi possível deduzir o algoritmo de um hash com {comprimento} "
+                     f"caracteres; informe o algoritmo (-a)")
+
+def _verificar_entrada(entrada, diretorio_base, algoritmo):
+    """
+    Verifica uma entrada do manifesto
+
+    Returns:
+        tuple: (situação, caminho, detalhe) com situação 'ok', 'alterado',
+            'ausente' ou 'erro'
+    """
+    caminho, hash_esperado, tamanho = entrada
+    completo = os.path.join(diretorio_base, caminho.replace('/', os.sep))
+    try:
+        info = os.stat(completo)
+    except FileNotFoundError:
+        return 'ausente', caminho, None
+    except OSError as e:
+        return 'erro', caminho, str(e)
+
+    if tamanho is not None and info.st_size != tamanho:
+        return 'alterado', caminho, f"tamanho {info.st_size} (esperado {tamanho})"
+
+    hash_atual = gerar_hash_arquivo(completo, algoritmo)
+    if hash_atual.startswith('Erro'):
+        return 'erro', caminho, hash_atual
+    if hash_atual != hash_esperado:
+        return 'alterado', caminho, hash_atual
+    return 'ok', caminho, None
+
+def verificar_manifesto(arquivo_manifesto, diretorio_base=None, algoritmo=None, workers=None,
+                        detectar_extras=True, excluir=None):
+    """
+    Verifica os arquivos listados em um manifesto usando um pool de threads
+
+    Args:
+        arquivo_manifesto (str): Caminho do manifesto
+        diretorio_base (str): Diretório a que os caminhos se referem
+            (padrão: diretório do manifesto)
+        algoritmo (str): Algoritmo de hash (padrão: deduzido pelo comprimento do hash)
+        workers (int): Número de threads (padrão: número de CPUs)
+        detectar_extras (bool): Procura arquivos do diretório ausentes do manifesto
+        excluir (list): Padrões glob ignorados na busca por arquivos extras
+
+    Returns:
+        dict: Listas de caminhos em 'ok', 'alterados', 'ausentes' e 'extras', e
+            tuplas (caminho, mensagem) em 'erros'
+
+    Raises:
+        ValueError: Se o algoritmo não for informado e não puder ser deduzido
+    """
+    if diretorio_base is None:
+        diretorio_base = os.path.dirname(os.path.abspath(arquivo_manifesto))
+    workers = workers or os.cpu_count() or 1
+
+    relatorio = {'ok': [], 'alterados': [], 'ausentes': [], 'extras': [], 'erros': []}
+    destinos = {'ok': 'ok', 'alterado': 'alterados', 'ausente': 'ausentes'}
+    listados = set()
+    deduzidos = {}
+
+    entradas = ler_manifesto(arquivo_manifesto)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        while lote := list(islice(entradas, TAMANHO_LOTE_VERIFICACAO)):
+            listados.update(normalizar_caminho(entrada[0]) for entrada in lote)
+            if algoritmo is None:
+                for _, hash_valor, _ in lote:
+                    if len(hash_valor) not in deduzidos:
+                        amostras = ((os.path.join(diretorio_base, c.replace('/', os.sep)), h)
+                                    for c, h, _ in lote if len(h) == len(hash_valor))
+                        deduzidos[len(hash_valor)] = deduzir_algoritmo(hash_valor, amostras)
+            algoritmos = [algoritmo or deduzidos[len(entrada[1])] for entrada in lote]
+            for situacao, caminho, detalhe in executor.map(
+                    lambda entrada, nome: _verificar_entrada(entrada, diretorio_base, nome), lote, algoritmos):
+                if situacao == 'erro':
+                    relatorio['erros'].append((caminho, detalhe))
+                else:
+                    relatorio[destinos[situacao]].append(caminho)
+
+    if detectar_extras:
+        manifesto_absoluto = os.path.abspath(arquivo_manifesto)
+        for caminho in listar_arquivos(diretorio_base, excluir=excluir):
+            if os.path.abspath(caminho) == manifesto_absoluto:
+                continue
+            relativo = normalizar_caminho(os.path.relpath(caminho, diretorio_base).replace(os.sep, '/'))
+            if relativo not in listados:
+                relatorio['extras'].append(relativo)
+
+    return relatorio
+
+def main(argv=None):
+    """Gera ou verifica manifestos pela linha de comando"""
+    parser = argparse.ArgumentParser(description="Gera e verifica manifestos de checksums")
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+
+    gerar = subparsers.add_parser('gerar', help="Gera o manifesto de um diretório")
+    gerar.add_argument('diretorio')
+    gerar.add_argument('-o', '--saida', required=True, help="Arquivo do manifesto")
+    gerar.add_argument('-a', '--algoritmo', default='sha256')
+    gerar.add_argument('-j', '--workers', type=int, default=None)
+    gerar.add_argument('--tamanhos', action='store_true', help="Registra o tamanho dos arquivos")
+    gerar.add_argument('--excluir', action='append', default=[])
+
+    verificar = subparsers.add_parser('verificar', help="Verifica um manifesto")
+    verificar.add_argument('manifesto')
+    verificar.add_argument('-d', '--diretorio', default=None, help="Diretório base")
+    verificar.add_argument('-a', '--algoritmo', default=None)
+    verificar.add_argument('-j', '--workers', type=int, default=None)
+    verificar.add_argument('--sem-extras', action='store_true', help="Não procura arquivos extras")
+    verificar.add_argument('--excluir', action='append', default=[])
+
+    args = parser.parse_args(argv)
+
+    if args.comando == 'gerar':
+        resultado = gerar_manifesto(args.diretorio, args.saida, args.algoritmo, args.workers,
+                                    args.tamanhos, excluir=args.excluir)
+        for erro in resultado['erros']:
+            print(erro, file=sys.stderr)
+        print(f"{resultado['arquivos']} arquivos gravados em {args.saida}", file=sys.stderr)
+        return 1 if resultado['erros'] else 0
+
+    try:
+        relatorio = verificar_manifesto(args.manifesto, args.diretorio, args.algoritmo, args.workers,
+                                        not args.sem_extras, args.excluir)
+    except ValueError as e:
+        print(f"Erro: {str(e)}", file=sys.stderr)
+        return 1
+    for caminho in relatorio['alterados']:
+        print(f"{caminho}: ALTERADO")
+    for caminho in relatorio['ausentes']:
+        print(f"{caminho}: AUSENTE")
+    for caminho in relatorio['extras']:
+        print(f"{caminho}: EXTRA")
+    for caminho, mensagem in relatorio['erros']:
+        print(f"{caminho}: ERRO ({mensagem})")
+    print(f"{len(relatorio['ok'])} ok, {len(relatorio['alterados'])} alterados, "
+          f"{len(relatorio['ausentes'])} ausentes, {len(relatorio['extras'])} extras, "
+          f"{len(relatorio['erros'])} erros", file=sys.stderr)
+    falhou = relatorio['alterados'] or relatorio['ausentes'] or relatorio['erros']
+    return 1 if falhou else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Métricas do gerador de hashcode
+Coleta, em contadores do próprio processo, os eventos emitidos por
+gerar_hash_arquivo, gerar_hash_diretorio e gerar_hashes_lote (arquivos, bytes,
+tempo de leitura e de hash, erros por tipo, itens em lote) e exporta no formato texto do Prometheus, por
+exemplo para o textfile collector do node_exporter.
+
+A divisão entre tempo de leitura e tempo de hash indica se uma varredura lenta
+está limitada pelo disco ou pela CPU.
+"""
+
+import os
+import threading
+from collections import Counter
+
+from gerador_hash import adicionar_observador, remover_observador
+
+# Limites (em segundos) do histograma de duração por arquivo
+LIMITES_DURACAO = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 60.0)
+
+INTERVALO_EXPORTACAO_PADRAO = 15.0
+
+class ColetorMetricas:
+    """
+    Acumula os eventos de hash em contadores
+
+    Pode ser usado como observador diretamente (é chamável) ou instalado com
+    instalar()/desinstalar() ou como gerenciador de contexto.
+    """
+
+    def __init__(self):
+        self._trava = threading.Lock()
+        self.arquivos = 0
+        self.bytes = 0
+        self.tempo_total = 0.0
+        self.tempo_leitura = 0.0
+        self.tempo_hash = 0.0
+        self.erros = Counter()
+        self.bytes_por_modo = Counter()
+        self.diretorios = 0
+        self.tempo_diretorios = 0.0
+        self.lotes = 0
+        self.itens_lote = 0
+        self.bytes_lote = 0
+        self.tempo_lotes = 0.0
+        self._histograma = [0] * (len(LIMITES_DURACAO) + 1)
+
+    def __call__(self, evento):
+        with self._trava:
+            if evento['tipo'] == 'diretorio':
+                self.diretorios += 1
+                self.tempo_diretorios += evento['tempo_total']
+                return
+            if evento['tipo'] == 'lote':
+                self.lotes += 1
+                self.itens_lote += evento['itens']
+                self.bytes_lote += evento['bytes']
+                self.tempo_lotes += evento['tempo_total']
+                return
+
+            self.arquivos += 1
+            self.bytes += evento['bytes']
+            self.tempo_total += evento['tempo_total']
+            self.tempo_leitura += evento['tempo_leitura']
+            self.tempo_hash += evento['tempo_hash']
+            if evento['modo_leitura'] is not None:
+                self.bytes_por_modo[evento['modo_leitura']] += evento['bytes']
+            if evento['erro'] is not None:
+                self.erros[evento['erro']] += 1
+
+            duracao = evento['tempo_total']
+            for indice, limite in enumerate(LIMITES_DURACAO):
+                if duracao <= limite:
+                    break
+            else:
+                indice = len(LIMITES_DURACAO)
+            self._histograma[indice] += 1
+
+    def instalar(self):
+        """Passa a receber os eventos do gerador_hash"""
+        adicionar_observador(self)
+        return self
+
+    def desinstalar(self):
+        """Deixa de receber os eventos do gerador_hash"""
+        remover_observador(self)
+
+    def __enter__(self):
+        return self.instalar()
+
+    def __exit__(self, *args):
+        self.desinstalar()
+
+    def instantaneo(self):
+        """
+        Retorna uma cópia consistente dos contadores
+
+        Returns:
+            dict: Contadores, 'erros' por tipo, 'mb_s' (vazão média por arquivo)
+                e 'gargalo' ('disco', 'cpu' ou None sem dados)
+        """
+        with self._trava:
+            if self.tempo_leitura or self.tempo_hash:
+                gargalo = 'disco' if self.tempo_leitura > self.tempo_hash else 'cpu'
+            else:
+                gargalo = None
+            return {
+                'arquivos': self.arquivos,
+                'bytes': self.bytes,
+                'tempo_total': self.tempo_total,
+                'tempo_leitura': self.tempo_leitura,
+                'tempo_hash': self.tempo_hash,
+                'erros': dict(self.erros),
+                'bytes_por_modo': dict(self.bytes_por_modo),
+                'diretorios': self.diretorios,
+                'tempo_diretorios': self.tempo_diretorios,
+                'lotes': self.lotes,
+                'itens_lote': self.itens_lote,
+                'bytes_lote': self.bytes_lote,
+                'tempo_lotes': self.tempo_lotes,
+                'mb_s': self.bytes / self.tempo_total / 1e6 if self.tempo_total else 0.0,
+                'gargalo': gargalo,
+                'histograma': list(self._histograma),
+            }
+
+    def formato_prometheus(self, prefixo='gerador_hash'):
+        """
+        Formata os contadores no formato texto de exposição do Prometheus
+
+        Returns:
+            str: Texto com as métricas
+        """
+        dados = self.instantaneo()
+        linhas = []
+
+        def metrica(nome, tipo, ajuda, amostras):
+            linhas.append(f"# HELP {prefixo}_{nome} {ajuda}")
+            linhas.append(f"# TYPE {prefixo}_{nome} {tipo}")
+            for rotulos, valor in amostras:
+                linhas.append(f"{prefixo}_{nome}{rotulos} {valor}")
+
+        metrica('arquivos_total', 'counter', "Arquivos processados", [('', dados['arquivos'])])
+        metrica('bytes_total', 'counter', "Bytes lidos e processados",
+                [('', dados['bytes'])] if not dados['bytes_por_modo'] else
+                [(f'{{modo_leitura="{modo}"}}', valor)
+                 for modo, valor in sorted(dados['bytes_por_modo'].items())])
+        metrica('segundos_total', 'counter', "Tempo gasto por fase (leitura, hash e total)",
+                [('{fase="leitura"}', dados['tempo_leitura']), ('{fase="hash"}', dados['tempo_hash']),
+                 ('{fase="total"}', dados['tempo_total'])])
+        metrica('erros_total', 'counter', "Erros por tipo de exceção",
+                [(f'{{tipo="{tipo}"}}', valor) for tipo, valor in sorted(dados['erros'].items())])
+        metrica('diretorios_total', 'counter', "Diretórios processados", [('', dados['diretorios'])])
+        metrica('lote_itens_total', 'counter', "Itens processados por gerar_hashes_lote",
+                [('', dados['itens_lote'])])
+        metrica('lote_bytes_total', 'counter', "Bytes processados por gerar_hashes_lote",
+                [('', dados['bytes_lote'])])
+
+        acumulado = 0
+        amostras = []
+        for limite, quantidade in zip(LIMITES_DURACAO + ('+Inf',), dados['histograma']):
+            acumulado += quantidade
+            amostras.append((f'_bucket{{le="{limite}"}}', acumulado))
+        amostras.append(('_sum', dados['tempo_total']))
+        amostras.append(('_count', dados['arquivos']))
+        metrica('duracao_arquivo_segundos', 'histogram', "Duração do hash por arquivo", [])
+        linhas.extend(f"{prefixo}_duracao_arquivo_segundos{sufixo} {valor}" for sufixo, valor in amostras)
+
+        return '\n'.join(linhas) + '\n'
+
+def escrever_prometheus(coletor, caminho_saida):
+    """
+    Grava as métricas em um arquivo .prom de forma atômica
+
+    O arquivo é escrito em um temporário no mesmo diretório e renomeado, para
+    que o leitor nunca veja um arquivo pela metade.
+    """
+    temporario = f"{caminho_saida}.{os.getpid()}.tmp"
+    with open(temporario, 'w', encoding='utf-8') as saida:
+        saida.write(coletor.formato_prometheus())
+    os.replace(temporario, caminho_saida)
+
+class ExportadorPrometheus:
+    """
+    Grava periodicamente as métricas de um coletor em um arquivo .prom
+    """
+
+    def __init__(self, coletor, caminho_saida, intervalo=INTERVALO_EXPORTACAO_PADRAO):
+        """
+        Args:
+            coletor (ColetorMetricas): Coletor cujas métricas são exportadas
+            caminho_saida (str): Arquivo .prom
+            intervalo (float): Segundos entre gravações
+        """
+        self.coletor = coletor
+        self.caminho_saida = caminho_saida
+        self.intervalo = intervalo
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._executar, name='exportador-prometheus',
+                                        daemon=True)
+
+    def _executar(self):
+        while not self._parar.wait(self.intervalo):
+            try:
+                escrever_prometheus(self.coletor, self.caminho_saida)
+            except OSError:
+                pass
+
+    def iniciar(self):
+        """Inicia a gravação periódica em segundo plano"""
+        self._thread.start()
+        return self
+
+    def parar(self):
+        """Interrompe a gravação periódica e grava uma última vez"""
+        self._parar.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        escrever_prometheus(self.coletor, self.caminho_saida)
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *args):
+        self.parar()
@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Monitoramento contínuo de um diretório
+Mantém os hashes de uma árvore de arquivos e, depois da varredura inicial,
+gera novamente apenas o hash dos arquivos que mudaram. As mudanças são
+detectadas com inotify (Linux) ou, na falta dele, comparando os resultados de
+stat entre varreduras, sem ler o conteúdo dos arquivos inalterados.
+
+As mudanças são produzidas como um fluxo de eventos 'criado', 'modificado',
+'removido' e 'erro'.
+"""
+
+import argparse
+import ctypes
+import ctypes.util
+import json
+import os
+import select
+import stat
+import struct
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from gerador_hash import gerar_hash_arquivo, listar_arquivos, corresponde_padroes
+
+# Segundos entre varreduras quando o inotify não está disponível
+INTERVALO_PADRAO = 60.0
+# Segundos sem novos eventos do inotify antes de processar os arquivos alterados
+ESPERA_PADRAO = 0.5
+# Arquivos alterados continuamente são processados no máximo após este tempo
+ESPERA_MAXIMA = 5.0
+
+# Constantes de <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_DONT_FOLLOW = 0x02000000
+IN_ISDIR = 0x40000000
+
+MASCARA_INOTIFY = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+                   | IN_CREATE | IN_DELETE | IN_ONLYDIR | IN_DONT_FOLLOW)
+
+class _Inotify:
+    """
+    Acesso mínimo ao inotify do Linux via ctypes
+    """
+
+    def __init__(self):
+        if not sys.platform.startswith('linux'):
+            raise OSError("inotify disponível apenas no Linux")
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self.descritor = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.descritor < 0:
+            numero = ctypes.get_errno()
+            raise OSError(numero, os.strerror(numero))
+        self._diretorios = {}
+
+    def adicionar(self, diretorio):
+        """Observa um diretório (não recursivo); repetir atualiza o caminho"""
+        observacao = self._libc.inotify_add_watch(self.descritor, os.fsencode(diretorio),
+                                                  MASCARA_INOTIFY)
+        if observacao < 0:
+            numero = ctypes.get_errno()
+            raise OSError(numero, os.strerror(numero), diretorio)
+        self._diretorios[observacao] = diretorio
+
+    def ler(self):
+        """
+        Lê os eventos pendentes sem bloquear
+
+        Returns:
+            list: Tuplas (caminho, máscara); caminho é None em IN_Q_OVERFLOW
+        """
+        eventos = []
+        while True:
+            try:
+                dados = os.read(self.descritor, 64 * 1024)
+            except BlockingIOError:
+                return eventos
+            posicao = 0
+            while posicao < len(dados):
+                observacao, mascara, _, tamanho = struct.unpack_from('iIII', dados, posicao)
+                nome = dados[posicao + 16:posicao + 16 + tamanho].rstrip(b'\0')
+                posicao += 16 + tamanho
+                if mascara & IN_Q_OVERFLOW:
+                    eventos.append((None, mascara))
+                    continue
+                if mascara & IN_IGNORED:
+                    self._diretorios.pop(observacao, None)
+                    continue
+                base = self._diretorios.get(observacao)
+                if base is not None:
+                    eventos.append((os.path.join(base, os.fsdecode(nome)) if nome else base, mascara))
+
+    def fechar(self):
+        os.close(self.descritor)
+
+def _assinatura(info):
+    """Identifica uma versão do arquivo sem ler o conteúdo"""
+    return (info.st_ino, info.st_size, info.st_mtime_ns, info.st_ctime_ns)
+
+class MonitorHash:
+    """
+    Mantém os hashes de um diretório atualizados e emite eventos de mudança
+
+    Uso:
+        with MonitorHash('/dados') as monitor:
+            for evento in monitor.eventos():
+                ...
+    """
+
+    def __init__(self, diretorio, algoritmo='sha256', incluir=None, excluir=None, workers=None,
+                 intervalo=INTERVALO_PADRAO, usar_inotify=None, funcao_hash=None,
+                 espera=ESPERA_PADRAO):
+        """
+        Args:
+            diretorio (str): Diretório raiz monitorado
+            algoritmo (str | list): Algoritmo de hash ou lista de algoritmos
+            incluir (list): Padrões glob de arquivos a incluir
+            excluir (list): Padrões glob de arquivos/diretórios a excluir
+            workers (int): Threads usadas para gerar os hashes (padrão: número de CPUs)
+            intervalo (float): Segundos entre varreduras sem inotify
+            usar_inotify (bool): None usa inotify se disponível; False força varreduras
+            funcao_hash (callable): Chamada como funcao_hash(caminho, algoritmo)
+                (padrão: gerar_hash_arquivo; ex.: CacheHash().gerar_hash_arquivo)
+            espera (float): Segundos sem eventos do inotify antes de processar
+        """
+        self.diretorio = diretorio
+        self.algoritmo = algoritmo
+        self.incluir = list(incluir or [])
+        self.excluir = list(excluir or [])
+        self.workers = workers or os.cpu_count() or 1
+        self.intervalo = intervalo
+        self.usar_inotify = usar_inotify
+        self.funcao_hash = funcao_hash or gerar_hash_arquivo
+        self.espera = espera
+        self.modo = None
+        self.hashes = {}
+        self._assinaturas = {}
+        self._inotify = None
+        self._executor = None
+        self._parar = threading.Event()
+
+    def __enter__(self):
+        self.iniciar()
+        return self
+
+    def __exit__(self, *args):
+        self.fechar()
+
+    def _selecionado(self, caminho):
+        """Aplica os filtros incluir/excluir como listar_arquivos"""
+        relativo = os.path.relpath(caminho, self.diretorio).replace(os.sep, '/')
+        if relativo.startswith('../') or relativo == '.':
+            return False
+        if self.excluir:
+            partes = relativo.split('/')
+            for indice in range(1, len(partes) + 1):
+                if corresponde_padroes('/'.join(partes[:indice]), self.excluir):
+                    return False
+        return not self.incluir or corresponde_padroes(relativo, self.incluir)
+
+    def _observar_arvore(self, raiz):
+        """Adiciona observações do inotify a um diretório e seus subdiretórios"""
+        pilha = [raiz]
+        while pilha:
+            atual = pilha.pop()
+            self._inotify.adicionar(atual)
+            try:
+                with os.scandir(atual) as entradas:
+                    for entrada in entradas:
+                        if entrada.is_dir(follow_symlinks=False) and (
+                                not self.excluir or self._selecionado(entrada.path)):
+                            pilha.append(entrada.path)
+            except OSError:
+                continue
+
+    def iniciar(self):
+        """
+        Prepara a detecção de mudanças e gera os hashes iniciais da árvore
+
+        As observações do inotify são criadas antes da varredura, então mudanças
+        feitas durante ela não se perdem.
+
+        Returns:
+            dict: {caminho: hash} de todos os arquivos
+        """
+        if not os.path.isdir(self.diretorio):
+            raise NotADirectoryError(f"Diretório '{self.diretorio}' não encontrado")
+
+        self._executor = ThreadPoolExecutor(max_workers=self.workers)
+        if self.usar_inotify is not False:
+            try:
+                self._inotify = _Inotify()
+                self._observar_arvore(self.diretorio)
+                self.modo = 'inotify'
+            except (OSError, AttributeError):
+                # Sem inotify (outro sistema) ou limite de observações atingido
+                if self._inotify is not None:
+                    self._inotify.fechar()
+                    self._inotify = None
+                if self.usar_inotify:
+                    raise
+        if self._inotify is None:
+            self.modo = 'varredura'
+
+        list(self._processar(listar_arquivos(self.diretorio, self.incluir, self.excluir)))
+        return self.hashes
+
+    def _processar(self, caminhos):
+        """
+        Confere os caminhos informados e gera o hash dos que mudaram
+
+        Yields:
+            dict: Eventos {'tipo', 'caminho', 'hash', 'hash_anterior', 'momento'}
+        """
+        # Janela limitada de hashes em andamento, como em gerar_hash_diretorio: a
+        # varredura inicial de uma árvore grande não cria um futuro por arquivo
+        max_pendentes = self.workers * 4
+        fila = deque()
+        for caminho in caminhos:
+            try:
+                # Um único stat (seguindo links, como listar_arquivos) serve para
+                # a assinatura e para saber se é um arquivo regular
+                info = os.stat(caminho)
+                existe = stat.S_ISREG(info.st_mode) and self._selecionado(caminho)
+            except OSError:
+                existe = False
+
+            if not existe:
+                if caminho in self.hashes:
+                    self._assinaturas.pop(caminho, None)
+                    yield self._evento('removido', caminho, None, self.hashes.pop(caminho))
+                continue
+
+            assinatura = _assinatura(info)
+            if self._assinaturas.get(caminho) != assinatura:
+                # A assinatura é lida antes do hash: uma escrita durante a leitura muda a
+                # assinatura e o arquivo é conferido de novo na próxima passagem
+                futuro = self._executor.submit(self.funcao_hash, caminho, self.algoritmo)
+                fila.append((caminho, assinatura, futuro))
+                if len(fila) >= max_pendentes:
+                    yield from self._concluir(*fila.popleft())
+        while fila:
+            yield from self._concluir(*fila.popleft())
+
+    def _concluir(self, caminho, assinatura, futuro):
+        """Registra o hash de um arquivo alterado e gera o evento correspondente"""
+        hash_valor = futuro.result()
+        anterior = self.hashes.get(caminho)
+        if isinstance(hash_valor, str) and hash_valor.startswith('Erro'):
+            if not os.path.exists(caminho):
+                yield from self._processar([caminho])
+            else:
+                yield self._evento('erro', caminho, hash_valor, anterior)
+            return
+
+        self._assinaturas[caminho] = assinatura
+        self.hashes[caminho] = hash_valor
+        if anterior is None:
+            yield self._evento('criado', caminho, hash_valor, None)
+        elif anterior != hash_valor:
+            yield self._evento('modificado', caminho, hash_valor, anterior)
+
+    @staticmethod
+    def _evento(tipo, caminho, hash_valor, hash_anterior):
+        return {'tipo': tipo, 'caminho': caminho, 'hash': hash_valor,
+                'hash_anterior': hash_anterior, 'momento': time.time()}
+
+    def verificar(self):
+        """
+        Compara o diretório com o estado conhecido usando apenas stat
+
+        Só os arquivos novos, removidos ou com (inode, tamanho, mtime, ctime)
+        diferentes são lidos.
+
+        Returns:
+            list: Eventos das mudanças encontradas
+        """
+        atuais = set(listar_arquivos(self.diretorio, self.incluir, self.excluir))
+        removidos = [caminho for caminho in self.hashes if caminho not in atuais]
+        return list(self._processar(removidos + sorted(atuais)))
+
+    def _sujos_por_evento(self, caminho, mascara, erros):
+        """
+        Converte um evento do inotify nos caminhos que precisam ser conferidos
+
+        Falhas ao observar um diretório novo viram eventos 'erro' em `erros`.
+        """
+        if not mascara & IN_ISDIR:
+            return [caminho]
+        if mascara & (IN_CREATE | IN_MOVED_TO):
+            # Diretório novo: observa e confere o que já foi criado dentro dele
+            if not self._selecionado(caminho):
+                return []
+            try:
+                self._observar_arvore(caminho)
+            except OSError as e:
+                # Ex.: limite de observações (max_user_watches) atingido; mudanças
+                # futuras nesse diretório só aparecem em um estouro da fila
+                erros.append(self._evento('erro', caminho,
+                                          f"Erro ao observar o diretório: {str(e)}", None))
+            return list(listar_arquivos(caminho, self.incluir, self.excluir))
+        if mascara & (IN_DELETE | IN_MOVED_FROM):
+            prefixo = caminho + os.sep
+            return [conhecido for conhecido in self.hashes if conhecido.startswith(prefixo)]
+        return []
+
+    def eventos(self):
+        """
+        Gera os eventos de mudança até parar() ser chamado
+
+        Yields:
+            dict: {'tipo': 'criado' | 'modificado' | 'removido' | 'erro',
+                'caminho', 'hash', 'hash_anterior', 'momento'}
+        """
+        if self._executor is None:
+            self.iniciar()
+
+        if self._inotify is None:
+            while not self._parar.wait(self.intervalo):
+                yield from self.verificar()
+            return
+
+        sujos = set()
+        primeiro = None
+        while not self._parar.is_set():
+            tempo_limite = self.espera if sujos else 1.0
+            prontos, _, _ = select.select([self._inotify.descritor], [], [], tempo_limite)
+            if prontos:
+                erros = []
+                for caminho, mascara in self._inotify.ler():
+                    if caminho is None:
+                        # Fila do kernel estourou: eventos perdidos, confere tudo
+                        sujos.clear()
+                        yield from self.verificar()
+                        continue
+                    sujos.update(self._sujos_por_evento(caminho, mascara, erros))
+                yield from erros
+                if sujos and primeiro is None:
+                    primeiro = time.monotonic()
+                if time.monotonic() - (primeiro or 0) < ESPERA_MAXIMA:
+                    continue
+            if sujos:
+                lote, sujos, primeiro = sorted(sujos), set(), None
+                yield from self._processar(lote)
+
+    def parar(self):
+        """Interrompe eventos() na próxima verificação (pode ser chamado de outra thread)"""
+        self._parar.set()
+
+    def fechar(self):
+        """Libera o inotify e o pool de threads"""
+        self.parar()
+        if self._inotify is not None:
+            self._inotify.fechar()
+            self._inotify = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+
+def main(argv=None):
+    """Monitora um diretório e mostra as mudanças"""
+    parser = argparse.ArgumentParser(description="Monitora um diretório e gera o hash dos arquivos alterados")
+    parser.add_argument('diretorio')
+    parser.add_argument('-a', '--algoritmo', default='sha256')
+    parser.add_argument('-j', '--workers', type=int, default=None)
+    parser.add_argument('--intervalo', type=float, default=INTERVALO_PADRAO,
+                        help=f"Segundos entre varreduras sem inotify (padrão: {INTERVALO_PADRAO:g})")
+    parser.add_argument('--varredura', action='store_true', help="Não usa inotify")
+    parser.add_argument('--incluir', action='append', default=[])
+    parser.add_argument('--excluir', action='append', default=[])
+    parser.add_argument('-f', '--formato', choices=['texto', 'json'], default='texto')
+    args = parser.parse_args(argv)
+
+    monitor = MonitorHash(args.diretorio, args.algoritmo, args.incluir, args.excluir, args.workers,
+                          args.intervalo, False if args.varredura else None)
+    try:
+        with monitor:
+            print(f"Monitorando {len(monitor.hashes)} arquivos ({monitor.modo})", file=sys.stderr)
+            for evento in monitor.eventos():
+                if args.formato == 'json':
+                    print(json.dumps(evento, ensure_ascii=False), flush=True)
+                else:
+                    print(f"{evento['tipo']:<10} {evento['hash'] or '-'}  {evento['caminho']}", flush=True)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Servidor HTTP do gerador de hashcode (somente biblioteca padrão)
+Mantém o processo e os módulos carregados, evitando que cada chamador pague
+a inicialização do Python a cada hash. O corpo das requisições é processado
+em blocos à medida que chega, as conexões são mantidas (HTTP/1.1 keep-alive)
+e o número de hashes simultâneos é limitado; o excesso recebe 503.
+
+Rotas:
+    POST /hash?algoritmo=sha256[&algoritmo=md5]  hash do corpo (Content-Length ou chunked)
+    POST /lote    {"algoritmo": "sha256", "textos": [...]}  hashes de muitos textos
+    GET  /arquivo?caminho=...&algoritmo=...      hash de um arquivo dentro de --raiz
+    GET  /algoritmos                             algoritmos disponíveis
+    GET  /saude                                  estado do servidor
+    GET  /metricas                               métricas no formato do Prometheus
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from gerador_hash import (criar_objeto_hash, gerar_hash_arquivo, gerar_hashes_lote, listar_algoritmos,
+                          adicionar_observador, remover_observador)
+from metricas_hash import ColetorMetricas
+
+PORTA_PADRAO = 8471
+# Bytes lidos do socket por vez ao processar o corpo
+TAMANHO_LEITURA = 256 * 1024
+# O corpo de /lote precisa ser carregado inteiro para o JSON ser decodificado
+LIMITE_LOTE = 16 * 1024 * 1024
+# Segundos que uma conexão ociosa fica aberta esperando a próxima requisição
+TEMPO_OCIOSO = 30
+
+class _CorpoInvalido(Exception):
+    """Corpo da requisição malformado ou interrompido"""
+
+class ServidorHash(ThreadingHTTPServer):
+    """
+    Servidor HTTP com limite de hashes simultâneos e contadores próprios
+    """
+
+    daemon_threads = True
+
+    def __init__(self, endereco, max_concorrencia=None, raiz=None):
+        """
+        Args:
+            endereco (tuple): (host, porta)
+            max_concorrencia (int): Hashes simultâneos (padrão: 2 x número de CPUs)
+            raiz (str): Diretório a que /arquivo fica restrito (None desativa a rota)
+        """
+        self.max_concorrencia = max_concorrencia or 2 * (os.cpu_count() or 1)
+        self.raiz = os.path.realpath(raiz) if raiz else None
+        self.coletor = ColetorMetricas()
+        self.inicio = time.monotonic()
+        self.verboso = False
+        self._vagas = threading.BoundedSemaphore(self.max_concorrencia)
+        self._trava = threading.Lock()
+        self.ativos = 0
+        self.rejeitadas = 0
+        self.bytes_recebidos = 0
+        self.requisicoes = Counter()
+        # Só os algoritmos registrados na partida são aceitos (nomes parametrizados
+        # arbitrários, como shake_256-N, ficam de fora)
+        self.algoritmos = frozenset(info['nome'] for info in listar_algoritmos())
+        super().__init__(endereco, _Atendente)
+
+    def server_activate(self):
+        super().server_activate()
+        adicionar_observador(self.coletor)
+
+    def server_close(self):
+        remover_observador(self.coletor)
+        super().server_close()
+
+    def reservar(self):
+        """Reserva uma vaga de hash sem esperar; False se o limite foi atingido"""
+        if not self._vagas.acquire(blocking=False):
+            with self._trava:
+                self.rejeitadas += 1
+            return False
+        with self._trava:
+            self.ativos += 1
+        return True
+
+    def liberar(self):
+        with self._trava:
+            self.ativos -= 1
+        self._vagas.release()
+
+    def contar(self, rota, status, bytes_recebidos=0):
+        with self._trava:
+            self.requisicoes[(rota, status)] += 1
+            self.bytes_recebidos += bytes_recebidos
+
+    def formato_prometheus(self, prefixo='gerador_hash'):
+        """Métricas do servidor seguidas das métricas de arquivos do coletor"""
+        with self._trava:
+            requisicoes = sorted(self.requisicoes.items())
+            linhas = [
+                f"# HELP {prefixo}_http_requisicoes_total Requisições por rota e status",
+                f"# TYPE {prefixo}_http_requisicoes_total counter",
+                *(f'{prefixo}_http_requisicoes_total{{rota="{rota}",status="{status}"}} {quantidade}'
+                  for (rota, status), quantidade in requisicoes),
+                f"# HELP {prefixo}_http_rejeitadas_total Requisições recusadas pelo limite de concorrência",
+                f"# TYPE {prefixo}_http_rejeitadas_total counter",
+                f"{prefixo}_http_rejeitadas_total {self.rejeitadas}",
+                f"# HELP {prefixo}_http_bytes_recebidos_total Bytes de corpo processados",
+                f"# TYPE {prefixo}_http_bytes_recebidos_total counter",
+                f"{prefixo}_http_bytes_recebidos_total {self.bytes_recebidos}",
+                f"# HELP {prefixo}_http_ativos Hashes em andamento",
+                f"# TYPE {prefixo}_http_ativos gauge",
+                f"{prefixo}_http_ativos {self.ativos}",
+            ]
+        return '\n'.join(linhas) + '\n' + self.coletor.formato_prometheus(prefixo)
+
+class _Atendente(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server_version = 'GeradorHash/1.0'
+    timeout = TEMPO_OCIOSO
+
+    def log_message(self, formato, *args):
+        if self.server.verboso:
+            super().log_message(formato, *args)
+
+    def _responder(self, status, dados, tipo='application/json', fechar=False):
+        if isinstance(dados, str):
+            corpo = dados.encode('utf-8')
+        else:
+            corpo = json.dumps(dados, ensure_ascii=False).encode('utf-8')
+            tipo = 'application/json; charset=utf-8'
+        self.send_response(status)
+        self.send_header('Content-Type', tipo)
+        self.send_header('Content-Length', str(len(corpo)))
+        if status == HTTPStatus.SERVICE_UNAVAILABLE:
+            self.send_header('Retry-After', '1')
+        if fechar:
+            # O corpo não foi lido: a conexão não pode ser reaproveitada
+            self.send_header('Connection', 'close')
+            self.close_connection = True
+        self.end_headers()
+        self.wfile.write(corpo)
+        self.server.contar(self._rota, int(status), self._recebidos)
+
+    def _erro(self, status, mensagem, fechar=False):
+        self._responder(status, {'erro': mensagem}, fechar=fechar)
+
+    def _validar_algoritmos(self, algoritmos):
+        """Confere os algoritmos pedidos com os permitidos; ValueError para os demais"""
+        for nome in algoritmos:
+            if not isinstance(nome, str) or nome.lower() not in self.server.algoritmos:
+                raise ValueError(f"Algoritmo '{nome}' não suportado (ver /algoritmos)")
+        return algoritmos
+
+    def _blocos_corpo(self):
+        """
+        Gera os blocos do corpo (Content-Length ou chunked) sem guardá-lo
+
+        Os blocos são fatias de um buffer reutilizado e só valem até o próximo.
+        """
+        buffer = bytearray(TAMANHO_LEITURA)
+        visao = memoryview(buffer)
+
+        def ler(restante):
+            while restante:
+                lidos = self.rfile.readinto(visao[:min(restante, TAMANHO_LEITURA)])
+                if not lidos:
+                    raise _CorpoInvalido("Conexão encerrada antes do fim do corpo")
+                self._recebidos += lidos
+                restante -= lidos
+                yield visao[:lidos]
+
+        if 'chunked' in self.headers.get('Transfer-Encoding', '').lower():
+            while True:
+                linha = self.rfile.readline(1024)
+                try:
+                    tamanho = int(linha.split(b';', 1)[0].strip(), 16)
+                except ValueError:
+                    raise _CorpoInvalido("Codificação chunked inválida") from None
+                if tamanho == 0:
+                    # Descarta os trailers até a linha em branco
+                    while self.rfile.readline(1024) not in (b'\r\n', b'\n', b''):
+                        pass
+                    return
+                yield from ler(tamanho)
+                self.rfile.readline(1024)
+        else:
+            try:
+                tamanho = int(self.headers.get('Content-Length', 0))
+            except ValueError:
+                raise _CorpoInvalido("Content-Length inválido") from None
+            if tamanho < 0:
+                raise _CorpoInvalido("Content-Length inválido")
+            yield from ler(tamanho)
+
+    def _tamanho_declarado(self):
+        try:
+            return int(self.headers.get('Content-Length', 0))
+        except ValueError:
+            return 0
+
+    def do_GET(self):
+        self._despachar('GET')
+
+    def do_POST(self):
+        self._despachar('POST')
+
+    def _despachar(self, metodo):
+        url = urlsplit(self.path)
+        self._rota = url.path.rstrip('/') or '/'
+        self._recebidos = 0
+        parametros = parse_qs(url.query)
+        rotas = {
+            ('POST', '/hash'): self._hash_corpo,
+            ('POST', '/lote'): self._hash_lote,
+            ('GET', '/arquivo'): self._hash_arquivo,
+            ('GET', '/algoritmos'): self._algoritmos,
+            ('GET', '/saude'): self._saude,
+            ('GET', '/metricas'): self._metricas,
+        }
+        tratar = rotas.get((metodo, self._rota))
+        if tratar is None:
+            self._rota = 'desconhecida'
+            self._erro(HTTPStatus.NOT_FOUND, "Rota não encontrada", fechar=metodo == 'POST')
+            return
+
+        limitada = self._rota in ('/hash', '/lote', '/arquivo')
+        if limitada and not self.server.reservar():
+            self._erro(HTTPStatus.SERVICE_UNAVAILABLE, "Limite de requisições simultâneas atingido",
+                       fechar=metodo == 'POST')
+            return
+        try:
+            tratar(parametros)
+        except _CorpoInvalido as e:
+            self._erro(HTTPStatus.BAD_REQUEST, str(e), fechar=True)
+        finally:
+            if limitada:
+                self.server.liberar()
+
+    def _hash_corpo(self, parametros):
+        algoritmos = parametros.get('algoritmo') or ['sha256']
+        try:
+            self._validar_algoritmos(algoritmos)
+            hash_objs = {nome.lower(): criar_objeto_hash(nome) for nome in algoritmos}
+        except ValueError as e:
+            self._erro(HTTPStatus.BAD_REQUEST, str(e), fechar=True)
+            return
+
+        atualizacoes = [obj.update for obj in hash_objs.values()]
+        for bloco in self._blocos_corpo():
+            for atualizar in atualizacoes:
+                atualizar(bloco)
+
+        hashes = {nome: obj.hexdigest() for nome, obj in hash_objs.items()}
+        self._responder(HTTPStatus.OK, {
+            'algoritmo': algoritmos[0] if len(algoritmos) == 1 else algoritmos,
+            'hash': hashes[algoritmos[0].lower()] if len(algoritmos) == 1 else hashes,
+            'bytes': self._recebidos,
+        })
+
+    def _hash_lote(self, parametros):
+        if self._tamanho_declarado() > LIMITE_LOTE:
+            self._erro(HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                       f"O corpo de /lote é limitado a {LIMITE_LOTE} bytes", fechar=True)
+            return
+
+        corpo = bytearray()
+        for bloco in self._blocos_corpo():
+            corpo += bloco
+            if len(corpo) > LIMITE_LOTE:
+                self._erro(HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                           f"O corpo de /lote é limitado a {LIMITE_LOTE} bytes", fechar=True)
+                return
+
+        try:
+            pedido = json.loads(corpo)
+            textos = pedido['textos']
+            algoritmo = pedido.get('algoritmo') or (parametros.get('algoritmo') or ['sha256'])[0]
+            if not isinstance(textos, list) or not all(isinstance(texto, str) for texto in textos):
+                raise ValueError("'textos' deve ser uma lista de strings")
+            self._validar_algoritmos([algoritmo])
+            hashes = gerar_hashes_lote(textos, algoritmo)
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            self._erro(HTTPStatus.BAD_REQUEST, f"Pedido inválido: {str(e)}")
+            return
+        self._responder(HTTPStatus.OK, {'algoritmo': algoritmo, 'hashes': hashes})
+
+    def _hash_arquivo(self, parametros):
+        raiz = self.server.raiz
+        if raiz is None:
+            self._erro(HTTPStatus.FORBIDDEN, "Hash de arquivos desativado (inicie o servidor com --raiz)")
+            return
+        caminho = (parametros.get('caminho') or [''])[0]
+        algoritmos = parametros.get('algoritmo') or ['sha256']
+        try:
+            self._validar_algoritmos(algoritmos)
+        except ValueError as e:
+            self._erro(HTTPStatus.BAD_REQUEST, str(e))
+            return
+
+        # Resolve links e '..' antes de conferir se o arquivo está dentro da raiz
+        completo = os.path.realpath(os.path.join(raiz, caminho.lstrip('/')))
+        if not caminho or os.path.commonpath([raiz, completo]) != raiz:
+            self._erro(HTTPStatus.FORBIDDEN, "Caminho fora do diretório permitido")
+            return
+        if not os.path.isfile(completo):
+            self._erro(HTTPStatus.NOT_FOUND, "Arquivo não encontrado")
+            return
+
+        hash_valor = gerar_hash_arquivo(completo, algoritmos[0] if len(algoritmos) == 1 else algoritmos)
+        if isinstance(hash_valor, str) and hash_valor.startswith('Erro'):
+            self._erro(HTTPStatus.UNPROCESSABLE_ENTITY, hash_valor)
+            return
+        self._responder(HTTPStatus.OK, {
+            'caminho': caminho,
+            'algoritmo': algoritmos[0] if len(algoritmos) == 1 else algoritmos,
+            'hash': hash_valor,
+        })
+
+    def _algoritmos(self, parametros):
+        self._responder(HTTPStatus.OK, listar_algoritmos())
+
+    def _saude(self, parametros):
+        servidor = self.server
+        self._responder(HTTPStatus.OK, {
+            'status': 'ok',
+            'ativos': servidor.ativos,
+            'limite': servidor.max_concorrencia,
+            'rejeitadas': servidor.rejeitadas,
+            'tempo_ativo': round(time.monotonic() - servidor.inicio, 3),
+        })
+
+    def _metricas(self, parametros):
+        self._responder(HTTPStatus.OK, self.server.formato_prometheus(),
+                        tipo='text/plain; version=0.0.4; charset=utf-8')
+
+def criar_servidor(host='127.0.0.1', porta=PORTA_PADRAO, max_concorrencia=None, raiz=None):
+    """
+    Cria o servidor HTTP (ainda sem atender; use serve_forever)
+
+    Args:
+        host (str): Endereço em que o servidor escuta
+        porta (int): Porta TCP (0 escolhe uma porta livre)
+        max_concorrencia (int): Hashes simultâneos antes de responder 503
+        raiz (str): Diretório a que /arquivo fica restrito (None desativa a rota)
+
+    Returns:
+        ServidorHash: Servidor pronto para serve_forever()
+    """
+    return ServidorHash((host, porta), max_concorrencia, raiz)
+
+def main(argv=None):
+    """Inicia o servidor HTTP de hashes"""
+    parser = argparse.ArgumentParser(description="Servidor HTTP do gerador de hashcode")
+    parser.add_argument('--host', default='127.0.0.1', help="Endereço (padrão: apenas local)")
+    parser.add_argument('-p', '--porta', type=int, default=PORTA_PADRAO)
+    parser.add_argument('-c', '--concorrencia', type=int, default=None,
+                        help="Hashes simultâneos antes de responder 503 (padrão: 2 x CPUs)")
+    parser.add_argument('--raiz', default=None,
+                        help="Diretório permitido em /arquivo (sem ele a rota fica desativada)")
+    parser.add_argument('-v', '--verboso', action='store_true', help="Registra cada requisição")
+    args = parser.parse_args(argv)
+
+    try:
+        servidor = criar_servidor(args.host, args.porta, args.concorrencia, args.raiz)
+    except OSError as e:
+        print(f"Erro: {str(e)}", file=sys.stderr)
+        return 1
+    servidor.verboso = args.verboso
+
+    host, porta = servidor.server_address[:2]
+    print(f"Servidor de hashes em http://{host}:{porta} (limite: {servidor.max_concorrencia})",
+          file=sys.stderr)
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
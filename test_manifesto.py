@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Testes da verificação de manifestos (python -m unittest test_manifesto)
+"""
+
+import hashlib
+import os
+import tempfile
+import unittest
+
+from manifesto import normalizar_caminho, verificar_manifesto
+
+class TestVerificarManifesto(unittest.TestCase):
+
+    def setUp(self):
+        self._temporario = tempfile.TemporaryDirectory()
+        self.diretorio = self._temporario.name
+        self.hashes = {}
+        for nome in ('f1', 'f2', 'f3'):
+            conteudo = nome.encode('ascii') * 100
+            with open(os.path.join(self.diretorio, nome), 'wb') as arquivo:
+                arquivo.write(conteudo)
+            self.hashes[nome] = hashlib.sha256(conteudo).hexdigest()
+
+    def tearDown(self):
+        self._temporario.cleanup()
+
+    def _gravar_manifesto(self, linhas):
+        caminho = os.path.join(self.diretorio, 'SHA256SUMS')
+        with open(caminho, 'w', encoding='utf-8') as manifesto:
+            manifesto.writelines(f"{linha}\n" for linha in linhas)
+        return caminho
+
+    def test_caminhos_com_prefixo_ponto_barra(self):
+        # Saída de 'sha256sum ./f1 ./f3'
+        manifesto = self._gravar_manifesto([f"{self.hashes['f1']}  ./f1", f"{self.hashes['f3']}  ./f3"])
+        relatorio = verificar_manifesto(manifesto, workers=2)
+        self.assertEqual(sorted(relatorio['ok']), ['./f1', './f3'])
+        self.assertEqual(relatorio['extras'], ['f2'])
+        self.assertEqual(relatorio['alterados'], [])
+        self.assertEqual(relatorio['ausentes'], [])
+
+    def test_caminhos_sem_prefixo(self):
+        manifesto = self._gravar_manifesto([f"{self.hashes[nome]}  {nome}" for nome in ('f1', 'f2', 'f3')])
+        relatorio = verificar_manifesto(manifesto, workers=2)
+        self.assertEqual(sorted(relatorio['ok']), ['f1', 'f2', 'f3'])
+        self.assertEqual(relatorio['extras'], [])
+
+    def test_normalizar_caminho(self):
+        self.assertEqual(normalizar_caminho('./a/b'), 'a/b')
+        self.assertEqual(normalizar_caminho('a//./b'), 'a/b')
+        self.assertEqual(normalizar_caminho('a/b'), 'a/b')
+
+if __name__ == '__main__':
+    unittest.main()